@@ -740,6 +740,8 @@ def pruneIncluded(objectslist,strict=False):
     is removed only if the parent is also part of the selection."""
     import Draft
     newlist = []
+    # names of the given objects, to find parents in the list quickly
+    names = set((o.Document.Name,o.Name) for o in objectslist)
     for obj in objectslist:
         toplevel = True
         if obj.isDerivedFrom("Part::Feature"):
@@ -761,7 +763,7 @@ def pruneIncluded(objectslist,strict=False):
                             else:
                                 toplevel = False
                     if (toplevel == False) and strict:
-                        if not(parent in objectslist) and not(parent in newlist):
+                        if not((parent.Document.Name,parent.Name) in names):
                             toplevel = True
         if toplevel:
             newlist.append(obj)
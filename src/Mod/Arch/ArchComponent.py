@@ -158,6 +158,74 @@ def removeFromComponent(compobject,subobject):
                 ArchCommands.setAsSubcomponent(subobject)
 
 
+def projectFace(face):
+    """Project a face on the XY plane.
+
+    Horizontal faces are simply moved to the XY plane. The wires of faces
+    made only of straight edges are projected vertex by vertex. Other faces
+    are projected with the Drawing module.
+
+    Parameters
+    ----------
+    face: <Part.Face>
+        The face to project. It must not be vertical.
+
+    Returns
+    -------
+    <Part.Face>
+        The projected face, lying on the XY plane.
+
+    Raises
+    ------
+    Part.OCCError
+        If the projected face cannot be built.
+    """
+
+    import Part
+    bb = face.BoundBox
+    if bb.ZLength < 1e-7:
+        f = face.copy()
+        f.translate(FreeCAD.Vector(0,0,-bb.ZMin))
+        return f
+    if all(isinstance(e.Curve,(Part.Line,Part.LineSegment)) for e in face.Edges):
+        wires = []
+        for w in [face.OuterWire]+[w for w in face.Wires if not w.isSame(face.OuterWire)]:
+            pts = [FreeCAD.Vector(v.X,v.Y,0) for v in w.OrderedVertexes]
+            wires.append(Part.makePolygon(pts+[pts[0]]))
+        return Part.Face(wires)
+    import Drawing
+    return Part.Face(Part.Wire(Drawing.project(face,FreeCAD.Vector(0,0,1))[0].Edges))
+
+
+def getFlatArea(faces):
+    """Return the union of the projections of faces on the XY plane.
+
+    All the faces are projected with projectFace(), then fused in a single
+    boolean operation.
+
+    Parameters
+    ----------
+    faces: list of <Part.Face>
+        The faces to project. They must not be vertical.
+
+    Returns
+    -------
+    <Part.Shape>
+        The projected area, or None if the list of faces is empty.
+
+    Raises
+    ------
+    Part.OCCError
+        If a face cannot be projected.
+    """
+
+    pset = [projectFace(f) for f in faces]
+    if not pset:
+        return None
+    if len(pset) == 1:
+        return pset[0]
+    return pset[0].multiFuse(pset[1:]).removeSplitter()
+
 
 class Component(ArchIFC.IfcProduct):
     """The Arch Component object.
@@ -964,69 +1032,76 @@ class Component(ArchIFC.IfcProduct):
 
 
         if (not obj.Shape) or obj.Shape.isNull() or (not obj.Shape.isValid()) or (not obj.Shape.Faces):
-            obj.VerticalArea = 0
-            obj.HorizontalArea = 0
-            obj.PerimeterLength = 0
+            self.setAreas(obj,0,0,0)
+            return
+
+        fmax = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Arch").GetInt("MaxComputeAreas",0)
+        if fmax and (len(obj.Shape.Faces) > fmax):
+            self.setAreas(obj,0,0,0)
             return
 
-        import Drawing,Part
-        fmax = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Arch").GetInt("MaxComputeAreas",20)
-        if len(obj.Shape.Faces) > fmax:
-            obj.VerticalArea = 0
-            obj.HorizontalArea = 0
-            obj.PerimeterLength = 0
+        # the areas only change if the shape changed. The shape is kept with
+        # the hash, so the hash can not be reused by another shape
+        key = obj.Shape.hashCode()
+        cache = getattr(self,"areacache",None)
+        if cache and (cache[0] == key) and cache[1].isSame(obj.Shape):
+            self.setAreas(obj,*cache[2:])
             return
 
-        a = 0
+        import Part
+        try:
+            normals = [f.normalAt(0,0) for f in obj.Shape.Faces]
+        except Part.OCCError:
+            print("Debug: Error computing areas for ",obj.Label,": normalAt()")
+            self.setAreas(obj,0,0,0)
+            return
+
+        # faces are classified by the Z component of their normal: vertical
+        # faces between 1.57 and 1.571 rad from Z, upward faces below 1.5707
+        vertical = 0
         fset = []
-        for i,f in enumerate(obj.Shape.Faces):
+        for f,n in zip(obj.Shape.Faces,normals):
+            z = n.z/n.Length if n.Length else 0
+            if (z < math.cos(1.57)) and (z > math.cos(1.571)):
+                vertical += f.Area
+            if z > math.cos(1.5707):
+                fset.append(f)
+
+        horizontal = 0
+        perimeter = 0
+        if fset:
             try:
-                ang = f.normalAt(0,0).getAngle(FreeCAD.Vector(0,0,1))
+                self.flatarea = getFlatArea(fset)
             except Part.OCCError:
-                print("Debug: Error computing areas for ",obj.Label,": normalAt() Face ",i)
-                obj.VerticalArea = 0
-                obj.HorizontalArea = 0
-                obj.PerimeterLength = 0
-                return
-            else:
-                if (ang > 1.57) and (ang < 1.571):
-                    a += f.Area
-                if ang < 1.5707:
-                    fset.append(f)
-
-        if a and hasattr(obj,"VerticalArea"):
-            if obj.VerticalArea.Value != a:
-                obj.VerticalArea = a
-        if fset and hasattr(obj,"HorizontalArea"):
-            pset = []
-            for f in fset:
-                if f.normalAt(0,0).getAngle(FreeCAD.Vector(0,0,1)) < 0.00001:
-                    # already horizontal
-                    pset.append(f)
-                else:
-                    try:
-                        pf = Part.Face(Part.Wire(Drawing.project(f,FreeCAD.Vector(0,0,1))[0].Edges))
-                    except Part.OCCError:
-                        # error in computing the areas. Better set them to zero than show a wrong value
-                        if obj.HorizontalArea.Value != 0:
-                            print("Debug: Error computing areas for ",obj.Label,": unable to project face: ",str([v.Point for v in f.Vertexes])," (face normal:",f.normalAt(0,0),")")
-                            obj.HorizontalArea = 0
-                        if hasattr(obj,"PerimeterLength"):
-                            if obj.PerimeterLength.Value != 0:
-                                obj.PerimeterLength = 0
-                    else:
-                        pset.append(pf)
+                # error in computing the areas. Better set them to zero than show a wrong value
+                print("Debug: Error computing areas for ",obj.Label,": unable to project faces")
+                self.flatarea = None
+            if self.flatarea:
+                horizontal = self.flatarea.Area
+                if len(self.flatarea.Faces) == 1:
+                    perimeter = self.flatarea.Faces[0].OuterWire.Length
 
-            if pset:
-                self.flatarea = pset.pop()
-                for f in pset:
-                    self.flatarea = self.flatarea.fuse(f)
-                self.flatarea = self.flatarea.removeSplitter()
-                if obj.HorizontalArea.Value != self.flatarea.Area:
-                    obj.HorizontalArea = self.flatarea.Area
-                if hasattr(obj,"PerimeterLength") and (len(self.flatarea.Faces) == 1):
-                    if obj.PerimeterLength.Value != self.flatarea.Faces[0].OuterWire.Length:
-                        obj.PerimeterLength = self.flatarea.Faces[0].OuterWire.Length
+        self.areacache = (key,obj.Shape,vertical,horizontal,perimeter)
+        self.setAreas(obj,vertical,horizontal,perimeter)
+
+    def setAreas(self,obj,vertical,horizontal,perimeter):
+        """Assign the computed areas to the object, if they changed.
+
+        Parameters
+        ----------
+        obj: <App::FeaturePython>
+            The component object.
+        vertical: float
+            The value of the VerticalArea property.
+        horizontal: float
+            The value of the HorizontalArea property.
+        perimeter: float
+            The value of the PerimeterLength property.
+        """
+
+        for prop,value in [("VerticalArea",vertical),("HorizontalArea",horizontal),("PerimeterLength",perimeter)]:
+            if hasattr(obj,prop) and (getattr(obj,prop).Value != value):
+                setattr(obj,prop,value)
 
     def isStandardCase(self,obj):
         """Determine if the component is a standard case of its IFC type.
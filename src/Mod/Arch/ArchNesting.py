@@ -24,7 +24,7 @@
 
 from __future__ import print_function
 
-import FreeCAD, Part, DraftGeomUtils, WorkingPlane, DraftVecUtils, math, Draft
+import FreeCAD, Part, DraftGeomUtils, WorkingPlane, DraftVecUtils, math, Draft, numpy
 from datetime import datetime
 
 # This is roughly based on the no-fit polygon algorithm, used in
@@ -34,15 +34,18 @@ from datetime import datetime
 TOLERANCE = 0.0001 # smaller than this, two points are considered equal
 DISCRETIZE = 4 # the number of segments in which arcs must be subdivided
 ROTATIONS = [0,90,180,270] # the possible rotations to try
+ENGINE = "shapes" # "shapes" (exact, OCC booleans) or "polygons" (fast, convex no-fit polygons)
+WORKERS = 0 # if bigger than 1, the number of processes used by the polygons engine
 
 class Nester:
 
 
-    def __init__(self,container=None,shapes=None):
+    def __init__(self,container=None,shapes=None,engine=None):
 
-        """Nester([container,shapes]): Creates a nester object with a container
+        """Nester([container,shapes,engine]): Creates a nester object with a container
            shape and a list of other shapes to nest into it. Container and
-           shapes must be Part.Faces.
+           shapes must be Part.Faces. Engine is "shapes" or "polygons", by
+           default the ENGINE setting.
 
            Typical workflow:
 
@@ -58,6 +61,8 @@ class Nester:
            Nester.TOLERANCE = 0.0001
            Nester.DISCRETIZE = 4
            Nester.ROTATIONS = [0,90,180,270]
+           Nester.ENGINE = "shapes"
+           Nester.WORKERS = 0
            """
 
         self.objects = None
@@ -68,6 +73,8 @@ class Nester:
         self.running = True
         self.progress = 0
         self.setCounter = None # optionally define a setCounter(value) function where value is a %
+        self.nofitcache = {} # no-fit polygons of the polygons engine, by pair of pieces and rotations
+        self.engine = engine
 
     def addObjects(self,objects):
 
@@ -99,6 +106,7 @@ class Nester:
 
         self.objects = None
         self.shapes = None
+        self.nofitcache = {}
 
     def stop(self):
 
@@ -124,15 +132,19 @@ class Nester:
 
         """run(): Runs a nesting operation. Returns a list of lists of
            shapes, each primary list being one filled container, or None
-           if the operation failed."""
+           if the operation failed. The engine of the nester, or the ENGINE
+           setting, defines which method is used, see runPolygons() and
+           runShapes()."""
 
-        # reset abort mechanism and variables
+        if (self.engine or ENGINE) == "polygons":
+            return self.runPolygons()
+        return self.runShapes()
 
-        self.running = True
-        self.progress = 0
-        starttime = datetime.now()
+    def check(self):
 
-        # general conformity tests
+        """check(): internal function that runs conformity tests on the
+           container and shapes. Returns the normal of the container, or
+           None if the tests failed"""
 
         print("Executing conformity tests ... ",end="")
         if not self.container:
@@ -157,6 +169,144 @@ class Nester:
                 if s.Faces[0].normalAt(0,0).getAngle(normal)-math.pi > TOLERANCE:
                     print("One of the face doesn't have the same orientation as the container. Aborting")
                     return
+        return normal
+
+    def runPolygons(self):
+
+        """runPolygons(): Runs a nesting operation on polygons. Each piece
+           is replaced by the convex hull of its (discretized) outline, so
+           the result never overlaps but concave pieces are not fitted
+           into each other. The no-fit polygons of each pair of pieces and
+           rotations are computed once, and the possible positions of a piece
+           are tested all at once with numpy. If WORKERS is bigger than 1,
+           the sheets and rotations are tested in that number of processes.
+           Returns the same results as runShapes()."""
+
+        self.running = True
+        self.progress = 0
+        starttime = datetime.now()
+        normal = self.check()
+        if normal is None:
+            return
+
+        self.indexedfaces = [[shape.hashCode(),shape] for shape in self.shapes]
+        faces = sorted([[f[0],f[1].Faces[0]] for f in self.indexedfaces],key=lambda face: face[1].Area)
+        boc = self.container.BoundBox
+
+        # the polygon of each piece at each rotation: [rotation,face,origin,hull,width,height]
+        # the hull is placed so its lower left corner is at (0,0), origin being that corner
+        pieces = {}
+        for hashcode,face in faces:
+            if not self.update():
+                return
+            rots = []
+            for rotation in ROTATIONS:
+                rotface = face.copy()
+                if rotation:
+                    rotface.rotate(rotface.CenterOfMass,normal,rotation)
+                hull = convexHull(getOutlinePoints(rotface))
+                origin = hull.min(axis=0)
+                hull = hull - origin
+                width,height = hull.max(axis=0)
+                if (width <= boc.XLength+TOLERANCE) and (height <= boc.YLength+TOLERANCE):
+                    rots.append([rotation,rotface,origin,hull,width,height])
+            if not rots:
+                print("One face doesn't fit in the container. Aborting")
+                return
+            pieces[hashcode] = rots
+
+        print("Everything OK (",datetime.now()-starttime,")")
+
+        sheets = [] # the results, lists of [hashcode,face]
+        placed = [] # for each sheet, [hashcode,rotation,hull,position] of the placed pieces
+        extents = [] # for each sheet, the X extent of the placed pieces
+        step = 100.0/len(faces)
+        pool = getPool(WORKERS)
+        try:
+            while faces:
+                if not self.update():
+                    return
+                hashcode,face = faces.pop()
+                rots = pieces[hashcode]
+
+                # test each rotation on each sheet
+                tasks = []
+                keys = []
+                for sheetnumber,sheet in enumerate(placed):
+                    for rot in rots:
+                        rotation,rotface,origin,hull,width,height = rot
+                        nofits = [self.getNoFitPolygon(p[0],p[1],p[2],hashcode,rotation,hull)+p[3] for p in sheet]
+                        fitrect = (boc.XMin,boc.YMin,boc.XMax-width,boc.YMax-height)
+                        tasks.append((fitrect,nofits,width,extents[sheetnumber],TOLERANCE))
+                        keys.append((sheetnumber,rot))
+                if pool and (len(tasks) > 1):
+                    found = pool.map(findPosition,tasks)
+                else:
+                    found = [findPosition(task) for task in tasks]
+                best = None
+                for key,result in zip(keys,found):
+                    if result and ((best is None) or (result[0] < best[0][0])):
+                        best = (result,key)
+
+                if best:
+                    (xmax,x,y),(sheetnumber,rot) = best
+                else:
+                    # start a new sheet with the narrowest rotation
+                    rot = sorted(rots,key=lambda r: r[4])[0]
+                    x,y = boc.XMin,boc.YMin
+                    xmax = x+rot[4]
+                    sheets.append([])
+                    placed.append([])
+                    extents.append(xmax)
+                    sheetnumber = len(sheets)-1
+
+                rotation,rotface,origin,hull,width,height = rot
+                result = rotface.copy()
+                result.translate(FreeCAD.Vector(x-origin[0],y-origin[1],0))
+                sheets[sheetnumber].append([hashcode,result])
+                placed[sheetnumber].append([hashcode,rotation,hull,numpy.array([x,y])])
+                extents[sheetnumber] = max(extents[sheetnumber],xmax)
+                self.progress += step
+        finally:
+            if pool:
+                pool.terminate()
+
+        print("Placed",len(self.indexedfaces),"pieces on",len(sheets),"sheets. Run time:",datetime.now()-starttime)
+        self.results.append(sheets)
+        return sheets
+
+    def getNoFitPolygon(self,hash1,rot1,hull1,hash2,rot2,hull2):
+
+        """getNoFitPolygon(hash1,rot1,hull1,hash2,rot2,hull2): returns the
+           no-fit polygon of piece 2 around piece 1, that is, the positions
+           of the lower left corner of piece 2 where it overlaps piece 1,
+           piece 1 being at (0,0). The result is cached."""
+
+        key = (hash1,rot1,hash2,rot2)
+        if not key in self.nofitcache:
+            # the Minkowski sum of piece 1 and the symmetric of piece 2
+            pts = (hull1[:,None,:]-hull2[None,:,:]).reshape(-1,2)
+            self.nofitcache[key] = convexHull(pts)
+        return self.nofitcache[key]
+
+    def runShapes(self):
+
+        """runShapes(): Runs a nesting operation using OCC booleans on
+           the discretized faces. Returns a list of lists of shapes,
+           each primary list being one filled container, or None
+           if the operation failed."""
+
+        # reset abort mechanism and variables
+
+        self.running = True
+        self.progress = 0
+        starttime = datetime.now()
+
+        # general conformity tests
+
+        normal = self.check()
+        if normal is None:
+            return
 
         # TODO
         # allow to use a non-rectangular container
@@ -692,6 +842,129 @@ class Nester:
                     print("error: hashCode mismatch with original object")
 
 
+def getOutlinePoints(face):
+
+    """getOutlinePoints(face): returns the XY coordinates of the vertices of
+    the outer wire of a face as a numpy array, non-linear edges being
+    subdivided in DISCRETIZE segments"""
+
+    pts = []
+    for edge in face.OuterWire.Edges:
+        if isinstance(edge.Curve,(Part.LineSegment,Part.Line)):
+            pts.extend([v.Point for v in edge.Vertexes])
+        else:
+            pts.extend(edge.discretize(DISCRETIZE+1))
+    return numpy.array([[p.x,p.y] for p in pts])
+
+
+def convexHull(points):
+
+    """convexHull(points): returns the convex hull of an array of 2D
+    points, counter-clockwise, without repeating the first point"""
+
+    pts = numpy.unique(numpy.round(points,9),axis=0) # sorted by X then Y
+    if len(pts) < 3:
+        return pts
+    def half(points):
+        h = []
+        for p in points:
+            while (len(h) > 1) and ((h[-1][0]-h[-2][0])*(p[1]-h[-2][1])-(h[-1][1]-h[-2][1])*(p[0]-h[-2][0]) <= 0):
+                h.pop()
+            h.append(p)
+        return h[:-1]
+    return numpy.array(half(pts)+half(pts[::-1]))
+
+
+def insideConvex(points,hull,tolerance):
+
+    """insideConvex(points,hull,tolerance): returns an array of booleans telling
+    which points are strictly inside the given counter-clockwise convex hull,
+    points closer than tolerance from its border being considered outside"""
+
+    a = hull
+    d = numpy.roll(hull,-1,axis=0)-a
+    lengths = numpy.hypot(d[:,0],d[:,1])
+    lengths[lengths == 0] = 1
+    cross = d[None,:,0]*(points[:,None,1]-a[None,:,1])-d[None,:,1]*(points[:,None,0]-a[None,:,0])
+    return ((cross/lengths[None,:]) > tolerance).all(axis=1)
+
+
+def intersectSegments(segs1,segs2):
+
+    """intersectSegments(segs1,segs2): returns the intersection points of two
+    arrays of segments of shape (N,2,2) and (M,2,2)"""
+
+    p = segs1[:,None,0,:]
+    r = segs1[:,None,1,:]-p
+    q = segs2[None,:,0,:]
+    s = segs2[None,:,1,:]-q
+    denom = r[...,0]*s[...,1]-r[...,1]*s[...,0]
+    ok = numpy.abs(denom) > 1e-12
+    denom[~ok] = 1
+    qp = q-p
+    t = (qp[...,0]*s[...,1]-qp[...,1]*s[...,0])/denom
+    u = (qp[...,0]*r[...,1]-qp[...,1]*r[...,0])/denom
+    ok &= (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+    return (p+t[...,None]*r)[ok]
+
+
+def findPosition(task):
+
+    """findPosition(task): finds the best position of a piece on a sheet. The task
+    is a (fitrect,nofits,width,extent,tolerance) tuple, fitrect being the
+    (xmin,ymin,xmax,ymax) rectangle where the lower left corner of the piece
+    can be, nofits the no-fit polygons of the placed pieces, width the width
+    of the piece and extent the X extent of the placed pieces. Returns None if
+    the piece doesn't fit, or a (extent,x,y) tuple, the chosen position being
+    the one that gives the smallest extent, then the smallest X and Y. This
+    function only uses numpy arrays so it can run in a worker process."""
+
+    fitrect,nofits,width,extent,tolerance = task
+    xmin,ymin,xmax,ymax = fitrect
+    if (xmax < xmin-tolerance) or (ymax < ymin-tolerance):
+        return None
+    xmax = max(xmin,xmax)
+    ymax = max(ymin,ymax)
+    corners = numpy.array([[xmin,ymin],[xmax,ymin],[xmax,ymax],[xmin,ymax]])
+
+    # candidate positions: corners and crossings of the fit rectangle and no-fit polygons
+    segs = [numpy.stack([corners,numpy.roll(corners,-1,axis=0)],axis=1)]
+    for pol in nofits:
+        segs.append(numpy.stack([pol,numpy.roll(pol,-1,axis=0)],axis=1))
+    allsegs = numpy.concatenate(segs)
+    candidates = [corners]+list(nofits)
+    for seg in segs[1:]:
+        candidates.append(intersectSegments(seg,allsegs))
+    pts = numpy.concatenate(candidates)
+
+    ok = (pts[:,0] >= xmin-tolerance) & (pts[:,0] <= xmax+tolerance) \
+       & (pts[:,1] >= ymin-tolerance) & (pts[:,1] <= ymax+tolerance)
+    pts = pts[ok]
+    for pol in nofits:
+        if not len(pts):
+            return None
+        pts = pts[~insideConvex(pts,pol,tolerance)]
+    if not len(pts):
+        return None
+    extents = numpy.maximum(extent,pts[:,0]+width)
+    best = numpy.lexsort((pts[:,1],pts[:,0],extents))[0]
+    return (float(extents[best]),float(pts[best,0]),float(pts[best,1]))
+
+
+def getPool(workers):
+
+    """getPool(workers): returns a pool of worker processes, or None if
+    workers is smaller than 2 or the pool cannot be created"""
+
+    if workers > 1:
+        import multiprocessing
+        try:
+            return multiprocessing.Pool(workers)
+        except Exception as e:
+            print("Unable to start worker processes:",e)
+    return None
+
+
 def test():
 
     "runs a test with selected shapes, container selected last"
@@ -1641,7 +1641,9 @@ class NestTaskPanel:
         ArchNesting.TOLERANCE = tolerance
         ArchNesting.DISCRETIZE = discretize
         ArchNesting.ROTATIONS = rotations
-        self.nester = ArchNesting.Nester()
+        # the faster, approximate polygons engine is opt-in
+        engine = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Arch").GetString("NestingEngine","shapes")
+        self.nester = ArchNesting.Nester(engine=engine)
         self.nester.addContainer(self.container)
         self.nester.addObjects(self.shapes)
         self.nester.setCounter = self.setCounter
@@ -77,6 +77,89 @@ class CommandArchSchedule:
 
 
 
+class _ScheduleObserver:
+
+    "A document observer that records the changes used by incremental schedules"
+
+    MAXCHANGES = 200000 # beyond this number of changes, older changes are forgotten
+
+    def __init__(self):
+
+        self.serial = 0
+        self.changes = {} # document name: list of [serial,object name,property,structural]
+        self.start = {} # document name: serial of the oldest remembered change
+
+    def record(self,doc,name,prop,structural):
+
+        self.serial += 1
+        changes = self.changes.setdefault(doc,[])
+        changes.append((self.serial,name,prop,structural))
+        if len(changes) > self.MAXCHANGES:
+            del changes[:len(changes)//2]
+            self.start[doc] = changes[0][0]
+
+    def getChanges(self,doc,serial):
+
+        """returns the changes of the given document since the given serial,
+        or None if they are not all known"""
+
+        if (serial is None) or (serial < self.start.get(doc,0)):
+            return None
+        changes = self.changes.get(doc,[])
+        # changes are sorted by serial
+        lo,hi = 0,len(changes)
+        while lo < hi:
+            mid = (lo+hi)//2
+            if changes[mid][0] <= serial:
+                lo = mid+1
+            else:
+                hi = mid
+        return changes[lo:]
+
+    def slotCreatedObject(self,obj):
+
+        self.record(obj.Document.Name,obj.Name,None,True)
+
+    def slotDeletedObject(self,obj):
+
+        self.record(obj.Document.Name,obj.Name,None,True)
+
+    def slotChangedObject(self,obj,prop):
+
+        # a change of link can change the contents of groups and included objects
+        try:
+            structural = obj.getTypeIdOfProperty(prop).startswith(("App::PropertyLink","App::PropertyXLink"))
+        except Exception:
+            structural = True
+        self.record(obj.Document.Name,obj.Name,prop,structural)
+
+    def slotUndoDocument(self,doc):
+
+        self.record(doc.Name,None,None,True)
+
+    def slotRedoDocument(self,doc):
+
+        self.record(doc.Name,None,None,True)
+
+    def slotDeletedDocument(self,doc):
+
+        self.changes.pop(doc.Name,None)
+        self.start.pop(doc.Name,None)
+
+
+OBSERVER = None
+
+def getObserver():
+
+    "returns the document observer used by incremental schedules, creating it if needed"
+
+    global OBSERVER
+    if OBSERVER is None:
+        OBSERVER = _ScheduleObserver()
+        FreeCAD.addDocumentObserver(OBSERVER)
+    return OBSERVER
+
+
 class _ArchSchedule:
 
     "the Arch Schedule object"
@@ -86,6 +169,7 @@ class _ArchSchedule:
         self.setProperties(obj)
         obj.Proxy = self
         self.Type = "Schedule"
+        obj.Incremental = True
 
     def onDocumentRestored(self,obj):
 
@@ -109,6 +193,9 @@ class _ArchSchedule:
             obj.addProperty("App::PropertyLink",      "Result",            "Arch",QT_TRANSLATE_NOOP("App::Property","The spreadsheet to print the results to"))
         if not "DetailedResults" in obj.PropertiesList:
             obj.addProperty("App::PropertyBool",      "DetailedResults", "Arch",QT_TRANSLATE_NOOP("App::Property","If True, additional lines with each individual object are added to the results"))
+        if not "Incremental" in obj.PropertiesList:
+            # off for the schedules of existing documents, on for new schedules
+            obj.addProperty("App::PropertyBool",      "Incremental",     "Arch",QT_TRANSLATE_NOOP("App::Property","If True, only the rows whose objects changed are recomputed"))
 
     def onChanged(self,obj,prop):
 
@@ -164,180 +251,316 @@ class _ArchSchedule:
             # silently fail on old schedule objects
             return
 
+        # in incremental mode, the rows are only recomputed if their contents
+        # or the objects they use changed since the last recompute
+
+        observer = None
+        changes = None
+        if getattr(obj,"Incremental",False):
+            observer = getObserver()
+            if observer:
+                changes = observer.getChanges(obj.Document.Name,getattr(self,"serial",None))
+        if changes is None:
+            self.rows = {}
+            self.values = {}
+        elif not hasattr(self,"rows"):
+            self.rows = {}
+            self.values = {}
+        else:
+            # forget the cached values of changed objects
+            for serial,name,prop,structural in changes:
+                if name is None:
+                    self.values = {}
+                elif name in self.values:
+                    if prop is None:
+                        self.values.pop(name)
+                    else:
+                        cache = self.values[name]
+                        for key in [k for k in cache if (k == prop) or k.startswith(prop+".")]:
+                            cache.pop(key)
+        if observer:
+            self.serial = observer.serial
+
         self.data = {} # store all results in self.data, so it lives even without spreadsheet
+        self.timing = [] # [description,seconds,mode] for each row
         li = 1 # row index - starts at 2 to leave 2 blank rows for the title
-
+        rows = {}
         for i in range(len(obj.Description)):
             li += 1
-            if not obj.Description[i]:
-                # blank line
-                continue
-            # write description
-            if sys.version_info.major >= 3:
-                # use unicode for python3
-                self.data["A"+str(li)] = obj.Description[i]
+            t = time.time()
+            spec = (obj.Description[i],obj.Value[i],obj.Unit[i],obj.Objects[i],obj.Filter[i],obj.DetailedResults)
+            row = self.rows.get(i)
+            if (row is None) or (row["spec"] != spec) or (changes is None):
+                mode = "full"
+                row = self.getRow(obj,i,spec)
             else:
-                self.data["A"+str(li)] = obj.Description[i].encode("utf8")
+                mode = self.getRowChanges(row,changes)
+                if mode == "full":
+                    row = self.getRow(obj,i,spec)
+                elif mode == "values":
+                    row["depends"] = set()
+                    row["lines"] = self.getRowLines(obj,i,spec,row["objects"],row["depends"])
+            rows[i] = row
+            self.timing.append([obj.Description[i],time.time()-t,mode])
+
+            # write the lines of this row
+            for n,line in enumerate(row["lines"]):
+                for col,v in line.items():
+                    self.data[col+str(li+n)] = v
+            li += len(row["lines"])-1
+
+        self.rows = rows
+        if verbose and changes is not None:
+            print("Schedule",obj.Label,":",len([t for t in self.timing if t[2] != "cached"]),"of",len(self.timing),"rows recomputed in",
+                  round(sum(t[1] for t in self.timing),3),"seconds")
+        self.setSpreadsheetData(obj)
+
+    def getRowChanges(self,row,changes):
+
+        """Returns how a cached row is affected by the given document changes:
+        "full" if its list of objects must be rebuilt, "values" if only the
+        values of some of its objects changed, or "cached" if the row is still valid"""
+
+        mode = "cached"
+        for serial,name,prop,structural in changes:
+            if structural:
+                return "full"
+            if name in row["candidates"]:
+                if prop.upper() in row["filters"]:
+                    return "full"
+                if (name in row["names"]) and ((prop == row["property"]) or (prop == "Label")):
+                    mode = "values"
+            if name in row["depends"]:
+                # an object linked by the values of the row
+                mode = "values"
+        return mode
+
+    def getRow(self,obj,i,spec):
+
+        """Computes a row of the schedule. Returns a dictionary containing the
+        lines of results, and what is needed to know when they must be recomputed"""
+
+        row = {"spec":spec,"candidates":set(),"names":set(),"objects":[],"filters":set(),"property":None,"depends":set()}
+        val = obj.Value[i]
+        if obj.Description[i] and val:
+            candidates,objs = self.getObjects(obj,i)
+            row["candidates"] = set(o.Name for o in candidates)
+            row["objects"] = objs
+            row["names"] = set(o.Name for o in objs)
+            if obj.Filter[i]:
+                for f in obj.Filter[i].split(";"):
+                    prop = f.strip().split(":")[0].strip().upper()
+                    row["filters"].add(prop[1:] if prop.startswith("!") else prop)
+            if val.upper() != "COUNT":
+                vals = val.split(".")
+                if vals[0][0].islower():
+                    vals = vals[1:]
+                if vals:
+                    row["property"] = vals[0]
+        row["lines"] = self.getRowLines(obj,i,spec,row["objects"],row["depends"])
+        return row
+
+    def getObjects(self,obj,i):
+
+        """Returns the objects of a row, before and after applying its filters"""
+
+        import Draft,Arch
+        objs = obj.Objects[i]
+        if objs:
+            objs = objs.split(";")
+            objs = [FreeCAD.ActiveDocument.getObject(o) for o in objs]
+            objs = [o for o in objs if o != None]
+        else:
+            objs = FreeCAD.ActiveDocument.Objects
+        if len(objs) == 1:
+            # remove object itself if the object is a group
+            if objs[0].isDerivedFrom("App::DocumentObjectGroup"):
+                objs = objs[0].Group
+        objs = Draft.getGroupContents(objs)
+        objs = Arch.pruneIncluded(objs,strict=True)
+        # remove the schedule object and its result from the list
+        objs = [o for o in objs if not o == obj]
+        objs = [o for o in objs if not o == obj.Result]
+        candidates = objs
+        if obj.Filter[i]:
+            # apply filters
+            nobjs = []
+            for o in objs:
+                props = [p.upper() for p in o.PropertiesList]
+                ok = True
+                for f in obj.Filter[i].split(";"):
+                    args = [a.strip() for a in f.strip().split(":")]
+                    if args[0][0] == "!":
+                        inv = True
+                        prop = args[0][1:].upper()
+                    else:
+                        inv = False
+                        prop = args[0].upper()
+                    fval = args[1].upper()
+                    if prop == "TYPE":
+                        prop == "IFCTYPE"
+                    if inv:
+                        if prop in props:
+                            csprop = o.PropertiesList[props.index(prop)]
+                            if fval in getattr(o,csprop).upper():
+                                ok = False
+                    else:
+                        if not (prop in props):
+                            ok = False
+                        else:
+                            csprop = o.PropertiesList[props.index(prop)]
+                            if not (fval in getattr(o,csprop).upper()):
+                                ok = False
+                if ok:
+                    nobjs.append(o)
+            objs = nobjs
+        return candidates,objs
+
+    def getValue(self,o,vals,depends=None):
+
+        """Returns the value of a property of an object, given as a list of
+        attribute names. Values are cached until the object changes. Values
+        read through a link to another object, like Base.Shape.Volume, are
+        not cached, and the names of the linked objects are added to depends"""
+
+        key = ".".join(vals)
+        cache = self.values.setdefault(o.Name,{})
+        if key in cache:
+            return cache[key]
+        d = o
+        linked = False
+        for v in vals:
+            d = getattr(d,v)
+            if hasattr(d,"InList"):
+                # a document object
+                linked = True
+                if depends is not None:
+                    depends.add(d.Name)
+        if hasattr(d,"Value"):
+            d = d.Value
+        if not linked:
+            cache[key] = d
+        return d
+
+    def getRowLines(self,obj,i,spec,objs,depends=None):
+
+        """Computes the lines of results of a row, from its list of objects.
+        Returns a list of {column:value} dictionaries, the first one being
+        the line of the row itself. The names of the other objects the values
+        are read from are added to depends"""
+
+        lines = [{}]
+        if not obj.Description[i]:
+            # blank line
+            return lines
+        # write description
+        if sys.version_info.major >= 3:
+            # use unicode for python3
+            lines[-1]["A"] = obj.Description[i]
+        else:
+            lines[-1]["A"] = obj.Description[i].encode("utf8")
+        if verbose:
+            l= "OPERATION: "+obj.Description[i]
+            print("")
+            print (l)
+            print (len(l)*"=")
+
+        val = obj.Value[i]
+        if not val:
+            return lines
+
+        # perform operation: count or retrieve property
+
+        if val.upper() == "COUNT":
+            val = len(objs)
             if verbose:
-                l= "OPERATION: "+obj.Description[i]
-                print("")
-                print (l)
-                print (len(l)*"=")
-
-            # build set of valid objects
-
-            objs = obj.Objects[i]
-            val = obj.Value[i]
-            if val:
-                import Draft,Arch
-                if objs:
-                    objs = objs.split(";")
-                    objs = [FreeCAD.ActiveDocument.getObject(o) for o in objs]
-                    objs = [o for o in objs if o != None]
+                print (val, ",".join([o.Label for o in objs]))
+            lines[-1]["B"] = str(val)
+            if obj.DetailedResults:
+                # additional blank line...
+                lines.append({"A":" "})
+        else:
+            vals = val.split(".")
+            if vals[0][0].islower():
+                # old-style: first member is not a property
+                vals = vals[1:]
+            sumval = 0
+
+            # get unit
+            tp = None
+            unit = None
+            q = None
+            if obj.Unit[i]:
+                unit = obj.Unit[i]
+                if sys.version_info.major < 3:
+                    unit = unit.encode("utf8")
+                unit = unit.replace("2","^2")
+                unit = unit.replace("3","^3")
+                unit = unit.replace("²","^2")
+                unit = unit.replace("³","^3")
+                if "2" in unit:
+                    tp = FreeCAD.Units.Area
+                elif "3" in unit:
+                    tp = FreeCAD.Units.Volume
+                elif "deg" in unit:
+                    tp = FreeCAD.Units.Angle
                 else:
-                    objs = FreeCAD.ActiveDocument.Objects
-                if len(objs) == 1:
-                    # remove object itself if the object is a group
-                    if objs[0].isDerivedFrom("App::DocumentObjectGroup"):
-                        objs = objs[0].Group
-                objs = Draft.getGroupContents(objs)
-                objs = Arch.pruneIncluded(objs,strict=True)
-                # remove the schedule object and its result from the list
-                objs = [o for o in objs if not o == obj]
-                objs = [o for o in objs if not o == obj.Result]
-                if obj.Filter[i]:
-                    # apply filters
-                    nobjs = []
-                    for o in objs:
-                        props = [p.upper() for p in o.PropertiesList]
-                        ok = True
-                        for f in obj.Filter[i].split(";"):
-                            args = [a.strip() for a in f.strip().split(":")]
-                            if args[0][0] == "!":
-                                inv = True
-                                prop = args[0][1:].upper()
-                            else:
-                                inv = False
-                                prop = args[0].upper()
-                            fval = args[1].upper()
-                            if prop == "TYPE":
-                                prop == "IFCTYPE"
-                            if inv:
-                                if prop in props:
-                                    csprop = o.PropertiesList[props.index(prop)]
-                                    if fval in getattr(o,csprop).upper():
-                                        ok = False
-                            else:
-                                if not (prop in props):
-                                    ok = False
-                                else:
-                                    csprop = o.PropertiesList[props.index(prop)]
-                                    if not (fval in getattr(o,csprop).upper()):
-                                        ok = False
-                        if ok:
-                            nobjs.append(o)
-                    objs = nobjs
-
-                # perform operation: count or retrieve property
-
-                if val.upper() == "COUNT":
-                    val = len(objs)
-                    if verbose:
-                        print (val, ",".join([o.Label for o in objs]))
-                    self.data["B"+str(li)] = str(val)
-                    if obj.DetailedResults:
-                        # additional blank line...
-                        li += 1
-                        self.data["A"+str(li)] = " "
+                    tp = FreeCAD.Units.Length
+
+            # format value
+            dv = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Units").GetInt("Decimals",2)
+            fs = "{:."+str(dv)+"f}" # format string
+            for o in objs:
+                if verbose:
+                    l = o.Name+" ("+o.Label+"):"
+                    print (l+(40-len(l))*" ",end="")
+                try:
+                    d = self.getValue(o,vals,depends)
+                except:
+                    FreeCAD.Console.PrintWarning(translate("Arch","Unable to retrieve value from object")+": "+o.Name+"."+".".join(vals)+"\n")
                 else:
-                    vals = val.split(".")
-                    if vals[0][0].islower():
-                        # old-style: first member is not a property
-                        vals = vals[1:]
-                    sumval = 0
-
-                    # get unit
-                    tp = None
-                    unit = None
-                    q = None
-                    if obj.Unit[i]:
-                        unit = obj.Unit[i]
-                        if sys.version_info.major < 3:
-                            unit = unit.encode("utf8")
-                        unit = unit.replace("2","^2")
-                        unit = unit.replace("3","^3")
-                        unit = unit.replace("²","^2")
-                        unit = unit.replace("³","^3")
-                        if "2" in unit:
-                            tp = FreeCAD.Units.Area
-                        elif "3" in unit:
-                            tp = FreeCAD.Units.Volume
-                        elif "deg" in unit:
-                            tp = FreeCAD.Units.Angle
-                        else:
-                            tp = FreeCAD.Units.Length
-
-                    # format value
-                    dv = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Units").GetInt("Decimals",2)
-                    fs = "{:."+str(dv)+"f}" # format string
-                    for o in objs:
-                        if verbose:
-                            l = o.Name+" ("+o.Label+"):"
-                            print (l+(40-len(l))*" ",end="")
-                        try:
-                            d = o
-                            for v in vals:
-                                d = getattr(d,v)
-                            if hasattr(d,"Value"):
-                                d = d.Value
-                        except:
-                            FreeCAD.Console.PrintWarning(translate("Arch","Unable to retrieve value from object")+": "+o.Name+"."+".".join(vals)+"\n")
+                    if verbose:
+                        if tp and unit:
+                            v = fs.format(FreeCAD.Units.Quantity(d,tp).getValueAs(unit).Value)
+                            print(v,unit)
                         else:
-                            if verbose:
-                                if tp and unit:
-                                    v = fs.format(FreeCAD.Units.Quantity(d,tp).getValueAs(unit).Value)
-                                    print(v,unit)
-                                else:
-                                    print(fs.format(d))
-                            if obj.DetailedResults:
-                                li += 1
-                                self.data["A"+str(li)] = o.Name+" ("+o.Label+")"
-                                if tp and unit:
-                                    q = FreeCAD.Units.Quantity(d,tp)
-                                    self.data["B"+str(li)] = str(q.getValueAs(unit).Value)
-                                    self.data["C"+str(li)] = unit
-                                else:
-                                    self.data["B"+str(li)] = str(d)
-
-                            if not sumval:
-                                sumval = d
-                            else:
-                                sumval += d
-                    val = sumval
-                    if tp:
-                        q = FreeCAD.Units.Quantity(val,tp)
-
-                    # write data
-                    if obj.DetailedResults:
-                        li += 1
-                        self.data["A"+str(li)] = "TOTAL"
-                    if q and unit:
-                        self.data["B"+str(li)] = str(q.getValueAs(unit).Value)
-                        self.data["C"+str(li)] = unit
-                    else:
-                        self.data["B"+str(li)] = str(val)
+                            print(fs.format(d))
                     if obj.DetailedResults:
-                        # additional blank line...
-                        li += 1
-                        self.data["A"+str(li)] = " "
-                    if verbose:
+                        lines.append({"A":o.Name+" ("+o.Label+")"})
                         if tp and unit:
-                            v = fs.format(FreeCAD.Units.Quantity(val,tp).getValueAs(unit).Value)
-                            print("TOTAL:"+34*" "+v+" "+unit)
+                            q = FreeCAD.Units.Quantity(d,tp)
+                            lines[-1]["B"] = str(q.getValueAs(unit).Value)
+                            lines[-1]["C"] = unit
                         else:
-                            v = fs.format(val)
-                            print("TOTAL:"+34*" "+v)
-        self.setSpreadsheetData(obj)
+                            lines[-1]["B"] = str(d)
+
+                    if not sumval:
+                        sumval = d
+                    else:
+                        sumval += d
+            val = sumval
+            if tp:
+                q = FreeCAD.Units.Quantity(val,tp)
+
+            # write data
+            if obj.DetailedResults:
+                lines.append({"A":"TOTAL"})
+            if q and unit:
+                lines[-1]["B"] = str(q.getValueAs(unit).Value)
+                lines[-1]["C"] = unit
+            else:
+                lines[-1]["B"] = str(val)
+            if obj.DetailedResults:
+                # additional blank line...
+                lines.append({"A":" "})
+            if verbose:
+                if tp and unit:
+                    v = fs.format(FreeCAD.Units.Quantity(val,tp).getValueAs(unit).Value)
+                    print("TOTAL:"+34*" "+v+" "+unit)
+                else:
+                    v = fs.format(val)
+                    print("TOTAL:"+34*" "+v)
+        return lines
 
     def __getstate__(self):
 
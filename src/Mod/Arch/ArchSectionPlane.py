@@ -33,6 +33,7 @@ import uuid
 import time
 
 from FreeCAD import Vector
+from collections import OrderedDict
 if FreeCAD.GuiUp:
     import FreeCADGui
     from PySide import QtCore, QtGui
@@ -151,19 +152,189 @@ def looksLikeDraft(o):
     return o.Shape.Volume < 0.0000001 # add a little tolerance...
 
 
-def getCutShapes(objs,cutplane,onlySolids,clip,joinArch,showHidden,groupSshapesByObject=False):
+class ShapeCache:
+
+    """A small least-recently-used cache of boolean results, used by getCutShapes.
+    The keys are made of shape hashes, and the source shapes are kept with each
+    result, so a hash can not be reused by another shape while the result is
+    in the cache. The shapes are also compared with isSame() on lookup."""
+
+    def __init__(self,maxsize):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self,key,shapes):
+        entry = self.items.pop(key,None)
+        if (entry is None) or (len(entry[0]) != len(shapes)) \
+                or not all(a.isSame(b) for a,b in zip(entry[0],shapes)):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.items[key] = entry
+        return entry[1]
+
+    def put(self,key,shapes,value):
+        self.items[key] = (list(shapes),value)
+        while len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+
+    def clear(self):
+        self.items.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.items)
+
+
+# results of cutting a solid, keyed by the hash of the solid and the cut plane
+CUTCACHE = ShapeCache(2048)
+
+# walls and structures fused by material when joinArch is on
+FUSECACHE = ShapeCache(64)
+
+
+def getPlaneKey(cutplane,clip,showHidden):
+
+    """returns a value identifying the position and size of a cut plane, and
+    the options that change the cut results"""
+
+    face = cutplane.Shape.Faces[0] if hasattr(cutplane,"Shape") else cutplane.Faces[0]
+    pts = tuple(tuple(round(c,6) for c in v.Point) for v in face.Vertexes)
+    return (pts,bool(clip),bool(showHidden))
+
+
+def getBoxSide(boundbox,point,normal,tolerance=1e-7):
+
+    """returns 1 if the given boundbox lies entirely on the side of the plane
+    defined by point and normal the normal points to, -1 if it lies entirely on
+    the other side, or 0 if it crosses the plane"""
+
+    dists = []
+    for x in (boundbox.XMin,boundbox.XMax):
+        for y in (boundbox.YMin,boundbox.YMax):
+            for z in (boundbox.ZMin,boundbox.ZMax):
+                dists.append(FreeCAD.Vector(x,y,z).sub(point).dot(normal))
+    if min(dists) > tolerance:
+        return 1
+    if max(dists) < -tolerance:
+        return -1
+    return 0
+
+
+def cutSolid(sol,cutvolume,cutface,invcutvolume,showHidden):
+
+    """cutSolid(sol,cutvolume,cutface,invcutvolume,showHidden): cuts a solid
+    with the cut volume. Returns a list of remaining solids, a list of section
+    faces and a list of hidden shapes"""
+
+    import Part,DraftGeomUtils
+    sshapes = []
+    hshapes = []
+    c = sol.cut(cutvolume)
+    s = sol.section(cutface)
+    try:
+        wires = DraftGeomUtils.findWires(s.Edges)
+        for w in wires:
+            f = Part.Face(w)
+            sshapes.append(f)
+    except Part.OCCError:
+        #print "ArchDrawingView: unable to get a face"
+        sshapes.append(s)
+    if showHidden:
+        hshapes.append(sol.cut(invcutvolume))
+    return c.Solids,sshapes,hshapes
+
+
+# cut tools of the worker processes of getCutShapes
+WORKERTOOLS = None
+
+def _initCutWorker(breps):
+
+    """stores the cut tools in a worker process"""
+
+    import Part
+    global WORKERTOOLS
+    WORKERTOOLS = []
+    for brep in breps:
+        sh = None
+        if brep:
+            sh = Part.Shape()
+            sh.importBrepFromString(brep)
+        WORKERTOOLS.append(sh)
+
+def _cutSolidInWorker(args):
+
+    """cuts a solid given in BREP format in a worker process, and returns
+    the results in BREP format"""
+
+    import Part
+    brep,showHidden = args
+    sol = Part.Shape()
+    sol.importBrepFromString(brep)
+    sol = sol.Solids[0]
+    cutvolume,cutface,invcutvolume = WORKERTOOLS
+    result = cutSolid(sol,cutvolume,cutface,invcutvolume,showHidden)
+    return [[sh.exportBrepToString() for sh in shapes] for shapes in result]
+
+
+def cutSolids(solids,cutvolume,cutface,invcutvolume,showHidden,workers=0):
+
+    """cuts a list of solids, in a pool of worker processes if workers
+    is bigger than 1. Returns a list of results of cutSolid()"""
+
+    if (workers > 1) and (len(solids) > 1):
+        import multiprocessing
+        import Part
+        tools = [cutvolume.exportBrepToString(),cutface.exportBrepToString(),
+                 invcutvolume.exportBrepToString() if invcutvolume else None]
+        try:
+            pool = multiprocessing.Pool(workers,_initCutWorker,(tools,))
+            try:
+                breps = pool.map(_cutSolidInWorker,[(sol.exportBrepToString(),showHidden) for sol in solids])
+            finally:
+                pool.terminate()
+        except Exception as e:
+            FreeCAD.Console.PrintWarning(translate("Arch","Unable to use worker processes, cutting in this process:")+" "+str(e)+"\n")
+        else:
+            results = []
+            for result in breps:
+                shapes = []
+                for bl in result:
+                    l = []
+                    for brep in bl:
+                        sh = Part.Shape()
+                        sh.importBrepFromString(brep)
+                        l.append(sh)
+                    shapes.append(l)
+                results.append(shapes)
+            return results
+    return [cutSolid(sol,cutvolume,cutface,invcutvolume,showHidden) for sol in solids]
+
+
+def getCutShapes(objs,cutplane,onlySolids,clip,joinArch,showHidden,groupSshapesByObject=False,workers=None):
     
     """
     returns a list of shapes (visible, hidden, cut lines...) 
-    obtained from performing a series of booleans against the given cut plane
+    obtained from performing a series of booleans against the given cut plane.
+
+    Solids whose bounding box lies on one side of the cut plane are not cut.
+    The other ones are cut once, and the results are kept in CUTCACHE until
+    the solid or the cut plane change. If workers is bigger than 1, the solids
+    are cut in that number of processes. By default it is taken from the
+    SectionWorkers preference.
     """
 
-    import Part,DraftGeomUtils
+    import Part
     shapes = []
     hshapes = []
     sshapes = []
     objectShapes = []
     objectSshapes = []
+    if workers is None:
+        workers = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Arch").GetInt("SectionWorkers",0)
 
     if joinArch:
         shtypes = {}
@@ -174,7 +345,7 @@ def getCutShapes(objs,cutplane,onlySolids,clip,joinArch,showHidden,groupSshapesB
                 elif onlySolids:
                     shtypes.setdefault(o.Material.Name if (hasattr(o,"Material") and o.Material) else "None",[]).extend(o.Shape.Solids)
                 else:
-                    shtypes.setdefault(o.Material.Name if (hasattr(o,"Material") and o.Material) else "None",[]).append(o.Shape.copy())
+                    shtypes.setdefault(o.Material.Name if (hasattr(o,"Material") and o.Material) else "None",[]).append(o.Shape)
             elif hasattr(o,'Shape'):
                 if o.Shape.isNull():
                     pass
@@ -182,13 +353,19 @@ def getCutShapes(objs,cutplane,onlySolids,clip,joinArch,showHidden,groupSshapesB
                     shapes.extend(o.Shape.Solids)
                     objectShapes.append((o, o.Shape.Solids))
                 else:
-                    shapes.append(o.Shape.copy())
-                    objectShapes.append((o,[o.Shape.copy()]))
+                    shapes.append(o.Shape)
+                    objectShapes.append((o,[o.Shape]))
         for k,v in shtypes.items():
-            v1 = v.pop()
-            if v:
-                v1 = v1.multiFuse(v)
-                v1 = v1.removeSplitter()
+            # fusing is only done again when one of the shapes changed
+            fkey = (k,)+tuple(sh.hashCode() for sh in v)
+            v1 = FUSECACHE.get(fkey,v)
+            if v1 is None:
+                sources = list(v)
+                v1 = v.pop()
+                if v:
+                    v1 = v1.multiFuse(v)
+                    v1 = v1.removeSplitter()
+                FUSECACHE.put(fkey,sources,v1)
             if v1.Solids:
                 shapes.extend(v1.Solids)
                 objectShapes.append((k,v1.Solids))
@@ -212,29 +389,50 @@ def getCutShapes(objs,cutplane,onlySolids,clip,joinArch,showHidden,groupSshapesB
     cutface,cutvolume,invcutvolume = ArchCommands.getCutVolume(cutplane,shapes,clip)
     shapes = []
     if cutvolume:
+        face = cutplane.Shape.Faces[0] if hasattr(cutplane,"Shape") else cutplane.Faces[0]
+        center = face.CenterOfMass
+        normal = face.normalAt(0,0)
+        planekey = getPlaneKey(cutplane,clip,showHidden)
+
+        # find the solids crossing the cut plane, and those not in the cache
+        solids = []
+        results = []
+        todo = []
         for o, shapeList in objectShapes:
-            tmpSshapes = []
             for sh in shapeList:
                 for sol in sh.Solids:
                     if sol.Volume < 0:
                         sol.reverse()
-                    c = sol.cut(cutvolume)
-                    s = sol.section(cutface)
-                    try:
-                        wires = DraftGeomUtils.findWires(s.Edges)
-                        for w in wires:
-                            f = Part.Face(w)
-                            tmpSshapes.append(f)
-                        #s = Part.Wire(s.Edges)
-                        #s = Part.Face(s)
-                    except Part.OCCError:
-                        #print "ArchDrawingView: unable to get a face"
-                        tmpSshapes.append(s)
-                    shapes.extend(c.Solids)
-                    #sshapes.append(s)
-                    if showHidden:
-                        c = sol.cut(invcutvolume)
-                        hshapes.append(c)
+                    solids.append(sol)
+                    side = getBoxSide(sol.BoundBox,center,normal)
+                    if side == 1:
+                        # entirely inside the cut volume
+                        results.append(([],[],[sol] if showHidden else []))
+                    elif (side == -1) and not clip:
+                        # entirely on the visible side
+                        results.append(([sol],[],[]))
+                    else:
+                        key = (sol.hashCode(),planekey)
+                        result = CUTCACHE.get(key,[sol])
+                        results.append(result)
+                        if result is None:
+                            todo.append((len(results)-1,key))
+
+        if todo:
+            cuts = cutSolids([solids[i] for i,key in todo],cutvolume,cutface,invcutvolume,showHidden,workers)
+            for (i,key),result in zip(todo,cuts):
+                CUTCACHE.put(key,[solids[i]],result)
+                results[i] = result
+
+        i = 0
+        for o, shapeList in objectShapes:
+            tmpSshapes = []
+            for n in range(sum(len(sh.Solids) for sh in shapeList)):
+                c,s,h = results[i]
+                shapes.extend(c)
+                tmpSshapes.extend(s)
+                hshapes.extend(h)
+                i += 1
 
             if len(tmpSshapes) > 0:
                 sshapes.extend(tmpSshapes)
@@ -500,10 +698,9 @@ def getSVG(source,
     if drafts:
         if not techdraw:
             svg += '<g transform="scale(1,-1)">'
-        for d in drafts:
-            svg += Draft.getSVG(d, scale=scale, linewidth=svgSymbolLineWidth,
-                                fontsize=fontsize, direction=direction, color=lineColor,
-                                techdraw=techdraw, rotation=rotation)
+        svg += "".join(Draft.getSVGFragments(drafts, scale=scale, linewidth=svgSymbolLineWidth,
+                                             fontsize=fontsize, direction=direction, color=lineColor,
+                                             techdraw=techdraw, rotation=rotation))
         if not techdraw:
             svg += '</g>'
 
@@ -517,10 +714,9 @@ def getSVG(source,
     if spaces:
         if not techdraw:
             svg += '<g transform="scale(1,-1)">'
-        for s in spaces:
-            svg += Draft.getSVG(s, scale=scale, linewidth=svgSymbolLineWidth,
-                                fontsize=fontsize, direction=direction, color=lineColor,
-                                techdraw=techdraw, rotation=rotation, fillSpaces=fillSpaces)
+        svg += "".join(Draft.getSVGFragments(spaces, scale=scale, linewidth=svgSymbolLineWidth,
+                                             fontsize=fontsize, direction=direction, color=lineColor,
+                                             techdraw=techdraw, rotation=rotation, fillSpaces=fillSpaces))
         if not techdraw:
             svg += '</g>'
 
@@ -547,12 +743,11 @@ def getSVG(source,
         if sh:
             if not techdraw:
                 svg += '<g transform="scale(1,-1)">'
-            for s in sh:
-                svg += Draft.getSVG(s, scale=scale,
-                                    linewidth=svgSymbolLineWidth,
-                                    fontsize=fontsize, fillstyle="none",
-                                    direction=direction, color=lineColor,
-                                    techdraw=techdraw, rotation=rotation)
+            svg += "".join(Draft.getSVGFragments(sh, scale=scale,
+                                                 linewidth=svgSymbolLineWidth,
+                                                 fontsize=fontsize, fillstyle="none",
+                                                 direction=direction, color=lineColor,
+                                                 techdraw=techdraw, rotation=rotation))
             if not techdraw:
                 svg += '</g>'
 
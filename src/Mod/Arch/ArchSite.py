@@ -720,23 +720,15 @@ class _Site(ArchIFC.IfcProduct):
             if f.normalAt(0,0).getAngle(FreeCAD.Vector(0,0,1)) < 1.5707:
                 fset.append(f)
         if fset:
-            import Drawing,Part
-            pset = []
-            for f in fset:
-                try:
-                    pf = Part.Face(Part.Wire(Drawing.project(f,FreeCAD.Vector(0,0,1))[0].Edges))
-                except Part.OCCError:
-                    # error in computing the area. Better set it to zero than show a wrong value
-                    if obj.ProjectedArea.Value != 0:
-                        print("Error computing areas for ",obj.Label)
-                        obj.ProjectedArea = 0
-                else:
-                    pset.append(pf)
-            if pset:
-                self.flatarea = pset.pop()
-                for f in pset:
-                    self.flatarea = self.flatarea.fuse(f)
-                self.flatarea = self.flatarea.removeSplitter()
+            import Part,ArchComponent
+            try:
+                self.flatarea = ArchComponent.getFlatArea(fset)
+            except Part.OCCError:
+                # error in computing the area. Better set it to zero than show a wrong value
+                if obj.ProjectedArea.Value != 0:
+                    print("Error computing areas for ",obj.Label)
+                    obj.ProjectedArea = 0
+            else:
                 if obj.ProjectedArea.Value != self.flatarea.Area:
                     obj.ProjectedArea = self.flatarea.Area
 
@@ -32,8 +32,6 @@ import FreeCAD,math,Part,ArchCommands,DraftVecUtils,DraftGeomUtils
 #  It is used by the "Solid" mode of Arch views in TechDraw and Drawing,
 #  and is called from ArchSectionPlane code.
 
-MAXLOOP = 10 # the max number of loop before abort
-
 # WARNING: in this module, faces are lists whose first item is the actual OCC face, the
 # other items being additional information such as color, etc.
 
@@ -157,9 +155,9 @@ class Renderer:
         #print("VRM: start reorient")
         if not self.faces: 
             return
-        self.faces = [self.projectFace(f) for f in self.faces]
+        self.faces = self.projectFaces(self.faces)
         if self.sections:
-            self.sections = [self.projectFace(f) for f in self.sections]
+            self.sections = self.projectFaces(self.sections)
         if self.hiddenEdges:
             self.hiddenEdges = [self.projectEdge(e) for e in self.hiddenEdges]
         self.oriented = True
@@ -179,37 +177,54 @@ class Renderer:
 
     def projectFace(self,face):
         "projects a single face on the WP"
-        #print("VRM: projectFace start: ",len(face[0].Vertexes)," verts, ",len(face[0].Edges)," edges")
-        wires = []
-        if not face[0].Wires:
-            if DEBUG: print("Error: Unable to project face on the WP")
-            return None
-        norm = face[0].normalAt(0,0)
-        for w in face[0].Wires:
-            verts = []
-            edges = Part.__sortEdges__(w.Edges)
-            #print(len(edges)," edges after sorting")
-            for e in edges:
-                v = e.Vertexes[0].Point
-                #print(v)
-                v = self.wp.getLocalCoords(v)
-                verts.append(v)
-            verts.append(verts[0])
-            if len(verts) > 2:
-                #print("new wire with ",len(verts))
-                wires.append(Part.makePolygon(verts))
-        try:
-            sh = ArchCommands.makeFace(wires)
-        except:
-            if DEBUG: print("Error: Unable to project face on the WP")
-            return None
-        else:
-            # restoring flipped normals
-            vnorm = self.wp.getLocalCoords(norm)
-            if vnorm.getAngle(sh.normalAt(0,0)) > 1:
-                sh.reverse()
-            #print("VRM: projectFace end: ",len(sh.Vertexes)," verts")
-            return [sh]+face[1:]
+        return self.projectFaces([face])[0]
+
+    def projectFaces(self,faces):
+        "projects a list of faces on the WP, transforming all their vertices at once"
+        points = []
+        data = []
+        for face in faces:
+            if (not face) or (not face[0].Wires):
+                if DEBUG: print("Error: Unable to project face on the WP")
+                data.append(None)
+                continue
+            counts = []
+            for w in face[0].Wires:
+                edges = Part.__sortEdges__(w.Edges)
+                points.extend([e.Vertexes[0].Point for e in edges])
+                counts.append(len(edges))
+            # the normal is transformed as a direction, relative to the WP position
+            points.append(self.wp.position.add(face[0].normalAt(0,0)))
+            data.append(counts)
+        if not points:
+            return [None for face in faces]
+        local = self.wp.getLocalCoordsBatch(points)
+        result = []
+        i = 0
+        for face,counts in zip(faces,data):
+            if counts is None:
+                result.append(None)
+                continue
+            wires = []
+            for count in counts:
+                verts = local[i:i+count]
+                i += count
+                verts.append(verts[0])
+                if len(verts) > 2:
+                    wires.append(Part.makePolygon(verts))
+            vnorm = local[i]
+            i += 1
+            try:
+                sh = ArchCommands.makeFace(wires)
+            except:
+                if DEBUG: print("Error: Unable to project face on the WP")
+                result.append(None)
+            else:
+                # restoring flipped normals
+                if vnorm.getAngle(sh.normalAt(0,0)) > 1:
+                    sh.reverse()
+                result.append([sh]+face[1:])
+        return result
 
     def projectEdge(self,edge):
         "projects a single edge on the WP"
@@ -263,7 +278,7 @@ class Renderer:
                             faces.append([f]+sh[1:])
                             #print("iscoplanar:",f.Vertexes[0].Point,f.normalAt(0,0),cutface.Vertexes[0].Point,cutface.normalAt(0,0))
                             if DraftGeomUtils.isCoplanar([f,cutface]):
-                                print("COPLANAR")
+                                if DEBUG: print("COPLANAR")
                                 sections.append([f,fill])
                         if hidden:
                             c = sol.cut(invcutvolume)
@@ -449,30 +464,33 @@ class Renderer:
                         s = fs
                 objs.append([s,col])
 
-    def findPosition(self,f1,faces):
-        "Finds the position of a face in a list of faces"
-        l = None
-        h = None
-        for f2 in faces:
-            if DEBUG: print("comparing face",str(self.faces.index(f1))," with face",str(self.faces.index(f2)))
-            r = self.compare(f1,f2)
-            if r == 1:
-                l = faces.index(f2)
-            elif r == 2:
-                if h is None:
-                    h = faces.index(f2)
-                else:
-                    if faces.index(f2) < h:
-                        h = faces.index(f2)
-        if l != None:
-            return l + 1
-        elif h != None:
-            return h
-        else:
-            return None
+    def getOverlapCandidates(self,boxes):
+        """returns the pairs of indices of the given boundboxes that overlap in the
+        XY plane, using a uniform grid so that only boxes sharing a cell are tested"""
+        xmin = min(b.XMin for b in boxes)
+        ymin = min(b.YMin for b in boxes)
+        extent = max(max(b.XMax for b in boxes)-xmin,max(b.YMax for b in boxes)-ymin)
+        size = (extent/max(1,int(math.sqrt(len(boxes))))) or 1.0
+        cells = {}
+        for i,b in enumerate(boxes):
+            for cx in range(int((b.XMin-xmin)//size),int((b.XMax-xmin)//size)+1):
+                for cy in range(int((b.YMin-ymin)//size),int((b.YMax-ymin)//size)+1):
+                    cells.setdefault((cx,cy),[]).append(i)
+        pairs = set()
+        for items in cells.values():
+            for n,i in enumerate(items):
+                bi = boxes[i]
+                for j in items[n+1:]:
+                    bj = boxes[j]
+                    if (bi.XMax >= bj.XMin) and (bi.XMin <= bj.XMax) and (bi.YMax >= bj.YMin) and (bi.YMin <= bj.YMax):
+                        pairs.add((i,j))
+        return pairs
 
     def sort(self):
-        "projects a shape on the WP"
+        """sorts the faces from back to front. Only the faces whose boxes overlap
+        are compared, and the faces are ordered by a topological sort of the
+        resulting graph, the farthest faces first. Cycles are broken at the face
+        with the fewest faces behind it"""
         if DEBUG: print("\n\n======> Starting sort\n\n")
         if len(self.faces) <= 1:
             return
@@ -484,66 +502,52 @@ class Renderer:
         if not self.oriented:
             self.reorient()
             if DEBUG: print("Done reorientation")
-        faces = self.faces[:]
-        if DEBUG: print("sorting ",len(self.faces)," faces")
+        import heapq
+        faces = [f for f in self.faces if f]
+        if not faces:
+            self.faces = []
+            self.sorted = True
+            return
+        boxes = [f[0].BoundBox for f in faces]
+
+        # build the graph: an edge from i to j means face i is behind face j
+        front = [[] for f in faces]
+        behind = [0 for f in faces]
+        pairs = self.getOverlapCandidates(boxes)
+        for i,j in pairs:
+            r = self.compare(faces[i],faces[j])
+            if r == 1:
+                front[j].append(i)
+                behind[i] += 1
+            elif r == 2:
+                front[i].append(j)
+                behind[j] += 1
+        if DEBUG: print("sorting ",len(faces)," faces, ",len(pairs)," comparisons")
+
+        # topological sort, taking the farthest available face first
+        depth = [(b.ZMin+b.ZMax)/2 for b in boxes]
+        heap = [(depth[i],i) for i in range(len(faces)) if not behind[i]]
+        heapq.heapify(heap)
+        done = [False for f in faces]
         sfaces = []
-        loopcount = 0
-        notfoundstack = 0
-        while faces:
-            if DEBUG: print("loop ", loopcount)
-            f1 = faces[0]
-            if sfaces and (notfoundstack < len(faces)):
-                if DEBUG: print("using ordered stack, notfound = ",notfoundstack)
-                p = self.findPosition(f1,sfaces)
-                if p is None:
-                    # no position found, we move the face to the end of the pile
-                    faces.remove(f1)
-                    faces.append(f1)
-                    notfoundstack += 1
-                else:
-                    # position found, we insert it
-                    faces.remove(f1)
-                    sfaces.insert(p,f1)
-                    notfoundstack = 0
+        cycles = 0
+        while len(sfaces) < len(faces):
+            if not heap:
+                # only cycles remain
+                i = min((i for i in range(len(faces)) if not done[i]),key=lambda i:(behind[i],depth[i]))
+                cycles += 1
             else:
-                # either there is no stack, or no more face can be compared
-                # find a root, 2 faces that can be compared
-                if DEBUG: print("using unordered stack, notfound = ",notfoundstack)
-                for f2 in faces[1:]:
-                    if DEBUG: print("comparing face",str(self.faces.index(f1))," with face",str(self.faces.index(f2)))
-                    r = self.compare(f1,f2)
-                    print("comparison result:",r)
-                    if r == 1:
-                        faces.remove(f2)
-                        sfaces.append(f2)
-                        faces.remove(f1)
-                        sfaces.append(f1)
-                        notfoundstack = 0
-                        break
-                    elif r == 2:
-                        faces.remove(f1)
-                        sfaces.append(f1)
-                        faces.remove(f2)
-                        sfaces.append(f2)
-                        notfoundstack = 0
-                        break
-                    elif r == 31:
-                        if f1 in faces:
-                            faces.remove(f1)
-                    elif r == 32:
-                        if f2 in faces:
-                            faces.remove(f2)
-                else:
-                    # nothing found, move the face to the end of the pile
-                    if f1 in faces:
-                        faces.remove(f1)
-                        faces.append(f1)
-            loopcount += 1
-            if loopcount == MAXLOOP * len(self.faces):
-                if DEBUG: print("Too many loops, aborting.")
-                break
-
-        if DEBUG: print("done Z sorting. ", len(sfaces), " faces retained, ", len(self.faces)-len(sfaces), " faces lost.")
+                i = heapq.heappop(heap)[1]
+                if done[i]:
+                    continue
+            done[i] = True
+            sfaces.append(faces[i])
+            for j in front[i]:
+                behind[j] -= 1
+                if (behind[j] == 0) and not done[j]:
+                    heapq.heappush(heap,(depth[j],j))
+
+        if DEBUG: print("done Z sorting. ", len(sfaces), " faces retained, ", cycles, " cycles broken.")
         self.faces = sfaces
         self.sorted = True
         if DEBUG: print("\n\n======> Finished sort\n\n")
@@ -119,6 +119,23 @@ class ArchTest(unittest.TestCase):
         v = Arch.makeSectionView(s)
         self.failUnless(v,"Arch Section failed")
 
+    def testSectionCutCache(self):
+        FreeCAD.Console.PrintLog ('Checking Arch Section cut cache...\n')
+        import ArchSectionPlane
+        objs = []
+        for i in range(20):
+            objs.append(Arch.makeStructure(length=2000,width=2000,height=1000))
+            objs[-1].Placement.Base = FreeCAD.Vector(0,0,i*1000)
+        s = Arch.makeSectionPlane(objs)
+        s.Placement = FreeCAD.Placement(FreeCAD.Vector(0,0,1500),FreeCAD.Rotation())
+        FreeCAD.ActiveDocument.recompute()
+        ArchSectionPlane.CUTCACHE.clear()
+        r1 = ArchSectionPlane.getCutShapes(objs,s,True,False,False,False)
+        r2 = ArchSectionPlane.getCutShapes(objs,s,True,False,False,False)
+        r = (len(r1[0]) == 2) and (len(r1[2]) == 1) and (len(r2[0]) == 2) \
+            and (ArchSectionPlane.CUTCACHE.misses == 1) and (ArchSectionPlane.CUTCACHE.hits == 1)
+        self.failUnless(r,"Arch Section cut cache failed")
+
     def testSpace(self):
         FreeCAD.Console.PrintLog ('Checking Arch Space...\n')
         sb = Part.makeBox(1,1,1)
@@ -165,6 +182,239 @@ class ArchTest(unittest.TestCase):
         r = (w.Shape.Volume < 0.75)
         self.failUnless(r,"Arch Remove failed")
 
+    def testAreas(self):
+        FreeCAD.Console.PrintLog ('Checking Arch areas...\n')
+        import math
+        n = 120
+        p = Draft.makePolygon(n,radius=1000)
+        s = Arch.makeStructure(p,height=100)
+        FreeCAD.ActiveDocument.recompute()
+        area = 0.5*n*1000*1000*math.sin(2*math.pi/n)
+        side = 2*1000*math.sin(math.pi/n)
+        r = (abs(s.HorizontalArea.Value-area) < 0.001) and (abs(s.VerticalArea.Value-n*side*100) < 0.001) \
+            and (abs(s.PerimeterLength.Value-n*side) < 0.001)
+        self.failUnless(r,"Arch areas failed")
+        # a new shape must not reuse the cached areas
+        s.Height = 200
+        FreeCAD.ActiveDocument.recompute()
+        r = (abs(s.HorizontalArea.Value-area) < 0.001) and (abs(s.VerticalArea.Value-n*side*200) < 0.001)
+        self.failUnless(r,"Arch areas not updated")
+
+    def testVRMSort(self):
+        FreeCAD.Console.PrintLog ('Checking Arch VRM sorting...\n')
+        import ArchVRM, WorkingPlane
+        def square(x1,y1,x2,y2,z1,z2=None):
+            if z2 is None:
+                z2 = z1
+            return Part.Face(Part.makePolygon([FreeCAD.Vector(x1,y1,z1),FreeCAD.Vector(x2,y1,z2),
+                                               FreeCAD.Vector(x2,y2,z2),FreeCAD.Vector(x1,y2,z1),
+                                               FreeCAD.Vector(x1,y1,z1)]))
+        # seen from above: a face rising from z=0 to z=30, a face above its low end
+        # at z=12, a face below its high end at z=18, and a separate face at z=5.
+        # Sorting by depth only would put the face at z=12 before the rising face
+        render = ArchVRM.Renderer(WorkingPlane.plane())
+        render.addFaces([square(0,0,30,10,0,30)],(1.0,0.0,0.0,1.0))
+        render.addFaces([square(2,2,8,8,12)],(0.0,1.0,0.0,1.0))
+        render.addFaces([square(20,2,28,8,18)],(0.0,0.0,1.0,1.0))
+        render.addFaces([square(40,0,50,10,5)],(1.0,1.0,0.0,1.0))
+        render.sort()
+        order = [f[1] for f in render.faces]
+        expected = [(1.0,1.0,0.0,1.0),(0.0,0.0,1.0,1.0),(1.0,0.0,0.0,1.0),(0.0,1.0,0.0,1.0)]
+        self.failUnless(order == expected,"Arch VRM sorting failed")
+
+    def testNesting(self):
+        FreeCAD.Console.PrintLog ('Checking Arch Nesting...\n')
+        import ArchNesting, random
+        # rectangular and triangular pieces of various sizes, nested in 2440x1220 sheets
+        rand = random.Random(1)
+        container = Part.Face(Part.makePolygon([FreeCAD.Vector(0,0,0),FreeCAD.Vector(2440,0,0),
+                                                FreeCAD.Vector(2440,1220,0),FreeCAD.Vector(0,1220,0),
+                                                FreeCAD.Vector(0,0,0)]))
+        shapes = []
+        for i in range(40):
+            w = rand.choice([100,150,200,300,400,600])
+            h = rand.choice([50,100,200,300])
+            x = i*1000
+            if i % 5:
+                pts = [FreeCAD.Vector(x,0,0),FreeCAD.Vector(x+w,0,0),FreeCAD.Vector(x+w,h,0),FreeCAD.Vector(x,h,0)]
+            else:
+                pts = [FreeCAD.Vector(x,0,0),FreeCAD.Vector(x+w,0,0),FreeCAD.Vector(x,h,0)]
+            shapes.append(Part.Face(Part.makePolygon(pts+[pts[0]])))
+        n = ArchNesting.Nester(container,shapes,"polygons")
+        n.run()
+        sheets = n.results[-1] if n.results else []
+        r = (sum(len(sheet) for sheet in sheets) == 40)
+        for sheet in sheets:
+            for i,p1 in enumerate(sheet):
+                for p2 in sheet[:i]:
+                    if p1[1].common(p2[1]).Area > 0.001:
+                        r = False
+        self.failUnless(r,"Arch Nesting failed")
+
+    def testScheduleIncremental(self):
+        FreeCAD.Console.PrintLog ('Checking Arch Schedule incremental mode...\n')
+        import ArchSchedule
+        doc = FreeCAD.ActiveDocument
+        objs = [Arch.makeStructure(length=1000,width=1000,height=1000) for i in range(10)]
+        box = doc.addObject("Part::Box","Box")
+        box.Length = box.Width = box.Height = 1000
+        based = Arch.makeStructure(box)
+        doc.recompute()
+        sch = doc.addObject("App::FeaturePython","Schedule")
+        ArchSchedule._ArchSchedule(sch)
+        sch.Description = ["Count","Volume","Base volume"]
+        sch.Value = ["Count","Shape.Volume","Base.Shape.Volume"]
+        sch.Unit = ["","",""]
+        sch.Objects = [";".join(o.Name for o in objs)]*2+[based.Name]
+        sch.Filter = ["","",""]
+        doc.recompute()
+        sch.Proxy.execute(sch)
+        r = [t[2] for t in sch.Proxy.timing] == ["cached","cached","cached"]
+        objs[0].Height = 2000
+        doc.recompute()
+        # the schedule does not depend on the objects it lists
+        sch.touch()
+        doc.recompute()
+        r = r and ([t[2] for t in sch.Proxy.timing] == ["cached","values","cached"])
+        r = r and (float(sch.Proxy.data["B3"]) == 11e9)
+        # a value read through a link to another object
+        box.Height = 2000
+        doc.recompute()
+        sch.touch()
+        doc.recompute()
+        r = r and ([t[2] for t in sch.Proxy.timing] == ["cached","cached","values"])
+        r = r and (float(sch.Proxy.data["B4"]) == 2e9)
+        # a change of an external link is structural too
+        objs[1].addProperty("App::PropertyXLink","Ref")
+        objs[1].Ref = box
+        changes = ArchSchedule.getObserver().changes[doc.Name]
+        r = r and any(c[1:] == (objs[1].Name,"Ref",True) for c in changes)
+        # the schedules of existing documents are not incremental
+        old = doc.addObject("App::FeaturePython","OldSchedule")
+        sch.Proxy.setProperties(old)
+        r = r and sch.Incremental and not old.Incremental
+        self.failUnless(r,"Arch Schedule incremental mode failed")
+
+    def testOBJRoundTrip(self):
+        FreeCAD.Console.PrintLog ('Checking OBJ export and import...\n')
+        import importOBJ, tempfile, time
+        doc = FreeCAD.ActiveDocument
+        objs = []
+        for i in range(400):
+            b = doc.addObject('Part::Feature','Box')
+            b.Shape = Part.makeBox(1,1,1,FreeCAD.Vector((i%20)*2,(i//20)*2,0))
+            objs.append(b)
+        filename = os.path.join(tempfile.gettempdir(),"ArchTestRoundTrip.obj")
+        t = time.time()
+        importOBJ.export(objs,filename)
+        t1 = time.time()
+        count = len(doc.Objects)
+        importOBJ.insert(filename,doc.Name)
+        t2 = time.time()
+        FreeCAD.Console.PrintMessage("OBJ round trip of %d boxes: export %.2fs, import %.2fs\n" % (len(objs),t1-t,t2-t1))
+        meshes = doc.Objects[count:]
+        r = (len(meshes) == len(objs)) and all(m.Mesh.CountFacets == 12 for m in meshes)
+        os.remove(filename)
+        self.failUnless(r,"Arch OBJ round trip failed")
+
+    def testTessellationCache(self):
+        FreeCAD.Console.PrintLog ('Checking the tessellation cache of the mesh exporters...\n')
+        import exportMeshHelper, importJSON
+        b = FreeCAD.ActiveDocument.addObject('Part::Feature','Box')
+        b.Shape = Part.makeBox(1,1,1)
+        exportMeshHelper.clearCache()
+        d1 = importJSON.getObjectData(b)
+        misses = exportMeshHelper.CACHE.misses
+        d2 = importJSON.getObjectData(b)
+        r = (exportMeshHelper.CACHE.misses == misses) and (exportMeshHelper.CACHE.hits > 0)
+        r = r and (d1['vertices'] == d2['vertices']) and (len(d1['vertices']) == 8) and (len(d1['facets']) == 12)
+        self.failUnless(r,"Arch tessellation cache failed")
+        import importOBJ
+        c = FreeCAD.ActiveDocument.addObject('Part::Feature','Cylinder')
+        c.Shape = Part.makeCylinder(1,1)
+        l1 = importOBJ.getIndices(c,c.Shape,1,1)
+        hits = exportMeshHelper.CACHE.hits
+        l2 = importOBJ.getIndices(c,c.Shape,1,1)
+        r = (exportMeshHelper.CACHE.hits == hits+1) and (l1 == l2) and (len(l1[3]) > 0)
+        self.failUnless(r,"Arch OBJ tessellation cache failed")
+
+    def testIFCPartialLoad(self):
+        FreeCAD.Console.PrintLog ('Checking Arch IFC partial loading...\n')
+        try:
+            import ifcopenshell, ifcopenshell.guid
+        except ImportError:
+            FreeCAD.Console.PrintLog ('IfcOpenShell not found, skipping...\n')
+            return
+        import importIFC, tempfile
+        # a storey containing a stair, made of two aggregated flights
+        f = ifcopenshell.file(schema="IFC2X3")
+        def make(ifctype,**attribs):
+            return f.create_entity(ifctype,GlobalId=ifcopenshell.guid.new(),**attribs)
+        project = make("IfcProject",Name="Project")
+        site = make("IfcSite",Name="Site")
+        building = make("IfcBuilding",Name="Building")
+        storeys = [make("IfcBuildingStorey",Name="Storey"+str(i)) for i in range(2)]
+        stair = make("IfcStair",Name="Stair")
+        flights = [make("IfcStairFlight",Name="Flight"+str(i)) for i in range(2)]
+        wall = make("IfcWallStandardCase",Name="Wall")
+        make("IfcRelAggregates",RelatingObject=project,RelatedObjects=[site])
+        make("IfcRelAggregates",RelatingObject=site,RelatedObjects=[building])
+        make("IfcRelAggregates",RelatingObject=building,RelatedObjects=storeys)
+        make("IfcRelContainedInSpatialStructure",RelatingStructure=storeys[0],RelatedElements=[stair])
+        make("IfcRelContainedInSpatialStructure",RelatingStructure=storeys[1],RelatedElements=[wall])
+        make("IfcRelAggregates",RelatingObject=stair,RelatedObjects=flights)
+        filename = os.path.join(tempfile.gettempdir(),"ArchTestPartialLoad.ifc")
+        f.write(filename)
+        preferences = importIFC.getPreferences()
+        preferences['MERGE_MODE_ARCH'] = 0
+        doc = FreeCAD.ActiveDocument
+        doc2 = FreeCAD.newDocument("ArchTestPartialLoad")
+        try:
+            for group in importIFC.insertPlaceholders(filename,doc.Name):
+                importIFC.loadPlaceholder(group,preferences)
+            importIFC.loadProducts(filename,doc2.Name,storeys=["Storey0"],preferences=preferences)
+        finally:
+            importIFC.indexes.clear()
+            os.remove(filename)
+        # each product is created once, the aggregated flights included
+        uids = [o.IfcData.get("IfcUID") for o in doc.Objects if hasattr(o,"IfcData")]
+        r = all(uids.count(p.GlobalId) == 1 for p in [stair,wall]+flights)
+        uids = [o.IfcData.get("IfcUID") for o in doc2.Objects if hasattr(o,"IfcData")]
+        r = r and all(uids.count(p.GlobalId) == 1 for p in [stair]+flights)
+        r = r and (uids.count(wall.GlobalId) == 0)
+        FreeCAD.closeDocument(doc2.Name)
+        FreeCAD.setActiveDocument(doc.Name)
+        self.failUnless(r,"Arch IFC partial loading failed")
+
+    def testIFCProductShapes(self):
+        FreeCAD.Console.PrintLog ('Checking Arch IFC parallel geometry...\n')
+        try:
+            import ifcopenshell, ifcopenshell.geom
+        except ImportError:
+            FreeCAD.Console.PrintLog ('IfcOpenShell not found, skipping...\n')
+            return
+        import exportIFC, importIFCHelper, tempfile
+        l = Draft.makeLine(FreeCAD.Vector(0,0,0),FreeCAD.Vector(-2,0,0))
+        w = Arch.makeWall(l)
+        f = Arch.makeFloor([w])
+        b = Arch.makeBuilding([f])
+        FreeCAD.ActiveDocument.recompute()
+        filename = os.path.join(tempfile.gettempdir(),"ArchTestProductShapes.ifc")
+        exportIFC.export([b],filename)
+        ifcfile = ifcopenshell.open(filename)
+        os.remove(filename)
+        settings = ifcopenshell.geom.settings()
+        settings.set(settings.USE_BREP_DATA,True)
+        settings.set(settings.USE_WORLD_COORDS,True)
+        products = ifcfile.by_type("IfcProduct")
+        result = list(importIFCHelper.iterProductShapes(ifcfile,products,settings,threads=2))
+        # every product once, the ones without geometry at the end, to be built one by one
+        r = sorted(p.id() for p,brep in result) == sorted(p.id() for p in products)
+        breps = [bool(brep) for p,brep in result]
+        r = r and (breps == sorted(breps,reverse=True))
+        r = r and all(bool(brep) == p.is_a("IfcWall") for p,brep in result)
+        self.failUnless(r,"Arch IFC parallel geometry failed")
+
     def tearDown(self):
         FreeCAD.closeDocument("ArchTest")
         pass
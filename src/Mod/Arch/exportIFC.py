@@ -140,7 +140,8 @@ def getPreferences():
         'ADD_DEFAULT_BUILDING': p.GetBool("IfcAddDefaultBuilding",True),
         'IFC_UNIT': u,
         'SCALE_FACTOR': f,
-        'GET_STANDARD': p.GetBool("getStandardType",False)
+        'GET_STANDARD': p.GetBool("getStandardType",False),
+        'SHARE_GEOMETRY': p.GetBool("ifcShareGeometry",True)
     }
     if hasattr(ifcopenshell,"schema_identifier"):
         schema = ifcopenshell.schema_identifier
@@ -260,10 +261,7 @@ def export(exportList,filename,colors=None,preferences=None):
     # build clones table
 
     if preferences['CREATE_CLONES']:
-        for o in objectslist:
-            b = Draft.getCloneBase(o,strict=True)
-            if b:
-                clones.setdefault(b.Name,[]).append(o.Name)
+        clones = exportIFCHelper.buildClonesTable(objectslist,preferences['SHARE_GEOMETRY'])
 
     #print("clones table: ",clones)
     #print(objectslist)
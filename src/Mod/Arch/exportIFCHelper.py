@@ -37,6 +37,59 @@ def getObjectsOfIfcType(objects, ifcType):
     return results
 
 
+def getGeometrySignature(obj,precision=6):
+
+    """returns a hashable signature of the shape of an object, independent of
+    its placement, or None if the object has no solid shape. Objects with the
+    same signature have the same geometry, only placed differently, so they
+    can share one IfcRepresentationMap"""
+
+    if not obj.isDerivedFrom("Part::Feature"):
+        return None
+    shape = obj.Shape
+    if shape.isNull() or not shape.Solids:
+        return None
+    import DraftVecUtils
+    verts = [v.Point for v in shape.Vertexes]
+    if not shape.Placement.isNull():
+        verts = DraftVecUtils.transformPoints(shape.Placement.inverse(),verts)
+    return (len(shape.Faces),
+            len(shape.Edges),
+            round(shape.Volume,precision-3),
+            tuple((round(v.x,precision),round(v.y,precision),round(v.z,precision)) for v in verts))
+
+
+def buildClonesTable(objectslist,shared=False):
+
+    """returns a { BaseName:[CloneName,...] } table of the objects in objectslist
+    that can share the representation of a base object: Draft and Arch clones,
+    App::Links, and, if shared is True, objects with identical shapes"""
+
+    import Draft
+
+    clones = {}
+    signatures = {}  # { signature: BaseName }
+    for o in objectslist:
+        b = Draft.getCloneBase(o,strict=True)
+        if (not b) and o.isDerivedFrom("App::Link"):
+            b = o.getLinkedObject()
+            if b == o:
+                b = None
+        if b:
+            clones.setdefault(b.Name,[]).append(o.Name)
+        elif shared and (Draft.getType(o) not in ["Site","Building","Floor","BuildingPart","Array"]):
+            signature = getGeometrySignature(o)
+            if signature and FreeCAD.GuiUp and hasattr(o.ViewObject,"ShapeColor"):
+                # clones are exported with the color of their base
+                signature = (signature,o.ViewObject.ShapeColor)
+            if signature:
+                if signature in signatures:
+                    clones.setdefault(signatures[signature],[]).append(o.Name)
+                else:
+                    signatures[signature] = o.Name
+    return clones
+
+
 def writeUnits(ifcfile,unit="metre"):
     
     """adds additional units settings to the given ifc file if needed"""
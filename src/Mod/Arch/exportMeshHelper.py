@@ -0,0 +1,196 @@
+# ***************************************************************************
+# *   Copyright (c) 2020 Yorik van Havre <yorik@uncreated.net>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+
+"""Tessellation cache shared by the mesh-based exporters (OBJ, DAE, JSON, WebGL).
+
+Shapes are tessellated once per shape and deflection, and the results are
+kept as numpy arrays of vertices and triangle indices. The results are
+keyed by the hash code of the shape, which only identifies the shape while
+it exists, so the shape is kept in the cache together with its results,
+and compared with isSame() on lookup. Exporting a model to several formats,
+or exporting it again after editing a few objects, only tessellates the
+shapes that changed."""
+
+from collections import OrderedDict
+
+import numpy
+
+import FreeCAD
+import DraftVecUtils
+
+
+MAXSHAPES = 4096 # the number of tessellations kept in the cache
+
+
+class TessellationCache:
+
+    "A least-recently-used cache of tessellations, stored with their shape"
+
+    def __init__(self,maxsize=MAXSHAPES):
+
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self,key,shape):
+
+        entry = self.items.pop(key,None)
+        if (entry is None) or not entry[0].isSame(shape):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.items[key] = entry
+        return entry[1]
+
+    def put(self,key,shape,value):
+
+        self.items[key] = (shape,value)
+        while len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+
+    def clear(self):
+
+        self.items.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+CACHE = TessellationCache()
+
+
+def clearCache():
+
+    "empties the tessellation cache"
+
+    CACHE.clear()
+
+
+def toBuffers(topology):
+
+    """toBuffers(topology): converts a (points,facets) tuple, as returned by
+    Shape.tessellate() or Mesh.Topology, to a (vertices,facets) tuple of numpy
+    arrays of shape (N,3), float, and (M,3), int"""
+
+    points,facets = topology
+    verts = DraftVecUtils.toArray(points).reshape(-1,3)
+    facets = numpy.array(facets,dtype=numpy.int64).reshape(-1,3)
+    return verts,facets
+
+
+def getTessellation(shape,deflection=0.1,mesher=None):
+
+    """getTessellation(shape,[deflection,mesher]): returns the tessellation of
+    a shape as a (vertices,facets) tuple of numpy arrays. Mesher is an optional
+    function taking the shape and returning a (points,facets) topology, used
+    instead of Shape.tessellate(deflection). In that case, deflection must
+    identify the mesher settings. The result is cached, and must not be modified"""
+
+    key = (shape.hashCode(),deflection)
+    buffers = CACHE.get(key,shape)
+    if buffers is None:
+        if mesher:
+            topology = mesher(shape)
+        else:
+            topology = shape.tessellate(deflection)
+        buffers = toBuffers(topology)
+        for b in buffers:
+            b.setflags(write=False)
+        CACHE.put(key,shape,buffers)
+    return buffers
+
+
+def getPlacedTessellation(shape,placement,deflection=0.1,mesher=None):
+
+    """getPlacedTessellation(shape,placement,[deflection,mesher]): returns the
+    tessellation of a shape like getTessellation(), moved from the placement of
+    the shape to the given placement, for example the global placement of its
+    object. The cached arrays are not modified"""
+
+    verts,facets = getTessellation(shape,deflection,mesher)
+    pl = placement.multiply(shape.Placement.inverse())
+    if not pl.isIdentity():
+        verts = transformVertices(verts,pl)
+    return verts,facets
+
+
+def mergeVertices(verts,facets,decimals=6):
+
+    """mergeVertices(verts,facets,[decimals]): returns the vertices and facets
+    with the vertices at the same position, rounded to the given number of
+    decimals, merged into one, as in a Mesh. Shape.tessellate() gives each
+    face its own vertices. The vertices are kept in the order of their first
+    occurrence"""
+
+    if not len(verts):
+        return verts,facets
+    _,first,inverse = numpy.unique(numpy.round(verts,decimals),axis=0,
+                                   return_index=True,return_inverse=True)
+    order = numpy.argsort(first)
+    index = numpy.empty(len(order),dtype=numpy.int64)
+    index[order] = numpy.arange(len(order))
+    return verts[first[order]],index[inverse.reshape(-1)][facets]
+
+
+def getMeshBuffers(mesh):
+
+    "getMeshBuffers(mesh): returns the vertices and facets of a Mesh as numpy arrays"
+
+    return toBuffers(mesh.Topology)
+
+
+def getNormals(verts,facets):
+
+    """getNormals(verts,facets): returns the unit normals of the triangles
+    given by numpy arrays of vertices and facets"""
+
+    tris = verts[facets]
+    normals = numpy.cross(tris[:,1]-tris[:,0],tris[:,2]-tris[:,0])
+    lengths = numpy.linalg.norm(normals,axis=1)
+    lengths[lengths == 0] = 1.0
+    return normals/lengths[:,None]
+
+
+def transformVertices(verts,matrix):
+
+    """transformVertices(verts,matrix): returns a numpy array of vertices
+    transformed by a FreeCAD Matrix or Placement"""
+
+    return DraftVecUtils.transformPoints(matrix,verts)
+
+
+def getWires(shape,deflection=0.1):
+
+    """getWires(shape,[deflection]): returns the wires of the faces of a shape,
+    discretized, as a list of numpy arrays of points. The result is cached"""
+
+    import Part
+    key = ("wires",shape.hashCode(),deflection)
+    wires = CACHE.get(key,shape)
+    if wires is None:
+        wires = []
+        for f in shape.Faces:
+            for w in f.Wires:
+                wo = Part.Wire(Part.__sortEdges__(w.Edges))
+                pts = wo.discretize(QuasiDeflection=deflection)
+                wires.append(DraftVecUtils.toArray(pts).reshape(-1,3))
+        CACHE.put(key,shape,wires)
+    return wires
@@ -19,7 +19,7 @@
 #*                                                                         *
 #***************************************************************************
 
-import FreeCAD, Mesh, os, numpy, MeshPart, Arch, Draft
+import FreeCAD, Mesh, os, numpy, MeshPart, Arch, Draft, exportMeshHelper
 if FreeCAD.GuiUp:
     from DraftTools import translate
 else:
@@ -61,19 +61,26 @@ def checkCollada():
         return True
         
         
+def getMesherSettings():
+
+    "returns the mesher settings of the Collada exporter as a tuple"
+
+    p = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Arch")
+    return (p.GetInt("ColladaMesher",0),
+            p.GetFloat("ColladaTessellation",1.0),
+            p.GetFloat("ColladaGrading",0.3),
+            p.GetInt("ColladaSegsPerEdge",1),
+            p.GetInt("ColladaSegsPerRadius",2),
+            p.GetBool("ColladaSecondOrder",False),
+            p.GetBool("ColladaOptimize",True),
+            p.GetBool("ColladaAllowQuads",False))
+
+
 def triangulate(shape):
     
     "triangulates the given face"
     
-    p = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Arch")
-    mesher = p.GetInt("ColladaMesher",0)
-    tessellation = p.GetFloat("ColladaTessellation",1.0)
-    grading = p.GetFloat("ColladaGrading",0.3)
-    segsperedge = p.GetInt("ColladaSegsPerEdge",1)
-    segsperradius = p.GetInt("ColladaSegsPerRadius",2)
-    secondorder = p.GetBool("ColladaSecondOrder",False)
-    optimize = p.GetBool("ColladaOptimize",True)
-    allowquads = p.GetBool("ColladaAllowQuads",False)
+    mesher,tessellation,grading,segsperedge,segsperradius,secondorder,optimize,allowquads = getMesherSettings()
     if mesher == 0:
         return shape.tessellate(tessellation)
     elif mesher == 1:
@@ -222,44 +229,33 @@ def export(exportList,filename,tessellation=1,colors=None):
     scenenodes = []
     objectslist = Draft.getGroupContents(exportList,walls=True,addgroups=True)
     objectslist = Arch.pruneIncluded(objectslist)
+    settings = getMesherSettings()
     for obj in objectslist:
         findex = numpy.array([])
-        m = None
+        verts = None
         if obj.isDerivedFrom("Part::Feature"):
             print("exporting object ",obj.Name, obj.Shape)
-            new_shape = obj.Shape.copy()
-            new_shape.Placement = obj.getGlobalPlacement()
-            m = Mesh.Mesh(triangulate(new_shape))
+            # the tessellation of the shape is cached, then moved to its global placement
+            verts,facets = exportMeshHelper.getPlacedTessellation(obj.Shape,obj.getGlobalPlacement(),settings,triangulate)
         elif obj.isDerivedFrom("Mesh::Feature"):
             print("exporting object ",obj.Name, obj.Mesh)
-            m = obj.Mesh
+            verts,facets = exportMeshHelper.getMeshBuffers(obj.Mesh)
         elif obj.isDerivedFrom("App::Part"):
             for child in obj.OutList:
                 objectslist.append(child)
             continue
         else:
             continue
-        if m:
-            Topology = m.Topology
-            Facets = m.Facets
-
+        if verts is not None:
             # vertex indices
-            vindex = numpy.empty(len(Topology[0]) * 3)
-            for i in range(len(Topology[0])):
-                v = Topology[0][i]
-                vindex[list(range(i*3, i*3+3))] = (v.x*scale,v.y*scale,v.z*scale)
+            vindex = (verts*scale).ravel()
 
             # normals
-            nindex = numpy.empty(len(Facets) * 3)
-            for i in range(len(Facets)):
-                n = Facets[i].Normal
-                nindex[list(range(i*3, i*3+3))] = (n.x,n.y,n.z)
+            nindex = exportMeshHelper.getNormals(verts,facets).ravel()
 
             # face indices
-            findex = numpy.empty(len(Topology[1]) * 6, numpy.int64)
-            for i in range(len(Topology[1])):
-                f = Topology[1][i]
-                findex[list(range(i*6, i*6+6))] = (f[0],i,f[1],i,f[2],i)
+            i = numpy.arange(len(facets),dtype=numpy.int64)
+            findex = numpy.stack([facets[:,0],i,facets[:,1],i,facets[:,2],i],axis=1).ravel()
 
         print(len(vindex), " vert indices, ", len(nindex), " norm indices, ", len(findex), " face indices.")
         vert_src = collada.source.FloatSource("cubeverts-array"+str(objind), vindex, ('X', 'Y', 'Z'))
@@ -28,6 +28,8 @@ __url__ = "http://www.freecadweb.org"
 import six
 import os
 import math
+import time
+from collections import OrderedDict
 
 import FreeCAD
 import Part
@@ -162,7 +164,9 @@ def getPreferences():
         'SPLIT_LAYERS': p.GetBool("ifcSplitLayers",False),
         'FITVIEW_ONIMPORT': p.GetBool("ifcFitViewOnImport",False),
         'ALLOW_INVALID': p.GetBool("ifcAllowInvalid",False),
-        'REPLACE_PROJECT': p.GetBool("ifcReplaceProject",False)
+        'REPLACE_PROJECT': p.GetBool("ifcReplaceProject",False),
+        'PARALLEL_IMPORT': p.GetBool("ifcParallelImport",False),
+        'IMPORT_THREADS': p.GetInt("ifcImportThreads",0)
     }
 
     if preferences['MERGE_MODE_ARCH'] > 0:
@@ -189,17 +193,24 @@ def open(filename,skip=[],only=[],root=None):
     return doc
 
 
-def insert(filename,docname,skip=[],only=[],root=None,preferences=None):
+def insert(filename,docname,skip=[],only=[],root=None,preferences=None,ifcfile=None,rootgroup=None):
 
-    """insert(filename,docname,skip=[],only=[],root=None,preferences=None): imports the contents of an IFC file.
+    """insert(filename,docname,skip=[],only=[],root=None,preferences=None,ifcfile=None,rootgroup=None):
+    imports the contents of an IFC file.
     skip can contain a list of ids of objects to be skipped, only can restrict the import to
     certain object ids (will also get their children) and root can be used to
-    import only the derivates of a certain element type (default = ifcProduct)."""
+    import only the derivates of a certain element type (default = ifcProduct).
+    ifcfile can be an already opened IfcOpenShell file, and rootgroup an existing
+    group used instead of a new one when the project is replaced."""
 
     # read preference settings
     if preferences is None:
         preferences = getPreferences()
 
+    # time spent in each phase of the import, reported in parallel mode
+    timing = OrderedDict()
+    starttime = time.time()
+
     try:
         import ifcopenshell
     except:
@@ -225,7 +236,10 @@ def insert(filename,docname,skip=[],only=[],root=None,preferences=None):
     # global ifcfile
 
     filename = importIFCHelper.decode(filename,utf=True)
-    ifcfile = ifcopenshell.open(filename)
+    phasetime = time.time()
+    if ifcfile is None:
+        ifcfile = ifcopenshell.open(filename)
+    timing["parsing"] = time.time() - phasetime
 
     # get file scale
     ifcscale = importIFCHelper.getScaling(ifcfile)
@@ -250,6 +264,7 @@ def insert(filename,docname,skip=[],only=[],root=None,preferences=None):
 
     # build all needed tables
     if preferences['DEBUG']: print("Building types and relationships table...",end="")
+    phasetime = time.time()
     # type tables
     sites = ifcfile.by_type("IfcSite")
     buildings = ifcfile.by_type("IfcBuilding")
@@ -262,29 +277,43 @@ def insert(filename,docname,skip=[],only=[],root=None,preferences=None):
     shapes = {}  # { id:shaoe } only used for merge mode
     structshapes = {}  # { id:shaoe } only used for merge mode
     sharedobjects = {}  # { representationmapid:object }
+    sharedshapes = {}  # { representationmapid:(shape,placement) } geometry of mapped items, built once
     parametrics = []  # a list of imported objects whose parametric relationships need processing after all objects have been created
     profiles = {}  # to store reused extrusion profiles {ifcid:fcobj,...}
     layers = {}  # { layer_name, [ids] }
     # filled relation tables
     # TODO for the following tables might be better use inverse attributes, done for properties
     # see https://forum.freecadweb.org/viewtopic.php?f=39&t=37892
-    prodrepr = importIFCHelper.buildRelProductRepresentation(ifcfile)
     additions = importIFCHelper.buildRelAdditions(ifcfile)
     groups = importIFCHelper.buildRelGroups(ifcfile)
     subtractions = importIFCHelper.buildRelSubtractions(ifcfile)
     mattable = importIFCHelper.buildRelMattable(ifcfile)
-    colors = importIFCHelper.buildRelProductColors(ifcfile, prodrepr)
-    if preferences['DEBUG']: print("done.")
 
     # only import a list of IDs and their children, if defined
     if only:
         ids = []
+        idset = set()
+        only = list(only)
         while only:
             currentid = only.pop()
+            # the children can also be given in the list, import them once
+            if currentid in idset:
+                continue
+            idset.add(currentid)
             ids.append(currentid)
             if currentid in additions.keys():
                 only.extend(additions[currentid])
         products = [ifcfile[currentid] for currentid in ids]
+        # also restrict the annotations and materials to the imported products
+        annotations = [a for a in annotations if a.id() in idset]
+        usedmaterials = set(mattable[i] for i in idset if i in mattable)
+        materials = [m for m in materials if m.id() in usedmaterials]
+
+    # the representations and colors are only needed for the imported products
+    prodrepr = importIFCHelper.buildRelProductRepresentation(ifcfile,products)
+    colors = importIFCHelper.buildRelProductColors(ifcfile, prodrepr)
+    timing["tables"] = time.time() - phasetime
+    if preferences['DEBUG']: print("done.")
 
     # start the actual import, set FreeCAD UI
     count = 0
@@ -311,7 +340,33 @@ def insert(filename,docname,skip=[],only=[],root=None,preferences=None):
 
     # handle IFC products
 
-    for product in products:
+    if preferences['PARALLEL_IMPORT']:
+        # build the geometry in several threads, before creating the objects.
+        # Structural entities need curves and are still built one by one, below.
+        include = []
+        mappedsources = set()
+        for p in products:
+            if (p.id() in skip) or (p.is_a() in preferences['SKIP']) or (p.is_a() in structuralifcobjects):
+                continue
+            # other instances of a mapped item reuse the geometry of the first one
+            # they come after all the built shapes, so the first one is always ready
+            mapped = importIFCHelper.getMappedItemPlacement(p,ifcscale,preferences['SEPARATE_OPENINGS'])
+            if mapped:
+                if mapped[0] in mappedsources:
+                    continue
+                mappedsources.add(mapped[0])
+            include.append(p)
+        if hasattr(settings,"INCLUDE_CURVES"):
+            settings.set(settings.INCLUDE_CURVES,False)
+        if preferences['DEBUG']: print("Building geometry with",importIFCHelper.getThreadCount(preferences['IMPORT_THREADS']),"threads")
+        productshapes = importIFCHelper.iterProductShapes(ifcfile,products,settings,include,
+                                                          threads=preferences['IMPORT_THREADS'],
+                                                          timing=timing)
+    else:
+        productshapes = ((product,None) for product in products)
+    phasetime = time.time()
+
+    for product,brep in productshapes:
 
         count += 1
         pid = product.id()
@@ -360,7 +415,6 @@ def insert(filename,docname,skip=[],only=[],root=None,preferences=None):
             name = "ID" + str(pid) + " " + name
         obj = None
         baseobj = None
-        brep = None
         shape = None
 
         # classify object and verify if we must skip it
@@ -418,32 +472,50 @@ def insert(filename,docname,skip=[],only=[],root=None,preferences=None):
                             sharedobjects[originalid] = None
                             store = originalid  # flag this object to be stored later
 
-        # set additional setting for structural entities
-        if hasattr(settings,"INCLUDE_CURVES"):
-            if structobj:
-                settings.set(settings.INCLUDE_CURVES,True)
-            else:
-                settings.set(settings.INCLUDE_CURVES,False)
-        try:
-            cr = ifcopenshell.geom.create_shape(settings,product)
-            brep = cr.geometry.brep_data
-        except:
-            pass  # IfcOpenShell will yield an error if a given product has no shape, but we don't care, we're brave enough
+        # reuse the geometry of another instance of the same mapped item
+        mapped = importIFCHelper.getMappedItemPlacement(product,ifcscale,preferences['SEPARATE_OPENINGS'])
+        shared = False
+        if mapped and (mapped[0] in sharedshapes):
+            sourceshape,sourceplacement = sharedshapes[mapped[0]]
+            delta = mapped[1].multiply(sourceplacement.inverse())
+            # the transformed shape shares the geometry of the source
+            shape = sourceshape.transformed(delta.toMatrix())
+            shared = True
+
+        # build the geometry, unless it was already built in parallel
+        if (not brep) and (not shared):
+            # set additional setting for structural entities
+            if hasattr(settings,"INCLUDE_CURVES"):
+                if structobj:
+                    settings.set(settings.INCLUDE_CURVES,True)
+                else:
+                    settings.set(settings.INCLUDE_CURVES,False)
+            try:
+                cr = ifcopenshell.geom.create_shape(settings,product)
+                brep = cr.geometry.brep_data
+            except:
+                pass  # IfcOpenShell will yield an error if a given product has no shape, but we don't care, we're brave enough
 
-        # from now on we have a brep string
-        if brep:
-            if preferences['DEBUG']: print(" "+str(int(len(brep)/1000))+"k ",end="")
+        # from now on we have a brep string or a shared shape
+        if brep or shared:
+            if shared:
+                if preferences['DEBUG']: print(" shared ",end="")
+            else:
+                if preferences['DEBUG']: print(" "+str(int(len(brep)/1000))+"k ",end="")
 
-            # create a Part shape
-            shape = Part.Shape()
-            shape.importBrepFromString(brep,False)
-            shape.scale(1000.0)  # IfcOpenShell always outputs in meters, we convert to mm, the freecad internal unit
+                # create a Part shape
+                shape = Part.Shape()
+                shape.importBrepFromString(brep,False)
+                shape.scale(1000.0)  # IfcOpenShell always outputs in meters, we convert to mm, the freecad internal unit
 
             if shape.isNull() and (not preferences['ALLOW_INVALID']):
                 if preferences['DEBUG']: print("null shape ",end="")
-            elif not shape.isValid()  and (not preferences['ALLOW_INVALID']):
+            elif (not shared) and (not shape.isValid()) and (not preferences['ALLOW_INVALID']):
                 if preferences['DEBUG']: print("invalid shape ",end="")
             else:
+                if mapped and not shared:
+                    # store the geometry for the other instances
+                    sharedshapes[mapped[0]] = (shape,mapped[1])
 
                 # add to the global boundbox if applicable
                 if preferences['FITVIEW_ONIMPORT'] and FreeCAD.GuiUp:
@@ -875,7 +947,12 @@ def insert(filename,docname,skip=[],only=[],root=None,preferences=None):
             return
 
     progressbar.stop()
+    # time waiting for the geometry threads is counted apart
+    timing["objects"] = time.time() - phasetime - timing.get("geometry",0)
+    phasetime = time.time()
     FreeCAD.ActiveDocument.recompute()
+    timing["recompute"] = time.time() - phasetime
+    phasetime = time.time()
 
     if preferences['MERGE_MODE_STRUCT'] == 2:
 
@@ -1152,6 +1229,10 @@ def insert(filename,docname,skip=[],only=[],root=None,preferences=None):
     # print("mattable:",mattable)
     # print("materials:",materials)
     fcmats = {}
+    # partial imports reuse the materials created by the previous ones
+    oldmats = []
+    if only:
+        oldmats = [o for o in doc.Objects if Draft.getType(o) == "Material"]
     for material in materials:
         # get and set material name
         name = "Material"
@@ -1168,9 +1249,15 @@ def insert(filename,docname,skip=[],only=[],root=None,preferences=None):
                 if m == material.id():
                     if o in colors:
                         mdict["DiffuseColor"] = str(colors[o])
-        # merge materials with same name and color if setting in prefs is True
         add_material = True
-        if preferences['MERGE_MATERIALS']:
+        for oldmat in oldmats:
+            if (oldmat.Label == name or (oldmat.Label.startswith(name) and oldmat.Label[len(name):].isdigit())) \
+                    and mdict.get("DiffuseColor") == oldmat.Material.get("DiffuseColor"):
+                mat = oldmat
+                add_material = False
+                break
+        # merge materials with same name and color if setting in prefs is True
+        if add_material and preferences['MERGE_MATERIALS']:
             for key in list(fcmats.keys()):
                 if key.startswith(name) \
                         and "DiffuseColor" in mdict and "DiffuseColor" in fcmats[key].Material \
@@ -1238,14 +1325,19 @@ def insert(filename,docname,skip=[],only=[],root=None,preferences=None):
 
     # Grouping everything if required
     if preferences['REPLACE_PROJECT']:
-        rootgroup = FreeCAD.ActiveDocument.addObject("App::DocumentObjectGroup","Group")
-        rootgroup.Label = os.path.basename(filename)
+        if rootgroup is None:
+            rootgroup = FreeCAD.ActiveDocument.addObject("App::DocumentObjectGroup","Group")
+            rootgroup.Label = os.path.basename(filename)
         for key,obj in objects.items():
             # only add top-level objects
             if not obj.InList:
                 rootgroup.addObject(obj)
 
     FreeCAD.ActiveDocument.recompute()
+    timing["relationships"] = time.time() - phasetime
+    timing["total"] = time.time() - starttime
+    if preferences['PARALLEL_IMPORT'] or preferences['DEBUG']:
+        importIFCHelper.printTiming(timing)
 
     if ZOOMOUT and FreeCAD.GuiUp:
         import FreeCADGui
@@ -1254,6 +1346,100 @@ def insert(filename,docname,skip=[],only=[],root=None,preferences=None):
     return doc
 
 
+# ************************************************************************************************
+# ********** partial import ****************
+
+indexes = {}  # { filename: importIFCHelper.ProductIndex }
+
+
+def openIndex(filename):
+
+    """openIndex(filename): opens an IFC file and returns an index of its products,
+    built without any geometry. The index and the opened file are kept for the
+    following partial imports of the same file."""
+
+    import ifcopenshell
+    filename = importIFCHelper.decode(filename,utf=True)
+    if filename not in indexes:
+        start = time.time()
+        ifcfile = ifcopenshell.open(filename)
+        indexes[filename] = importIFCHelper.ProductIndex(ifcfile)
+        FreeCAD.Console.PrintMessage("Indexed {0} IFC products in {1:.2f} s\n".format(len(indexes[filename]),time.time()-start))
+    return indexes[filename]
+
+
+def insertPlaceholders(filename,docname):
+
+    """insertPlaceholders(filename,docname): indexes an IFC file and creates one empty
+    group per storey, plus one for the products outside storeys, without loading
+    any geometry. Each group stores the ids of its products, which are imported
+    by loadPlaceholder(). Returns the list of groups."""
+
+    index = openIndex(filename)
+    try:
+        doc = FreeCAD.getDocument(docname)
+    except:
+        doc = FreeCAD.newDocument(docname)
+    FreeCAD.ActiveDocument = doc
+
+    spatial = ["IfcProject","IfcSite","IfcBuilding","IfcBuildingStorey"]
+    contents = OrderedDict((sid,[]) for sid in sorted(index.storeys))
+    contents[None] = []
+    for pid,entry in index.entries.items():
+        if entry["type"] not in spatial:
+            contents[entry["storey"]].append(pid)
+
+    placeholders = []
+    for sid,ids in contents.items():
+        if not ids:
+            continue
+        label = index.storeys[sid] if sid else "Unassigned"
+        group = doc.addObject("App::DocumentObjectGroup","IfcPlaceholder")
+        group.Label = label + " (" + str(len(ids)) + ")"
+        group.addProperty("App::PropertyString","IfcFile","IFC","The IFC file the products come from")
+        group.addProperty("App::PropertyIntegerList","IfcIds","IFC","The ids of the products to load")
+        group.addProperty("App::PropertyBool","Loaded","IFC","True if the products have been loaded")
+        group.IfcFile = filename
+        group.IfcIds = sorted(ids)
+        placeholders.append(group)
+    doc.recompute()
+    return placeholders
+
+
+def loadPlaceholder(group,preferences=None):
+
+    """loadPlaceholder(group,[preferences]): imports the products of a group made by
+    insertPlaceholders() inside this group"""
+
+    if group.Loaded:
+        return group
+    loadProducts(group.IfcFile,group.Document.Name,ids=group.IfcIds,group=group,preferences=preferences)
+    group.Loaded = True
+    return group
+
+
+def loadProducts(filename,docname,ids=None,storeys=None,types=None,region=None,group=None,preferences=None):
+
+    """loadProducts(filename,docname,[ids,storeys,types,region,group,preferences]):
+    imports part of an IFC file: the given product ids, or the products selected in
+    the index by storeys (ids or names), types and region (a FreeCAD.BoundBox in mm).
+    The imported objects are placed in the given group, or in a new one.
+    Returns the list of imported product ids."""
+
+    index = openIndex(filename)
+    if ids is None:
+        ids = index.select(storeys,types,region)
+    if not ids:
+        return []
+    if preferences is None:
+        preferences = getPreferences()
+    # the project, site and buildings are not imported again for each part
+    preferences = dict(preferences)
+    preferences['REPLACE_PROJECT'] = True
+    insert(filename,docname,only=list(ids),preferences=preferences,ifcfile=index.file,rootgroup=group)
+    return list(ids)
+
+
 # ************************************************************************************************
 # ********** helper ****************
 def createFromProperties(propsets,ifcfile):
@@ -22,6 +22,8 @@
 import six
 import sys
 import math
+import time
+from collections import OrderedDict
 
 import FreeCAD
 import Arch
@@ -138,6 +140,112 @@ class ProjectImporter:
         return round(math.degrees(math.atan2(y, x)) - 90, 6)
 
 
+class ProductIndex:
+    """A lightweight index of the products of an IFC file, to import them partially
+
+    The index is built without creating any geometry. For each product it stores
+    its type, name, storey and a bounding box, which is taken from a "Box"
+    representation if the product has one, or reduced to the product position
+    otherwise. The products can then be selected by storey, type or region,
+    and imported with importIFC.insert(only=...)."""
+
+    def __init__(self, ifcfile, root_element="IfcProduct", scaling=None):
+        self.file = ifcfile
+        if scaling is None:
+            scaling = getScaling(ifcfile)
+        self.scaling = scaling
+        self.entries = {}  # { id: {"type", "name", "storey", "boundbox"} }
+        self.parents = {}  # { id: parent id }
+        for r in ifcfile.by_type("IfcRelContainedInSpatialStructure"):
+            for e in r.RelatedElements:
+                self.parents[e.id()] = r.RelatingStructure.id()
+        for r in ifcfile.by_type("IfcRelAggregates"):
+            for e in r.RelatedObjects:
+                self.parents[e.id()] = r.RelatingObject.id()
+        self.storeys = dict((s.id(), s.Name or "Storey " + str(s.id()))
+                            for s in ifcfile.by_type("IfcBuildingStorey"))
+        for product in ifcfile.by_type(root_element):
+            pid = product.id()
+            self.entries[pid] = {
+                "type": product.is_a(),
+                "name": getattr(product, "Name", None),
+                "storey": self.getStorey(pid),
+                "boundbox": self.getBoundBox(product),
+            }
+
+    def __len__(self):
+        return len(self.entries)
+
+    def getStorey(self, pid):
+        """returns the id of the storey containing the given product, or None"""
+
+        visited = set()
+        while pid in self.parents and pid not in visited:
+            visited.add(pid)
+            pid = self.parents[pid]
+            if pid in self.storeys:
+                return pid
+        return None
+
+    def getBoundBox(self, product):
+        """returns an approximate bounding box of the product, in mm"""
+
+        pl = None
+        if getattr(product, "ObjectPlacement", None):
+            pl = getPlacement(product.ObjectPlacement, self.scaling)
+        if not pl:
+            pl = FreeCAD.Placement()
+        bb = FreeCAD.BoundBox()
+        box = None
+        if getattr(product, "Representation", None):
+            for r in product.Representation.Representations:
+                if r.RepresentationIdentifier == "Box" and r.Items and r.Items[0].is_a("IfcBoundingBox"):
+                    box = r.Items[0]
+                    break
+        if box:
+            c = getVector(box.Corner, 1).multiply(self.scaling)
+            d = FreeCAD.Vector(box.XDim, box.YDim, box.ZDim).multiply(self.scaling)
+            for x in (0, d.x):
+                for y in (0, d.y):
+                    for z in (0, d.z):
+                        bb.add(pl.multVec(c.add(FreeCAD.Vector(x, y, z))))
+        else:
+            bb.add(pl.Base)
+        return bb
+
+    def getTypes(self):
+        """returns a { type: count } table of the indexed products"""
+
+        types = {}
+        for entry in self.entries.values():
+            types[entry["type"]] = types.get(entry["type"], 0) + 1
+        return types
+
+    def getPropertySummary(self, pid):
+        """returns the names of the property sets of a product, computed on demand"""
+
+        return sorted(self.file[pset].Name for pset in getIfcPropertySets(self.file, pid))
+
+    def select(self, storeys=None, types=None, region=None):
+        """returns the sorted ids of the products contained in one of the given
+        storeys (ids or names), of one of the given types (including subtypes),
+        and whose bounding box intersects the given region (a FreeCAD.BoundBox)"""
+
+        if storeys is not None:
+            storeys = set(sid for sid, name in self.storeys.items()
+                          if (sid in storeys) or (name in storeys))
+        result = []
+        for pid, entry in self.entries.items():
+            if (storeys is not None) and (entry["storey"] not in storeys):
+                continue
+            if types and not any(self.file[pid].is_a(t) for t in types):
+                continue
+            if region and not region.intersect(entry["boundbox"]):
+                continue
+            result.append(pid)
+        return sorted(result)
+
+
 # type tables
 def buildRelProductsAnnotations(ifcfile, root_element):
     """build the products and annotations relation table and"""
@@ -161,12 +269,15 @@ def buildRelProductsAnnotations(ifcfile, root_element):
 
 
 # relation tables
-def buildRelProductRepresentation(ifcfile):
-    """build the product/representations relation table"""
+def buildRelProductRepresentation(ifcfile, products=None):
+    """build the product/representations relation table,
+    of the given products or of all the products of the file"""
 
     prodrepr = {}  # product/representations table
 
-    for p in ifcfile.by_type("IfcProduct"):
+    if products is None:
+        products = ifcfile.by_type("IfcProduct")
+    for p in products:
         if hasattr(p,"Representation"):
             if p.Representation:
                 for it in p.Representation.Representations:
@@ -418,6 +529,77 @@ def getColorFromStyledItem(styled_item):
     return col
 
 
+# ************************************************************************************************
+# parallel geometry production
+def getThreadCount(threads=0):
+    """returns the number of threads to use, all the cores if threads is 0"""
+
+    if threads > 0:
+        return threads
+    import multiprocessing
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
+def iterProductShapes(ifcfile, products, settings, include=None, threads=0, timing=None):
+    """iterProductShapes(ifcfile,products,settings,[include,threads,timing]):
+    yields (product, brep) pairs for all the given products.
+
+    The BREP strings of the products in include (all the products by default)
+    are produced by the IfcOpenShell geometry iterator, which spreads the work
+    over several threads. IfcOpenShell doesn't support reading the file while
+    the iterator works on it, so all the geometry is built before the first
+    product is yielded. The products are yielded in the order their geometry
+    was produced, followed by the products the iterator didn't produce, or
+    produced without a brep, with a brep of None.
+
+    If timing is a dictionary, the time spent building the geometry is added
+    to its "geometry" key."""
+
+    import ifcopenshell
+    from ifcopenshell import geom
+
+    if include is None:
+        include = products
+    byid = dict((p.id(),p) for p in products)
+    breps = OrderedDict()
+    start = time.time()
+    if include:
+        try:
+            iterator = ifcopenshell.geom.iterator(settings,ifcfile,getThreadCount(threads),include=include)
+            if iterator.initialize():
+                while True:
+                    shape = iterator.get()
+                    brep = getattr(shape.geometry,"brep_data",None)
+                    if brep and (shape.id in byid) and (shape.id not in breps):
+                        breps[shape.id] = brep
+                    if not iterator.next():
+                        break
+        except Exception as e:
+            FreeCAD.Console.PrintWarning("IfcOpenShell geometry iterator failed, building the remaining shapes one by one: "+str(e)+"\n")
+    if timing is not None:
+        timing["geometry"] = timing.get("geometry",0) + time.time() - start
+    for pid,brep in breps.items():
+        yield byid[pid],brep
+    for product in products:
+        if product.id() not in breps:
+            yield product,None
+
+
+def printTiming(timing):
+    """prints a report of the time spent in each phase of an import"""
+
+    total = timing.get("total",sum(timing.values()))
+    FreeCAD.Console.PrintMessage("IFC import timing:\n")
+    for phase,duration in timing.items():
+        if phase == "total":
+            continue
+        FreeCAD.Console.PrintMessage("  {0}: {1:.2f} s\n".format(phase,duration))
+    FreeCAD.Console.PrintMessage("  total: {0:.2f} s\n".format(total))
+
+
 # ************************************************************************************************
 # property related methods
 def buildRelProperties(ifcfile):
@@ -535,6 +717,41 @@ def getRotation(entity):
     return p.getRotation().Rotation
 
 
+def getMappedItemPlacement(product,scaling=1000,withopenings=False):
+    """returns a (mappingsourceid, placement) tuple for a product whose body is a single
+    IfcMappedItem, or None. The placement is the product placement combined with the
+    mapping target, so two products sharing a mapping source differ by the product
+    of one placement by the inverse of the other. Products with openings are ignored
+    unless withopenings is True, and so are scaled mapped items"""
+
+    try:
+        representations = product.Representation.Representations
+    except AttributeError:
+        return None
+    if (not withopenings) and getattr(product,"HasOpenings",None):
+        return None
+    items = None
+    for r in representations:
+        if r.RepresentationIdentifier and r.RepresentationIdentifier.upper() == "BODY":
+            items = r.Items
+            break
+    if (not items) or (len(items) != 1) or (not items[0].is_a("IfcMappedItem")):
+        return None
+    target = items[0].MappingTarget
+    if target.is_a("IfcCartesianTransformationOperator3DnonUniform"):
+        return None
+    if (target.Scale is not None) and (abs(target.Scale - 1.0) > 1e-9):
+        return None
+    axes = [getattr(target,a,None) for a in ("Axis1","Axis2","Axis3")]
+    if any(axes) and not all(axes):
+        # partially defined axes, too ambiguous to be reused safely
+        return None
+    pl = getPlacement(product.ObjectPlacement,scaling) or FreeCAD.Placement()
+    origin = getVector(target.LocalOrigin,scaling) or FreeCAD.Vector()
+    mt = FreeCAD.Placement(origin.multiply(scaling),getRotation(target))
+    return items[0].MappingSource.id(),pl.multiply(mt)
+
+
 def getPlacement(entity,scaling=1000):
     """returns a placement from the given entity"""
 
@@ -21,7 +21,7 @@
 
 """FreeCAD JSON exporter"""
 
-import FreeCAD, Mesh, Draft, Part
+import FreeCAD, Mesh, Draft, Part, exportMeshHelper
 import json
 
 if FreeCAD.GuiUp:
@@ -66,38 +66,22 @@ def getObjectData(obj):
             Draft.getrgb(obj.ViewObject.ShapeColor, testbw = False)
 
     if obj.isDerivedFrom("Part::Feature"):
-        mesh = Mesh.Mesh(obj.Shape.tessellate(0.1))
+        # the vertices shared by several faces are merged, as in a Mesh
+        verts, facets = exportMeshHelper.mergeVertices(
+            *exportMeshHelper.getTessellation(obj.Shape, 0.1))
 
         # Add wires
-        wires = []
-        for f in obj.Shape.Faces:
-            for w in f.Wires:
-                wo = Part.Wire(Part.__sortEdges__(w.Edges))
-                wires.append([[v.x, v.y, v.z]
-                              for v in wo.discretize(QuasiDeflection = 0.1)])
+        result['wires'] = [w.tolist()
+                           for w in exportMeshHelper.getWires(obj.Shape, 0.1)]
 
-        result['wires'] = wires
-
-    elif obj.isDerivedFrom("Mesh::Feature"): mesh = obj.Mesh
+    elif obj.isDerivedFrom("Mesh::Feature"):
+        verts, facets = exportMeshHelper.getMeshBuffers(obj.Mesh)
 
     # Add vertices
-    count = 0
-    vertices = []
-    vIndex = {}
-
-    for p in mesh.Points:
-        v = p.Vector
-        vIndex[p.Index] = count
-        count += 1
-        vertices.append([v.x, v.y, v.z])
-
-    result['vertices'] = vertices
+    result['vertices'] = verts.tolist()
 
     # Add facets & normals
-    facets = [[vIndex[i] for i in f.PointIndices] for f in mesh.Facets]
-    normals = [[f.Normal.x, f.Normal.y, f.Normal.z] for f in mesh.Facets]
-
-    result['normals'] = normals
-    result['facets'] = facets
+    result['normals'] = exportMeshHelper.getNormals(verts, facets).tolist()
+    result['facets'] = facets.tolist()
 
     return result
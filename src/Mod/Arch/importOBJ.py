@@ -20,7 +20,10 @@
 #***************************************************************************
 
 import FreeCAD, DraftGeomUtils, Part, Draft, Arch, Mesh, MeshPart, os, sys
-# import numpy as np
+try:
+    import numpy as np
+except ImportError:
+    np = None
 if FreeCAD.GuiUp:
     from DraftTools import translate
 else:
@@ -40,6 +43,9 @@ else:
 
 p = Draft.precision()
 
+# size of the buffer of the exported file, in bytes
+WRITE_BUFFER = 1 << 20
+
 if open.__module__ in ['__builtin__','io']:
     pythonopen = open
 
@@ -59,6 +65,28 @@ def findVert(aVertex,aList):
                     return i
     return None
 
+def getVertKey(point):
+    "returns the coordinates of a vector, rounded to the Draft precision, used as index key"
+    return (round(point.x,p),round(point.y,p),round(point.z,p))
+
+def meshShape(shape):
+    "returns the topology of the triangulation of a shape with curves"
+    mesh = MeshPart.meshFromShape(Shape=shape, LinearDeflection=0.1, AngularDeflection=0.7, Relative=True)
+    return mesh.Topology
+
+def getMeshBuffers(obj):
+    """returns the triangulation of the shape of an object, at its global
+    placement, as numpy arrays of vertices and facets. The triangulation is
+    kept in the tessellation cache shared with the other mesh exporters"""
+    import exportMeshHelper
+    if obj.isDerivedFrom("App::Link"):
+        shape = obj.LinkedObject.Shape
+        pl = obj.LinkPlacement
+    else:
+        shape = obj.Shape
+        pl = obj.getGlobalPlacement()
+    return exportMeshHelper.getPlacedTessellation(shape,pl,("OBJ",0.1,0.7),meshShape)
+
 def getIndices(obj,shape,offsetv,offsetvn):
     "returns a list with 2 lists: vertices and face indexes, offset with the given amount"
     vlist = []
@@ -66,81 +94,84 @@ def getIndices(obj,shape,offsetv,offsetvn):
     elist = []
     flist = []
     curves = None
+    triangulate = False
 
     if isinstance(shape,Part.Shape):
         for e in shape.Edges:
             try:
                 if not isinstance(e.Curve,Part.LineSegment):
-                    if not curves:
-                        if obj.isDerivedFrom("App::Link"):
-                            myshape = obj.LinkedObject.Shape.copy(False)
-                            myshape.Placement=obj.LinkPlacement
-                        else:
-                            myshape = obj.Shape.copy(False)
-                            myshape.Placement=obj.getGlobalPlacement()
-                        mesh=MeshPart.meshFromShape(Shape=myshape, LinearDeflection=0.1, AngularDeflection=0.7, Relative=True)
-                        FreeCAD.Console.PrintWarning(translate("Arch","Found a shape containing curves, triangulating")+"\n")
-                        break
+                    triangulate = True
+                    break
             except: # unimplemented curve type
-                if obj.isDerivedFrom("App::Link"):
-                  if obj.Shape:
-                      myshape = obj.Shape.copy(False)
-                      myshape.Placement=obj.LinkPlacement
-                  else:
-                      myshape = obj.Shape.copy(False)
-                      myshape.Placement=obj.getGlobalPlacement()
-                mesh=MeshPart.meshFromShape(Shape=myshape, LinearDeflection=0.1, AngularDeflection=0.7, Relative=True)
-                FreeCAD.Console.PrintWarning(translate("Arch","Found a shape containing curves, triangulating")+"\n")
+                triangulate = True
                 break
     elif isinstance(shape,Mesh.Mesh):
         curves = shape.Topology
-    if mesh:
-        for v in mesh.Topology[0]:
-              vlist.append(" "+str(round(v[0],p))+" "+str(round(v[1],p))+" "+str(round(v[2],p)))
-
-        for vn in mesh.Facets:
-              vnlist.append(" "+str(vn.Normal[0]) + " " + str(vn.Normal[1]) + " " + str(vn.Normal[2]))
-
-        for i, vn in enumerate(mesh.Topology[1]):
-              flist.append(" "+str(vn[0]+offsetv)+"//"+str(i+offsetvn)+" "+str(vn[1]+offsetv)+"//"+str(i+offsetvn)+" "+str(vn[2]+offsetv)+"//"+str(i+offsetvn)+" ")
+    if triangulate:
+        FreeCAD.Console.PrintWarning(translate("Arch","Found a shape containing curves, triangulating")+"\n")
+        if np is not None:
+            import exportMeshHelper
+            verts,facets = getMeshBuffers(obj)
+            normals = exportMeshHelper.getNormals(verts,facets).tolist()
+            verts = verts.tolist()
+            facets = facets.tolist()
+        else:
+            if obj.isDerivedFrom("App::Link"):
+                myshape = obj.LinkedObject.Shape.copy(False)
+                myshape.Placement=obj.LinkPlacement
+            else:
+                myshape = obj.Shape.copy(False)
+                myshape.Placement=obj.getGlobalPlacement()
+            mesh=MeshPart.meshFromShape(Shape=myshape, LinearDeflection=0.1, AngularDeflection=0.7, Relative=True)
+            verts,facets = mesh.Topology
+            normals = [f.Normal for f in mesh.Facets]
+        vlist = [" %s %s %s" % (round(v[0],p),round(v[1],p),round(v[2],p)) for v in verts]
+        vnlist = [" %s %s %s" % (n[0],n[1],n[2]) for n in normals]
+        for i, vn in enumerate(facets):
+            ni = str(i+offsetvn)
+            flist.append(" "+str(vn[0]+offsetv)+"//"+ni+" "+str(vn[1]+offsetv)+"//"+ni+" "+str(vn[2]+offsetv)+"//"+ni+" ")
     else:
         if curves:
-            for v in curves[0]:
-                vlist.append(" "+str(round(v.x,p))+" "+str(round(v.y,p))+" "+str(round(v.z,p)))
+            vlist = [" %s %s %s" % getVertKey(v) for v in curves[0]]
             for f in curves[1]:
-                fi = ""
-                for vi in f:
-                    fi += " " + str(vi + offsetv)
-                flist.append(fi)
+                flist.append("".join(" " + str(vi + offsetv) for vi in f))
         else:
-            for v in shape.Vertexes:
-                vlist.append(" "+str(round(v.X,p))+" "+str(round(v.Y,p))+" "+str(round(v.Z,p)))
+            # index the vertices by their rounded coordinates, so each lookup
+            # is a dictionary access instead of a loop over all the vertices
+            vindex = {}
+            for i,v in enumerate(shape.Vertexes):
+                key = getVertKey(v.Point)
+                vindex.setdefault(key,i)
+                vlist.append(" %s %s %s" % key)
+
+            def getIndex(point):
+                key = getVertKey(point)
+                if not key in vindex:
+                    # a point created by the tessellation
+                    vindex[key] = len(vlist)
+                    vlist.append(" %s %s %s" % key)
+                return str(vindex[key] + offsetv)
+
             if not shape.Faces:
                 for e in shape.Edges:
-                   if DraftGeomUtils.geomType(e) == "Line":
-                        ei = " " + str(findVert(e.Vertexes[0],shape.Vertexes) + offsetv)
-                        ei += " " + str(findVert(e.Vertexes[-1],shape.Vertexes) + offsetv)
-                        elist.append(ei)
+                    if DraftGeomUtils.geomType(e) == "Line":
+                        elist.append(" " + getIndex(e.Vertexes[0].Point) + " " + getIndex(e.Vertexes[-1].Point))
+            holefaces = []
             for f in shape.Faces:
                 if len(f.Wires) > 1:
-                    # if we have holes, we triangulate
-                    tris = f.tessellate(1)
-                    for fdata in tris[1]:
-                        fi = ""
-                        for vi in fdata:
-                            vdata = Part.Vertex(tris[0][vi])
-                            fi += " " + str(findVert(vdata,shape.Vertexes) + offsetv)
-                        flist.append(fi)
+                    # if we have holes, we triangulate, all the faces at once below
+                    holefaces.append(f)
                 else:
-                    fi = ""
+                    fi = []
                     for e in f.OuterWire.OrderedEdges:
                         #print(e.Vertexes[0].Point,e.Vertexes[1].Point)
-                        v = e.Vertexes[0]
-                        ind = findVert(v,shape.Vertexes)
-                        if ind is None:
-                            return None,None,None
-                        fi += " " + str(ind + offsetv)
-                    flist.append(fi)
+                        fi.append(getIndex(e.Vertexes[0].Point))
+                    flist.append(" " + " ".join(fi))
+            if holefaces:
+                tris = Part.makeCompound(holefaces).tessellate(1)
+                tindex = [getIndex(v) for v in tris[0]]
+                for fdata in tris[1]:
+                    flist.append(" " + " ".join(tindex[vi] for vi in fdata))
     return vlist,vnlist,elist,flist
 
 
@@ -154,7 +185,7 @@ def export(exportList,filename,colors=None):
     pairs for use in non-GUI mode."""
 
     import codecs
-    outfile = codecs.open(filename,"wb",encoding="utf8")
+    outfile = codecs.open(filename,"wb",encoding="utf8",buffering=WRITE_BUFFER)
     ver = FreeCAD.Version()
     outfile.write("# FreeCAD v" + ver[0] + "." + ver[1] + " build" + ver[2] + " Arch module\n")
     outfile.write("# http://www.freecadweb.org\n")
@@ -206,14 +237,15 @@ def export(exportList,filename,colors=None):
                 else:
                     offsetv += len(vlist)
                     offsetvn += len(vnlist)
-                    outfile.write("o " + obj.Name + "\n")
+                    # build the whole object and write it at once
+                    lines = ["o " + obj.Name + "\n"]
 
                     # write material
                     m = False
                     if hasattr(obj,"Material"):
                         if obj.Material:
                             if hasattr(obj.Material,"Material"):
-                                outfile.write("usemtl " + obj.Material.Name + "\n")
+                                lines.append("usemtl " + obj.Material.Name + "\n")
                                 materials.append(obj.Material)
                                 m = True
                     if not m:
@@ -226,23 +258,20 @@ def export(exportList,filename,colors=None):
                                         color = color[0]
                                     #print("found color for obj",obj.Name,":",color)
                                     mn = Draft.getrgb(color,testbw=False)[1:]
-                                    outfile.write("usemtl color_" + mn + "\n")
+                                    lines.append("usemtl color_" + mn + "\n")
                                     materials.append(("color_" + mn,color,0))
                         elif FreeCAD.GuiUp:
                             if hasattr(obj.ViewObject,"ShapeColor") and hasattr(obj.ViewObject,"Transparency"):
                                 mn = Draft.getrgb(obj.ViewObject.ShapeColor,testbw=False)[1:]
-                                outfile.write("usemtl color_" + mn + "\n")
+                                lines.append("usemtl color_" + mn + "\n")
                                 materials.append(("color_" + mn,obj.ViewObject.ShapeColor,obj.ViewObject.Transparency))
 
                     # write geometry
-                    for v in vlist:
-                        outfile.write("v" + v + "\n")
-                    for vn in vnlist:
-                        outfile.write("vn" + vn + "\n")
-                    for e in elist:
-                        outfile.write("l" + e + "\n")
-                    for f in flist:
-                        outfile.write("f" + f + "\n")
+                    lines.extend(["v" + v + "\n" for v in vlist])
+                    lines.extend(["vn" + vn + "\n" for vn in vnlist])
+                    lines.extend(["l" + e + "\n" for e in elist])
+                    lines.extend(["f" + f + "\n" for f in flist])
+                    outfile.write("".join(lines))
     outfile.close()
     FreeCAD.Console.PrintMessage(translate("Arch","Successfully written") + " " + decode(filename) + "\n")
     if materials: 
@@ -298,14 +327,24 @@ def insert(filename,docname):
     FreeCAD.ActiveDocument = doc
 
     with pythonopen(filename,"r") as infile:
-        verts = []
+        verts = VertexTable()
         facets = []
         activeobject = None
         material = None
         colortable = {}
         for line in infile:
             line = line.strip()
-            if line[:7] == "mtllib ":
+            if line[:2] == "v ":
+                # converted to numbers in bulk when a mesh is built
+                verts.append(line[2:])
+            elif line[:2] == "f ":
+                fa = []
+                for i in line[2:].split():
+                    if "/" in i:
+                        i = i.split("/")[0]
+                    fa.append(int(i))
+                facets.append(fa)
+            elif line[:7] == "mtllib ":
                 matlib = os.path.join(os.path.dirname(filename),line[7:])
                 if os.path.exists(matlib):
                     with pythonopen(matlib,"r") as matfile:
@@ -332,15 +371,6 @@ def insert(filename,docname):
                 material = None
                 facets = []
                 activeobject = line[2:]
-            elif line[:2] == "v ":
-                verts.append([float(i) for i in line[2:].split()])
-            elif line[:2] == "f ":
-                fa = []
-                for i in line[2:].split():
-                    if "/" in i:
-                        i = i.split("/")[0]
-                    fa.append(int(i))
-                facets.append(fa)
             elif line[:7] == "usemtl ":
                 material = line[7:]
         if activeobject:
@@ -348,27 +378,129 @@ def insert(filename,docname):
     FreeCAD.Console.PrintMessage(translate("Arch","Successfully imported") + ' ' + decode(filename) + "\n")
     return doc
 
-def makeMesh(doc,activeobject,verts,facets,material,colortable):
-    mfacets = []
-    if facets:
+class VertexTable:
+    """The vertices read from an OBJ file. They are stored as text while the
+    file is read, and converted when they are needed, to a NumPy array if
+    NumPy is available, or to a list of coordinates otherwise. The converted
+    vertices are kept in a buffer whose capacity doubles when it is full, so
+    converting the vertices read since the last call only copies these"""
+
+    def __init__(self):
+        self.lines = []
+        self.buffer = np.zeros((0,3)) if np else []
+        self.count = 0
+
+    def append(self, text):
+        self.lines.append(text)
+
+    def __len__(self):
+        return self.count + len(self.lines)
+
+    def getArray(self):
+        "returns all the vertices as a (N,3) array or a list of [x,y,z] lists"
+        if self.lines:
+            verts = parseVertices(self.lines)
+            self.lines = []
+            if np:
+                count = self.count + len(verts)
+                if count > len(self.buffer):
+                    buffer = np.empty((max(count,2*len(self.buffer)),3))
+                    buffer[:self.count] = self.buffer[:self.count]
+                    self.buffer = buffer
+                self.buffer[self.count:count] = verts
+                self.count = count
+            else:
+                self.buffer.extend(verts)
+                self.count = len(self.buffer)
+        if np:
+            return self.buffer[:self.count]
+        return self.buffer
+
+    def __getitem__(self, i):
+        return self.getArray()[i]
+
+def parseVertices(lines):
+    "converts a list of 'x y z' strings to coordinates, with NumPy if available"
+    if np:
+        values = " ".join(lines).split()
+        if len(values) == 3*len(lines):
+            return np.array(values,dtype=float).reshape(-1,3)
+    # some vertices have a weight or a color, parse each line
+    verts = [[float(i) for i in l.split()[:3]] for l in lines]
+    if np:
+        return np.array(verts,dtype=float).reshape(-1,3)
+    return verts
+
+def triangulate(verts,facets):
+    """triangulate(verts,facets): returns the triangles of the given facets,
+    as a list of (i,j,k) tuples of 0-based indices in verts, and a list of
+    extra triangles given by their 3 points, for the non-convex polygons"""
+    tris = []
+    extra = []
+    if np:
+        bysize = {}
+        for facet in facets:
+            bysize.setdefault(len(facet),[]).append(facet)
+        for n,group in bysize.items():
+            if n < 3:
+                continue
+            idx = np.array(group,dtype=int) - 1
+            if n == 3:
+                tris.extend(map(tuple,idx.tolist()))
+                continue
+            # polygons with the same number of vertices are tested together:
+            # the convex ones are split into a triangle fan
+            pts = verts[idx]
+            nxt = np.roll(pts,-1,axis=1)
+            normal = np.cross(pts,nxt).sum(axis=1)
+            turns = np.cross(nxt - pts,np.roll(nxt,-1,axis=1) - nxt)
+            convex = ((turns * normal[:,None,:]).sum(axis=2) >= -1e-9).all(axis=1)
+            for k in range(1,n-1):
+                fan = idx[convex][:,[0,k,k+1]]
+                tris.extend(map(tuple,fan.tolist()))
+            for facet in idx[~convex].tolist():
+                extra.extend(triangulatePolygon([FreeCAD.Vector(*verts[i]) for i in facet]))
+    else:
         for facet in facets:
             if len(facet) > 3:
-                vecs = [FreeCAD.Vector(*verts[i-1]) for i in facet]
-                vecs.append(vecs[0])
-                pol = Part.makePolygon(vecs)
-                try:
-                    face = Part.Face(pol)
-                except Part.OCCError:
-                    print("Skipping non-planar polygon:",vecs)
-                else:
-                    tris = face.tessellate(1)
-                    for tri in tris[1]:
-                        mfacets.append([tris[0][i] for i in tri])
+                extra.extend(triangulatePolygon([FreeCAD.Vector(*verts[i-1]) for i in facet]))
+            else:
+                tris.append(tuple(i-1 for i in facet))
+    return tris,extra
+
+def triangulatePolygon(vecs):
+    "returns the triangles of a planar polygon, as lists of 3 points"
+    pol = Part.makePolygon(vecs+[vecs[0]])
+    try:
+        face = Part.Face(pol)
+    except Part.OCCError:
+        print("Skipping non-planar polygon:",vecs)
+        return []
+    tris = face.tessellate(1)
+    return [[tris[0][i] for i in tri] for tri in tris[1]]
+
+def makeMesh(doc,activeobject,verts,facets,material,colortable):
+    mesh = None
+    if facets:
+        if isinstance(verts,VertexTable):
+            verts = verts.getArray()
+        elif np:
+            verts = np.array(verts,dtype=float).reshape(-1,3)
+        tris,extra = triangulate(verts,facets)
+        mesh = Mesh.Mesh()
+        if tris:
+            if np:
+                # only pass the vertices used by this object
+                used,local = np.unique(np.array(tris,dtype=int),return_inverse=True)
+                points = [FreeCAD.Vector(*v) for v in verts[used].tolist()]
+                mesh.addFacets((points,list(map(tuple,local.reshape(-1,3).tolist()))))
             else:
-                mfacets.append([verts[i-1] for i in facet])
-    if mfacets:
+                mesh.addFacets([[verts[i] for i in tri] for tri in tris])
+        if extra:
+            mesh.addFacets(extra)
+    if mesh and mesh.CountFacets:
         mobj = doc.addObject("Mesh::Feature",activeobject)
-        mobj.Mesh = Mesh.Mesh(mfacets)
+        mobj.Mesh = mesh
         if material and FreeCAD.GuiUp:
             if material in colortable:
                 mobj.ViewObject.ShapeColor = colortable[material][0]
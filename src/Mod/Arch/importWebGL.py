@@ -26,7 +26,7 @@ importWebGL.template = a complete html file, where $CameraData is a placeholder
 FreeCAD camera, and $ObjectsData a placeholder for the FreeCAD objects.
 importWebGL.linewidth = an integer, specifying the width of lines in "faceloop" mode"""
 
-import FreeCAD,Draft,Part,DraftGeomUtils
+import FreeCAD,Draft,Part,DraftGeomUtils,exportMeshHelper
 
 if FreeCAD.GuiUp:
     import FreeCADGui
@@ -163,40 +163,25 @@ def getObjectData(obj,wireframeMode=wireframeStyle):
     result = ""
     wires = []
 
+    verts = None
     if hasattr(obj,'Shape'):
-        fcmesh = obj.Shape.tessellate(0.1)
-        result = "var geom = new THREE.Geometry();\n"
-        # adding vertices data
-        for i in range(len(fcmesh[0])):
-            v = fcmesh[0][i]
-            result += tab+"var v"+str(i)+" = new THREE.Vector3("+str(v.x)+","+str(v.y)+","+str(v.z)+");\n"
-        result += tab+"console.log(geom.vertices)\n"
-        for i in range(len(fcmesh[0])):
-            result += tab+"geom.vertices.push(v"+str(i)+");\n"
-        # adding facets data
-        for f in fcmesh[1]:
-            result += tab+"geom.faces.push( new THREE.Face3"+str(f).replace("L","")+" );\n"
-        for f in obj.Shape.Faces:
-            for w in f.Wires:
-                wo = Part.Wire(Part.__sortEdges__(w.Edges))
-                wires.append(wo.discretize(QuasiDeflection=0.1))
+        verts,facets = exportMeshHelper.getTessellation(obj.Shape,0.1)
+        wires = exportMeshHelper.getWires(obj.Shape,0.1)
 
     elif obj.isDerivedFrom("Mesh::Feature"):
-        mesh = obj.Mesh
-        result = "var geom = new THREE.Geometry();\n"
-        # adding vertices data 
-        for p in mesh.Points:
-            v = p.Vector
-            i = p.Index
-            result += tab+"var v"+str(i)+" = new THREE.Vector3("+str(v.x)+","+str(v.y)+","+str(v.z)+");\n"
-        result += tab+"console.log(geom.vertices)\n"
-        for p in mesh.Points:
-            result += tab+"geom.vertices.push(v"+str(p.Index)+");\n"
+        verts,facets = exportMeshHelper.getMeshBuffers(obj.Mesh)
+
+    if verts is not None:
+        lines = ["var geom = new THREE.Geometry();\n"]
+        # adding vertices data
+        for i,v in enumerate(verts.tolist()):
+            lines.append(tab+"var v%d = new THREE.Vector3(%r,%r,%r);\n" % (i,v[0],v[1],v[2]))
+        lines.append(tab+"console.log(geom.vertices)\n")
+        lines.extend([tab+"geom.vertices.push(v%d);\n" % i for i in range(len(verts))])
         # adding facets data
-        for f in mesh.Facets:
-            pointIndices = tuple([ int(i) for i in f.PointIndices ])
-            result += tab+"geom.faces.push( new THREE.Face3"+str(pointIndices).replace("L","")+" );\n"
-            
+        lines.extend([tab+"geom.faces.push( new THREE.Face3(%d, %d, %d) );\n" % tuple(f) for f in facets.tolist()])
+        result = "".join(lines)
+
     if result:
         # adding a base material
         if FreeCADGui:
@@ -212,13 +197,14 @@ def getObjectData(obj,wireframeMode=wireframeStyle):
             result += tab+"var mesh = new THREE.Mesh( geom, basematerial );\n"
             result += tab+"scene.add( mesh );\n"
             result += tab+"var linematerial = new THREE.LineBasicMaterial({linewidth: %d, color: 0x000000,});\n" % linewidth
+            lines = []
             for w in wires:
-                result += tab+"var wire = new THREE.Geometry();\n"
-                for p in w:
-                    result += tab+"wire.vertices.push(new THREE.Vector3("
-                    result += str(p.x)+", "+str(p.y)+", "+str(p.z)+"));\n"
-                result += tab+"var line = new THREE.Line(wire, linematerial);\n"
-                result += tab+"scene.add(line);\n"
+                lines.append(tab+"var wire = new THREE.Geometry();\n")
+                for p in w.tolist():
+                    lines.append(tab+"wire.vertices.push(new THREE.Vector3(%r, %r, %r));\n" % (p[0],p[1],p[2]))
+                lines.append(tab+"var line = new THREE.Line(wire, linematerial);\n")
+                lines.append(tab+"scene.add(line);\n")
+            result += "".join(lines)
             
         elif wireframeMode == "multimaterial":
             # adding a wireframe material
@@ -1509,6 +1509,7 @@ import getSVG as svg
 
 
 getSVG = svg.getSVG
+getSVGFragments = svg.getSVGFragments
 
 
 def makeDrawingView(obj,page,lwmod=None,tmod=None,otherProjection=None):
@@ -1935,19 +1936,25 @@ def upgrade(objects,delete=False,force=None):
             groups.append(ob)
         elif hasattr(ob,'Shape'):
             parts.append(ob)
-            faces.extend(ob.Shape.Faces)
-            wires.extend(ob.Shape.Wires)
-            edges.extend(ob.Shape.Edges)
-            for f in ob.Shape.Faces:
+            # get the shape and its sub-shapes only once, each access copies them
+            shape = ob.Shape
+            obfaces = shape.Faces
+            obwires = shape.Wires
+            obedges = shape.Edges
+            faces.extend(obfaces)
+            wires.extend(obwires)
+            edges.extend(obedges)
+            for f in obfaces:
                 facewires.extend(f.Wires)
-            wirededges = []
-            for w in ob.Shape.Wires:
-                if len(w.Edges) > 1:
-                    for e in w.Edges:
-                        wirededges.append(e.hashCode())
+            wirededges = set()
+            for w in obwires:
+                wedges = w.Edges
+                if len(wedges) > 1:
+                    for e in wedges:
+                        wirededges.add(e.hashCode())
                 if not w.isClosed():
                     openwires.append(w)
-            for e in ob.Shape.Edges:
+            for e in obedges:
                 if DraftGeomUtils.geomType(e) != "Line":
                     curves.append(e)
                 if not e.hashCode() in wirededges:
@@ -2307,6 +2314,10 @@ def downgrade(objects,delete=False,force=None):
     return [addList,deleteList]
 
 
+from draftfunctions.upgrade_batch import upgrade_batch, downgrade_batch
+from draftfunctions.upgrade_batch import group_by_connectivity
+
+
 def getParameterFromV0(edge, offset):
     """return parameter at distance offset from edge.Vertexes[0]
     sb method in Part.TopoShapeEdge???"""
@@ -2553,17 +2564,10 @@ class _DrawingView(_DraftObject):
                 else:
                     lp = None
                 if obj.Source.isDerivedFrom("App::DocumentObjectGroup"):
-                    svg = ""
-                    shapes = []
-                    others = []
                     objs = getGroupContents([obj.Source])
-                    for o in objs:
-                        v = o.ViewObject.isVisible()
-                        if hasattr(obj,"AlwaysOn"):
-                            if obj.AlwaysOn:
-                                v = True
-                        if v:
-                            svg += getSVG(o,obj.Scale,obj.LineWidth,obj.FontSize.Value,obj.FillStyle,obj.Direction,ls,lc,lp)
+                    if not (hasattr(obj,"AlwaysOn") and obj.AlwaysOn):
+                        objs = [o for o in objs if o.ViewObject.isVisible()]
+                    svg = "".join(getSVGFragments(objs,obj.Scale,obj.LineWidth,obj.FontSize.Value,obj.FillStyle,obj.Direction,ls,lc,lp))
                 else:
                     svg = getSVG(obj.Source,obj.Scale,obj.LineWidth,obj.FontSize.Value,obj.FillStyle,obj.Direction,ls,lc,lp)
                 result += '<g id="' + obj.Name + '"'
@@ -2372,13 +2372,8 @@ def getCircleFromSpline(edge):
 
 def curvetowire(obj, steps):
     points = obj.copy().discretize(steps)
-    p0 = points[0]
-    edgelist = []
-    for p in points[1:]:
-        edge = Part.makeLine((p0.x,p0.y,p0.z),(p.x,p.y,p.z))
-        edgelist.append(edge)
-        p0 = p
-    return edgelist
+    # build all the segments at once instead of one edge per point
+    return Part.makePolygon(points).Edges
 
 
 def cleanProjection(shape, tessellate=True, seglength=0.05):
@@ -2391,16 +2386,17 @@ def cleanProjection(shape, tessellate=True, seglength=0.05):
     newedges = []
     for e in oldedges:
         try:
-            if geomType(e) == "Line":
+            gt = geomType(e)
+            if gt == "Line":
                 newedges.append(e.Curve.toShape())
-            elif geomType(e) == "Circle":
+            elif gt == "Circle":
                 if len(e.Vertexes) > 1:
                     mp = findMidpoint(e)
                     a = Part.Arc(e.Vertexes[0].Point,mp,e.Vertexes[-1].Point).toShape()
                     newedges.append(a)
                 else:
                     newedges.append(e.Curve.toShape())
-            elif geomType(e) == "Ellipse":
+            elif gt == "Ellipse":
                 if tessellate:
                     newedges.append(Part.Wire(curvetowire(e, seglength)))
                 else:
@@ -2409,8 +2405,8 @@ def cleanProjection(shape, tessellate=True, seglength=0.05):
                         newedges.append(a)
                     else:
                         newedges.append(e.Curve.toShape())
-            elif geomType(e) == "BSplineCurve" or \
-                 geomType(e) == "BezierCurve":
+            elif gt == "BSplineCurve" or \
+                 gt == "BezierCurve":
                 if tessellate:
                     newedges.append(Part.Wire(curvetowire(e,seglength)))
                 else:
@@ -2428,13 +2424,7 @@ def cleanProjection(shape, tessellate=True, seglength=0.05):
 
 def curvetosegment(curve, seglen):
     points = curve.discretize(seglen)
-    p0 = points[0]
-    edgelist = []
-    for p in points[1:]:
-        edge = Part.makeLine((p0.x,p0.y,p0.z),(p.x,p.y,p.z))
-        edgelist.append(edge)
-        p0 = p
-    return edgelist
+    return Part.makePolygon(points).Edges
 
 
 def tessellateProjection(shape, seglen):
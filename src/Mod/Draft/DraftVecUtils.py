@@ -812,4 +812,121 @@ def removeDoubles(vlist):
     nlist.append(vlist[-1])
     return nlist
 
+
+def toArray(points):
+    """Return a list of vectors as a NumPy array of shape (N, 3).
+
+    Parameters
+    ----------
+    points : list of Base::Vector3, or numpy.ndarray
+        The points to convert. An array is returned as a float array
+        of shape (N, 3), without copying it if it is already one.
+
+    Returns
+    -------
+    numpy.ndarray
+        The array with one row `(x, y, z)` per point.
+    """
+    import numpy as np
+    if isinstance(points, np.ndarray):
+        return np.asarray(points, dtype=float).reshape(-1, 3)
+    return np.array([(p.x, p.y, p.z) for p in points],
+                    dtype=float).reshape(-1, 3)
+
+
+def toVectors(array):
+    """Return a NumPy array of shape (N, 3) as a list of vectors.
+
+    Parameters
+    ----------
+    array : numpy.ndarray
+        The array with one row `(x, y, z)` per point.
+
+    Returns
+    -------
+    list of Base::Vector3
+        The new vectors.
+    """
+    return [Vector(x, y, z) for x, y, z in array.tolist()]
+
+
+def _matrixArrays(matrix):
+    """Return the rotation/scale part and the translation of a matrix.
+
+    Parameters
+    ----------
+    matrix : Base::Matrix4D or Base::Placement
+        The transformation.
+
+    Returns
+    -------
+    tuple
+        A tuple `(A, t)` of NumPy arrays of shape (3, 3) and (3,).
+    """
+    import numpy as np
+    if hasattr(matrix, "toMatrix"):
+        matrix = matrix.toMatrix()
+    m = matrix
+    a = np.array([[m.A11, m.A12, m.A13],
+                  [m.A21, m.A22, m.A23],
+                  [m.A31, m.A32, m.A33]])
+    t = np.array([m.A14, m.A24, m.A34])
+    return a, t
+
+
+def transformPoints(matrix, points):
+    """Transform many points with one matrix multiplication.
+
+    This gives the same result as calling `matrix.multVec(p)`
+    for each point, but it is much faster for long lists of points.
+
+    Parameters
+    ----------
+    matrix : Base::Matrix4D or Base::Placement
+        The transformation to apply.
+    points : list of Base::Vector3, or numpy.ndarray
+        The points to transform, or an array of shape (N, 3).
+
+    Returns
+    -------
+    list of Base::Vector3, or numpy.ndarray
+        The transformed points, of the same type as `points`.
+    """
+    import numpy as np
+    array = toArray(points)
+    a, t = _matrixArrays(matrix)
+    result = array.dot(a.T) + t
+    if isinstance(points, np.ndarray):
+        return result
+    return toVectors(result)
+
+
+def rotatePoints(matrix, points):
+    """Rotate many vectors, ignoring the translation of the matrix.
+
+    This is the batch version of `matrix.multVec(v)` for directions,
+    or `rotation.multVec(v)` if a `Base::Rotation` is given.
+
+    Parameters
+    ----------
+    matrix : Base::Matrix4D, Base::Placement or Base::Rotation
+        The transformation to apply.
+    points : list of Base::Vector3, or numpy.ndarray
+        The vectors to rotate, or an array of shape (N, 3).
+
+    Returns
+    -------
+    list of Base::Vector3, or numpy.ndarray
+        The rotated vectors, of the same type as `points`.
+    """
+    import numpy as np
+    if isinstance(matrix, FreeCAD.Rotation):
+        matrix = FreeCAD.Placement(Vector(0, 0, 0), matrix)
+    array = toArray(points)
+    a = _matrixArrays(matrix)[0]
+    result = array.dot(a.T)
+    if isinstance(points, np.ndarray):
+        return result
+    return toVectors(result)
+
 ##  @}
@@ -108,6 +108,9 @@ from drafttests.test_dwg import DraftDWG as DraftTest06
 from drafttests.test_oca import DraftOCA as DraftTest07
 from drafttests.test_airfoildat import DraftAirfoilDAT as DraftTest08
 
+from drafttests.test_snap_index import DraftSnapIndex as DraftTest09
+from drafttests.test_vector_batch import DraftVectorBatch as DraftTest10
+
 # Use the modules so that code checkers don't complain (flake8)
 True if DraftTest01 else False
 True if DraftTest02 else False
@@ -117,3 +120,5 @@ True if DraftTest05 else False
 True if DraftTest06 else False
 True if DraftTest07 else False
 True if DraftTest08 else False
+True if DraftTest09 else False
+True if DraftTest10 else False
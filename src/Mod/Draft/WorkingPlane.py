@@ -1089,6 +1089,115 @@ class Plane:
         pt = (vx.add(vy)).add(vz)
         return pt
 
+    def getLocalCoordsBatch(self, points):
+        """Return the coordinates of many points, from the plane.
+
+        This is the batch version of `getLocalCoords`. All the points
+        are transformed with a single matrix multiplication.
+
+        Parameters
+        ----------
+        points : list of Base::Vector3, or numpy.ndarray
+            The points external to the plane, or an array of shape (N, 3).
+
+        Returns
+        -------
+        list of Base::Vector3, or numpy.ndarray
+            The relative coordinates of the points from the plane,
+            of the same type as `points`.
+
+        See Also
+        --------
+        getLocalCoords, getGlobalCoordsBatch
+        """
+        import numpy as np
+        array = DraftVecUtils.toArray(points)
+        pos = np.array(DraftVecUtils.tup(self.position))
+        axes = np.array([DraftVecUtils.tup(self.u),
+                         DraftVecUtils.tup(self.v),
+                         DraftVecUtils.tup(self.axis)])
+        lengths = np.linalg.norm(axes, axis=1)
+        lengths[lengths == 0] = 1.0
+        result = (array - pos).dot((axes / lengths[:, None]).T)
+        if isinstance(points, np.ndarray):
+            return result
+        return DraftVecUtils.toVectors(result)
+
+    def getGlobalCoordsBatch(self, points):
+        """Return the coordinates of many points, added to the plane.
+
+        This is the batch version of `getGlobalCoords`. All the points
+        are transformed with a single matrix multiplication.
+
+        Parameters
+        ----------
+        points : list of Base::Vector3, or numpy.ndarray
+            The points in plane coordinates, or an array of shape (N, 3).
+
+        Returns
+        -------
+        list of Base::Vector3, or numpy.ndarray
+            The coordinates of the points from the absolute origin,
+            of the same type as `points`.
+
+        See Also
+        --------
+        getGlobalCoords, getLocalCoordsBatch
+        """
+        import numpy as np
+        array = DraftVecUtils.toArray(points)
+        pos = np.array(DraftVecUtils.tup(self.position))
+        axes = np.array([DraftVecUtils.tup(self.u),
+                         DraftVecUtils.tup(self.v),
+                         DraftVecUtils.tup(self.axis)])
+        result = array.dot(axes) + pos
+        if isinstance(points, np.ndarray):
+            return result
+        return DraftVecUtils.toVectors(result)
+
+    def projectPoints(self, points, direction=None):
+        """Project many points onto the plane, by default orthogonally.
+
+        This is the batch version of `projectPoint`. Each point is moved
+        along `direction` until it meets the plane.
+
+        Parameters
+        ----------
+        points : list of Base::Vector3, or numpy.ndarray
+            The points to project, or an array of shape (N, 3).
+        direction : Base::Vector3, optional
+            The vector that indicates the direction of projection.
+
+            It defaults to `None`, which then uses the `plane.axis` (normal)
+            value. If the direction is parallel to the plane
+            the points are projected orthogonally.
+
+        Returns
+        -------
+        list of Base::Vector3, or numpy.ndarray
+            The projected points, of the same type as `points`.
+
+        See Also
+        --------
+        projectPoint
+        """
+        import numpy as np
+        array = DraftVecUtils.toArray(points)
+        pos = np.array(DraftVecUtils.tup(self.position))
+        normal = np.array(DraftVecUtils.tup(self.axis))
+        normal = normal / np.linalg.norm(normal)
+        if direction is None:
+            d = normal
+        else:
+            d = np.array(DraftVecUtils.tup(direction))
+            if abs(d.dot(normal)) < 10**(-DraftVecUtils.precision()):
+                d = normal
+        dist = (pos - array).dot(normal) / d.dot(normal)
+        result = array + dist[:, None] * d
+        if isinstance(points, np.ndarray):
+            return result
+        return DraftVecUtils.toVectors(result)
+
     def getClosestAxis(self, point):
         """Return the closest axis of the plane to the given point (vector).
 
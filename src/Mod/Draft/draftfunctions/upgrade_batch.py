@@ -0,0 +1,386 @@
+# ***************************************************************************
+# *   Copyright (c) 2020 FreeCAD Developers                                 *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Provides functions to upgrade and downgrade large selections in batches.
+
+`Draft.upgrade` looks at the whole selection at once, so upgrading
+thousands of imported lines tests every shape together and usually ends
+in a single, expensive operation. Here the selection is first split into
+groups of objects that touch each other, found with an index of the
+end points of their edges, and each group is upgraded on its own.
+
+The groups of edges that `Draft.upgrade` would join into a wire can
+optionally be joined in a pool of worker processes, which receive and
+return the shapes serialized in the BREP format. The document objects are
+always created in the main process, and are the same as those created
+by `Draft.upgrade`.
+"""
+## @package upgrade_batch
+# \ingroup DRAFT
+# \brief Functions to upgrade and downgrade large selections in batches.
+
+import collections
+import concurrent.futures
+import math
+import time
+
+import FreeCAD as App
+import Part
+import Draft
+import draftutils.utils as utils
+from draftutils.messages import _msg, _wrn
+from draftutils.translate import _tr
+
+
+class EndpointIndex:
+    """Index of points, to find the points that coincide with a tolerance.
+
+    The points are stored in a dictionary of cubic cells whose size is
+    the tolerance, so only the neighbouring cells need to be tested.
+
+    Parameters
+    ----------
+    tolerance: float
+        Two points closer than this distance are considered the same.
+    """
+
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+        self.cells = collections.defaultdict(list)
+
+    def _cell(self, point):
+        return (int(math.floor(point.x / self.tolerance)),
+                int(math.floor(point.y / self.tolerance)),
+                int(math.floor(point.z / self.tolerance)))
+
+    def add(self, point, item):
+        """Store an item at the given point.
+
+        Returns
+        -------
+        list
+            The items previously stored at the same point.
+        """
+        i, j, k = self._cell(point)
+        found = []
+        for di in (-1, 0, 1):
+            for dj in (-1, 0, 1):
+                for dk in (-1, 0, 1):
+                    for p, other in self.cells.get((i + di, j + dj, k + dk),
+                                                   ()):
+                        if (p - point).Length <= self.tolerance:
+                            found.append(other)
+        self.cells[(i, j, k)].append((point, item))
+        return found
+
+
+class _UnionFind:
+    """Disjoint sets of integers, with path compression."""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i, j):
+        ri = self.find(i)
+        rj = self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def group_by_connectivity(objects, tolerance=None):
+    """Split objects in groups of objects that share end points.
+
+    Parameters
+    ----------
+    objects: list of App::DocumentObject
+        The objects to split. Objects without a shape are returned
+        in their own group.
+
+    tolerance: float, optional
+        It defaults to `None`, in which case the Draft tolerance is used.
+        Vertices closer than this distance are considered connected.
+
+    Returns
+    -------
+    list of lists
+        The groups of objects, in the order of their first object
+        in the given list.
+    """
+    if tolerance is None:
+        tolerance = utils.tolerance()
+    index = EndpointIndex(tolerance)
+    sets = _UnionFind(len(objects))
+    for n, obj in enumerate(objects):
+        if not hasattr(obj, "Shape"):
+            continue
+        for v in obj.Shape.Vertexes:
+            for other in index.add(v.Point, n):
+                sets.union(n, other)
+    groups = collections.OrderedDict()
+    for n, obj in enumerate(objects):
+        groups.setdefault(sets.find(n), []).append(obj)
+    return list(groups.values())
+
+
+def _is_edges_only(objects):
+    """Return True if the objects contain only edges and wires."""
+    for obj in objects:
+        if not hasattr(obj, "Shape") or obj.Shape.isNull():
+            return False
+        if obj.Shape.Faces or obj.Shape.Solids:
+            return False
+        if obj.isDerivedFrom("Sketcher::SketchObject"):
+            return False
+    return True
+
+
+def _joins_edges(shapes):
+    """Return True if `Draft.upgrade` would join the edges of the shapes.
+
+    It follows the automatic choice of `Draft.upgrade` for several shapes
+    made only of edges and wires: the closed wires are turned into faces
+    if there are no open wires, a single open wire is closed if there are
+    no lone edges, and the edges are joined into a wire if there are
+    lone edges.
+    """
+    wires = 0
+    openwires = 0
+    loneedges = 0
+    for sh in shapes:
+        wirededges = set()
+        for w in sh.Wires:
+            wires += 1
+            wedges = w.Edges
+            if len(wedges) > 1:
+                for e in wedges:
+                    wirededges.add(e.hashCode())
+            if not w.isClosed():
+                openwires += 1
+        for e in sh.Edges:
+            if e.hashCode() not in wirededges:
+                loneedges += 1
+    if wires and not openwires:
+        return False
+    if openwires == 1 and not loneedges:
+        return False
+    return loneedges > 0
+
+
+def _upgrade_edges(breps):
+    """Join serialized edges into a wire, like `Draft.upgrade`.
+
+    This function runs in the worker processes, so it only works
+    with BREP strings.
+
+    Parameters
+    ----------
+    breps: list of str
+        The shapes of the objects of one group, in BREP format.
+
+    Returns
+    -------
+    tuple
+        A `(kind, brep, duration)` tuple, where kind is "Wire",
+        or `None` if the group must be upgraded by `Draft.upgrade`.
+    """
+    start = time.time()
+    shapes = []
+    for brep in breps:
+        sh = Part.Shape()
+        sh.importBrepFromString(brep)
+        shapes.append(sh)
+    if not _joins_edges(shapes):
+        return (None, None, time.time() - start)
+    edges = []
+    for sh in shapes:
+        edges.extend(sh.Edges)
+    try:
+        wire = Part.Wire(Part.__sortEdges__(edges))
+    except Part.OCCError:
+        return (None, None, time.time() - start)
+    if len(wire.Edges) != len(edges):
+        return (None, None, time.time() - start)
+    return ("Wire", wire.exportBrepToString(), time.time() - start)
+
+
+def upgrade_batch(objects, delete=False, force=None, workers=0,
+                  tolerance=None):
+    """Upgrade a large selection, one group of connected objects at a time.
+
+    Parameters
+    ----------
+    objects: list of App::DocumentObject
+        The objects to upgrade.
+
+    delete: bool, optional
+        It defaults to `False`. If it is `True` the old objects are deleted.
+
+    force: str, optional
+        It defaults to `None`. The upgrade method to use for every group,
+        see `Draft.upgrade`.
+
+    workers: int, optional
+        It defaults to 0. If it is bigger than 1, the groups of edges that
+        `Draft.upgrade` would join into a wire are joined in a pool of this
+        many processes. The other groups, and all of them if the pool can
+        not be started, are upgraded in this process.
+
+    tolerance: float, optional
+        It defaults to `None`, in which case the Draft tolerance is used.
+        See `group_by_connectivity`.
+
+    Returns
+    -------
+    list
+        A list of three lists: the new objects, the objects to be deleted,
+        and a report with one dictionary per group with the keys
+        "objects" (number of objects), "time" (in seconds)
+        and "result" (True if the group was upgraded).
+    """
+    if not isinstance(objects, list):
+        objects = [objects]
+
+    start = time.time()
+    groups = group_by_connectivity(objects, tolerance)
+    _msg(_tr("Upgrading {0} objects in {1} groups").format(len(objects),
+                                                            len(groups))
+         + " ({0:.2f} s)".format(time.time() - start))
+
+    add_list = []
+    delete_list = []
+    report = [None] * len(groups)
+
+    pending = list(range(len(groups)))
+    if workers > 1 and not force:
+        pending = _upgrade_in_pool(groups, workers, add_list, delete_list,
+                                   report)
+
+    for n in pending:
+        t = time.time()
+        result = Draft.upgrade(groups[n], delete=False, force=force)
+        add_list.extend(result[0])
+        delete_list.extend(result[1])
+        report[n] = {"objects": len(groups[n]),
+                     "time": time.time() - t,
+                     "result": bool(result[0])}
+
+    if delete:
+        names = [o.Name for o in delete_list]
+        delete_list = []
+        for name in names:
+            App.ActiveDocument.removeObject(name)
+    Draft.select(add_list)
+    return [add_list, delete_list, report]
+
+
+def _upgrade_in_pool(groups, workers, add_list, delete_list, report):
+    """Join the groups of edges in a process pool.
+
+    The wires are added to the document as `Draft.upgrade` does,
+    as plain Part features.
+
+    Returns
+    -------
+    list of int
+        The indices of the groups that still need to be upgraded.
+    """
+    candidates = [n for n, g in enumerate(groups)
+                  if len(g) > 1 and _is_edges_only(g)]
+    if not candidates:
+        return list(range(len(groups)))
+    jobs = [[o.Shape.exportBrepToString() for o in groups[n]]
+            for n in candidates]
+    try:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_upgrade_edges, jobs))
+    except Exception as e:
+        _wrn(_tr("Unable to use worker processes, "
+                 "upgrading in this process:") + " " + str(e))
+        return list(range(len(groups)))
+
+    done = set()
+    for n, (kind, brep, duration) in zip(candidates, results):
+        if kind is None:
+            continue
+        t = time.time()
+        shape = Part.Shape()
+        shape.importBrepFromString(brep)
+        newobj = App.ActiveDocument.addObject("Part::Feature", kind)
+        newobj.Shape = shape
+        add_list.append(newobj)
+        delete_list.extend(groups[n])
+        report[n] = {"objects": len(groups[n]),
+                     "time": duration + time.time() - t,
+                     "result": True}
+        done.add(n)
+    return [n for n in range(len(groups)) if n not in done]
+
+
+def downgrade_batch(objects, delete=False, force=None):
+    """Downgrade a large selection, one object at a time.
+
+    Parameters
+    ----------
+    objects: list of App::DocumentObject
+        The objects to downgrade.
+
+    delete: bool, optional
+        It defaults to `False`. If it is `True` the old objects are deleted.
+
+    force: str, optional
+        It defaults to `None`. The downgrade method to use for every object,
+        see `Draft.downgrade`.
+
+    Returns
+    -------
+    list
+        A list of three lists: the new objects, the objects to be deleted,
+        and a report with one dictionary per object, see `upgrade_batch`.
+    """
+    if not isinstance(objects, list):
+        objects = [objects]
+
+    add_list = []
+    delete_list = []
+    report = []
+    for obj in objects:
+        t = time.time()
+        result = Draft.downgrade([obj], delete=False, force=force)
+        add_list.extend(result[0])
+        delete_list.extend(result[1])
+        report.append({"objects": 1,
+                       "time": time.time() - t,
+                       "result": bool(result[0])})
+
+    if delete:
+        names = [o.Name for o in delete_list]
+        delete_list = []
+        for name in names:
+            App.ActiveDocument.removeObject(name)
+    Draft.select(add_list)
+    return [add_list, delete_list, report]
@@ -33,6 +33,7 @@ import FreeCAD as App
 import FreeCADGui as Gui
 import Draft
 import DraftTools
+import DraftVecUtils
 from draftutils.translate import translate
 import draftguitools.gui_trackers as trackers
 
@@ -808,11 +809,7 @@ class Edit:
 
     def applyPlacement(self, pointList):
         if self.pl:
-            plist = []
-            for p in pointList:
-                point = self.pl.multVec(p)
-                plist.append(point)
-            return plist
+            return DraftVecUtils.transformPoints(self.pl, pointList)
         else:
             return pointList
 
@@ -1069,11 +1066,8 @@ class Edit:
     # -------------------------------------------------------------------------
 
     def getWirePts(self, obj):
-        editpoints = []
-        for p in obj.Points:
-            p = obj.getGlobalPlacement().multVec(p)
-            editpoints.append(p)
-        return editpoints
+        return DraftVecUtils.transformPoints(obj.getGlobalPlacement(),
+                                             obj.Points)
 
     def updateWire(self, obj, nodeIndex, v):
         pts = obj.Points
@@ -1634,17 +1628,16 @@ class Edit:
 
     def getStructurePts(self, obj):
         if obj.Nodes:
-            editpoints = []
             self.originalDisplayMode = obj.ViewObject.DisplayMode
             self.originalPoints = obj.ViewObject.NodeSize
             self.originalNodes = obj.ViewObject.ShowNodes
             self.obj.ViewObject.DisplayMode = "Wireframe"
             self.obj.ViewObject.NodeSize = 1
             # self.obj.ViewObject.ShowNodes = True
-            for p in obj.Nodes:
-                if self.pl:
-                    p = self.pl.multVec(p)
-                editpoints.append(p)
+            editpoints = list(obj.Nodes)
+            if self.pl:
+                editpoints = DraftVecUtils.transformPoints(self.pl,
+                                                           editpoints)
             return editpoints
         else:
             return None
@@ -39,6 +39,7 @@ import collections as coll
 import inspect
 import itertools
 import math
+import time
 
 import Draft
 import DraftVecUtils
@@ -50,6 +51,7 @@ import FreeCADGui as Gui
 import Part
 
 import draftguitools.gui_trackers as trackers
+import draftutils.snap_index as snap_index
 from draftutils.init_tools import get_draft_snap_commands
 from draftutils.messages import _msg, _wrn
 
@@ -123,6 +125,11 @@ class Snapper:
         self.callbackClick = None
         self.callbackMove = None
         self.snapObjectIndex = 0
+        # spatial indexes of the edges of the last snapped objects
+        self.snapIndexes = snap_index.SnapIndexCache()
+        # durations of the last snap() calls, in seconds
+        self.snapLatency = coll.deque(maxlen=100)
+        self.snapBudget = Draft.getParam("snapLatencyBudget", 16) / 1000.0
 
         # snap keys, it's important that they are in this order for
         # saving in preferences and for properly restoring the toolbar
@@ -229,6 +236,36 @@ class Snapper:
         Screenpos can be a list, a tuple or a coin.SbVec2s object.
         If noTracker is True, the tracking line is not displayed.
         """
+        start = time.perf_counter()
+        try:
+            return self._snap(screenpos, lastpoint, active,
+                              constrain, noTracker)
+        finally:
+            self.snapLatency.append(time.perf_counter() - start)
+
+
+    def getSnapLatency(self):
+        """Return statistics about the duration of the last snap() calls.
+
+        Returns a dictionary with the number of recorded calls ('count'),
+        the duration of the last one ('last'), the mean and maximum
+        durations ('mean', 'max'), all in milliseconds, and the number of
+        calls that took longer than the frame budget ('over_budget'),
+        which is set in milliseconds by the 'snapLatencyBudget' parameter.
+        """
+        times = list(self.snapLatency)
+        if not times:
+            return {"count": 0, "last": 0.0, "mean": 0.0,
+                    "max": 0.0, "over_budget": 0}
+        return {"count": len(times),
+                "last": times[-1] * 1000.0,
+                "mean": sum(times) / len(times) * 1000.0,
+                "max": max(times) * 1000.0,
+                "over_budget": len([t for t in times if t > self.snapBudget])}
+
+
+    def _snap(self, screenpos, lastpoint, active, constrain, noTracker):
+        """Return a snapped point, see snap()."""
         if self.running:
             # do not allow concurrent runs
             return None
@@ -983,7 +1020,12 @@ class Snapper:
 
 
     def snapToIntersection(self, shape):
-        """Return a list of intersection snap locations."""
+        """Return a list of intersection snap locations.
+
+        Only the edges of the last object that lie near the given shape
+        are tested, they are found through a spatial index of the edges
+        that is kept until the shape of the object changes.
+        """
         snaps = []
         if self.isEnabled("Intersection"):
             # get the stored objects to calculate intersections
@@ -991,30 +1033,63 @@ class Snapper:
                 obj = App.ActiveDocument.getObject(self.lastObj[0])
                 if obj:
                     if obj.isDerivedFrom("Part::Feature") or (Draft.getType(obj) == "Axis"):
-                        if (not self.maxEdges) or (len(obj.Shape.Edges) <= self.maxEdges):
-                            import Part
-                            for e in obj.Shape.Edges:
-                                # get the intersection points
-                                try:
-                                    if self.isEnabled("WorkingPlane") and hasattr(e,"Curve") and isinstance(e.Curve,(Part.Line,Part.LineSegment)) and hasattr(shape,"Curve") and isinstance(shape.Curve,(Part.Line,Part.LineSegment)):
-                                        # get apparent intersection (lines projected on WP)
-                                        p1 = self.toWP(e.Vertexes[0].Point)
-                                        p2 = self.toWP(e.Vertexes[-1].Point)
-                                        p3 = self.toWP(shape.Vertexes[0].Point)
-                                        p4 = self.toWP(shape.Vertexes[-1].Point)
-                                        pt = DraftGeomUtils.findIntersection(p1, p2, p3, p4, True, True)
-                                    else:
-                                        pt = DraftGeomUtils.findIntersection(e, shape)
-                                    if pt:
-                                        for p in pt:
-                                            snaps.append([p, 'intersection', self.toWP(p)])
-                                except:
-                                    pass
-                                    # some curve types yield an error
-                                    # when trying to read their types
+                        for e in self.getNearbyEdges(obj, shape):
+                            # get the intersection points
+                            try:
+                                if self.isEnabled("WorkingPlane") and hasattr(e,"Curve") and isinstance(e.Curve,(Part.Line,Part.LineSegment)) and hasattr(shape,"Curve") and isinstance(shape.Curve,(Part.Line,Part.LineSegment)):
+                                    # get apparent intersection (lines projected on WP)
+                                    p1 = self.toWP(e.Vertexes[0].Point)
+                                    p2 = self.toWP(e.Vertexes[-1].Point)
+                                    p3 = self.toWP(shape.Vertexes[0].Point)
+                                    p4 = self.toWP(shape.Vertexes[-1].Point)
+                                    pt = DraftGeomUtils.findIntersection(p1, p2, p3, p4, True, True)
+                                else:
+                                    pt = DraftGeomUtils.findIntersection(e, shape)
+                                if pt:
+                                    for p in pt:
+                                        snaps.append([p, 'intersection', self.toWP(p)])
+                            except:
+                                pass
+                                # some curve types yield an error
+                                # when trying to read their types
         return snaps
 
 
+    def getNearbyEdges(self, obj, shape):
+        """Return the edges of obj whose bounding boxes touch the given shape.
+
+        The edges are taken from the spatial index of the object.
+        If the 'maxSnap' preference is set, no edges are returned when
+        there are more candidates than the 'maxSnapEdges' value.
+        """
+        try:
+            index = self.snapIndexes.get(obj)
+        except Exception:
+            return []
+        box = snap_index.get_box(shape, 1e-7)
+        if self.isEnabled("WorkingPlane"):
+            # apparent intersections are calculated on the working plane,
+            # so the edges can be anywhere along its normal
+            axis = App.DraftWorkingPlane.axis
+            box = list(box)
+            for i, comp in enumerate((axis.x, axis.y, axis.z)):
+                if abs(comp) < 1e-7:
+                    continue
+                if abs(abs(comp) - 1) > 1e-7:
+                    # the plane is not aligned with the global axes
+                    return self.getCappedEdges(index.edges)
+                box[i] = -float("inf")
+                box[i + 3] = float("inf")
+        return self.getCappedEdges(index.query_edges(box))
+
+
+    def getCappedEdges(self, edges):
+        """Return the edges, or nothing if there are more than maxEdges."""
+        if (not self.maxEdges) or (len(edges) <= self.maxEdges):
+            return edges
+        return []
+
+
     def snapToPolygon(self, obj):
         """Return a list of polygon center snap locations."""
         snaps = []
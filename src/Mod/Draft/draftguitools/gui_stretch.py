@@ -176,17 +176,13 @@ class Stretch(gui_base_original.Modifier):
                 vispla = sel[1]
                 tp = utils.getType(o)
                 if tp in ["Wire", "BSpline", "BezCurve"]:
-                    np = []
-                    iso = False
-                    for p in o.Points:
-                        p = o.Placement.multVec(p)
-                        p = vispla.multVec(p)
-                        isi = self.rectracker.isInside(p)
-                        np.append(isi)
-                        if isi:
-                            iso = True
-                            nodes.append(p)
-                    if iso:
+                    # Transform and test all the points at once,
+                    # wires can have thousands of them
+                    pla = vispla.multiply(o.Placement)
+                    pts = DraftVecUtils.transformPoints(pla, o.Points)
+                    np = self.rectracker.isInsideBatch(pts)
+                    nodes.extend(p for p, isi in zip(pts, np) if isi)
+                    if any(np):
                         self.ops.append([o, np])
                 elif tp in ["Rectangle"]:
                     p1 = App.Vector(0, 0, 0)
@@ -206,16 +202,11 @@ class Stretch(gui_base_original.Modifier):
                     if iso:
                         self.ops.append([o, np])
                 elif tp in ["Sketch"]:
-                    np = []
-                    iso = False
-                    for p in o.Shape.Vertexes:
-                        p = vispla.multVec(p.Point)
-                        isi = self.rectracker.isInside(p)
-                        np.append(isi)
-                        if isi:
-                            iso = True
-                            nodes.append(p)
-                    if iso:
+                    pts = [v.Point for v in o.Shape.Vertexes]
+                    pts = DraftVecUtils.transformPoints(vispla, pts)
+                    np = self.rectracker.isInsideBatch(pts)
+                    nodes.extend(p for p, isi in zip(pts, np) if isi)
+                    if any(np):
                         self.ops.append([o, np])
                 else:
                     p = o.Placement.Base
@@ -282,16 +273,16 @@ class Stretch(gui_base_original.Modifier):
                     localdisp = _rot.inverted().multVec(self.displacement)
                     if tp in ["Wire", "BSpline", "BezCurve"]:
                         pts = []
-                        for i in range(len(ops[1])):
-                            if ops[1][i] is False:
-                                pts.append(ops[0].Points[i])
+                        for p, isi in zip(ops[0].Points, ops[1]):
+                            if isi is False:
+                                pts.append(p)
                             else:
-                                pts.append(ops[0].Points[i].add(localdisp))
+                                pts.append(p.add(localdisp))
                         pts = str(pts).replace("Vector ", "FreeCAD.Vector")
                         _cmd = _doc + ops[0].Name + ".Points=" + pts
                         commitops.append(_cmd)
                     elif tp in ["Sketch"]:
-                        baseverts = [ops[0].Shape.Vertexes[i].Point for i in range(len(ops[1])) if ops[1][i]]
+                        baseverts = [v.Point for v, isi in zip(ops[0].Shape.Vertexes, ops[1]) if isi]
                         for i in range(ops[0].GeometryCount):
                             j = 0
                             while True:
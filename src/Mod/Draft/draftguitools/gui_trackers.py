@@ -310,6 +310,25 @@ class rectangleTracker(Tracker):
                         return True
         return False
 
+    def isInsideBatch(self, points):
+        """Return a list of booleans, True for the points inside the rectangle.
+
+        This is the batch version of `isInside`, for long lists of points.
+        """
+        import numpy as np
+        p1 = np.array(DraftVecUtils.tup(self.p1()))
+        uv = np.array(DraftVecUtils.tup(self.p2())) - p1
+        vv = np.array(DraftVecUtils.tup(self.p4())) - p1
+        vp = DraftVecUtils.toArray(points) - p1
+        inside = np.ones(len(vp), dtype=bool)
+        for axis in (uv, vv):
+            sq = axis.dot(axis)
+            if sq == 0:
+                return [False] * len(vp)
+            s = vp.dot(axis) / sq
+            inside &= (s >= 0) & (s <= 1)
+        return inside.tolist()
+
 
 class dimTracker(Tracker):
     """A Dimension tracker, used by the dimension tool."""
@@ -264,6 +264,59 @@ class DraftModification(unittest.TestCase):
         _msg("  The last object cannot be upgraded further")
         self.assertFalse(bool(obj4[0]), "'{}' failed".format(operation))
 
+    def test_upgrade_batch(self):
+        """Upgrade many lines, grouped by their connections, into wires."""
+        operation = "Draft Upgrade batch"
+        _msg("  Test '{}'".format(operation))
+        squares = 20
+        lines = []
+        for i in range(squares):
+            pts = [Vector(3 * i, 0, 0), Vector(3 * i + 2, 0, 0),
+                   Vector(3 * i + 2, 2, 0), Vector(3 * i, 2, 0)]
+            for p1, p2 in zip(pts, pts[1:] + pts[:1]):
+                lines.append(Draft.makeLine(p1, p2))
+        App.ActiveDocument.recompute()
+        _msg("  {} lines in {} squares".format(len(lines), squares))
+
+        groups = Draft.group_by_connectivity(lines)
+        self.assertEqual(len(groups), squares,
+                         "'{}' failed".format(operation))
+
+        obj = Draft.upgrade_batch(lines, delete=True)
+        App.ActiveDocument.recompute()
+        report = obj[2]
+        total = sum(r["time"] for r in report)
+        _msg("  {0} groups upgraded in {1:.3f} s".format(len(report), total))
+        self.assertEqual(len(obj[0]), squares,
+                         "'{}' failed".format(operation))
+        self.assertTrue(all(r["result"] for r in report),
+                        "'{}' failed".format(operation))
+
+    def test_upgrade_batch_workers(self):
+        """Upgrade lines in worker processes into the same objects."""
+        operation = "Draft Upgrade batch workers"
+        _msg("  Test '{}'".format(operation))
+        results = []
+        for workers in (0, 2):
+            lines = []
+            for i in range(4):
+                pts = [Vector(3 * i, 0, 0), Vector(3 * i + 2, 0, 0),
+                       Vector(3 * i + 2, 2, 0)]
+                if i % 2:
+                    pts.append(Vector(3 * i, 2, 0))
+                for p1, p2 in zip(pts, pts[1:]):
+                    lines.append(Draft.makeLine(p1, p2))
+            App.ActiveDocument.recompute()
+            obj = Draft.upgrade_batch(lines, delete=True, workers=workers)
+            App.ActiveDocument.recompute()
+            results.append([(o.TypeId, o.Shape.ShapeType, o.Shape.isClosed(),
+                             len(o.Shape.Edges)) for o in obj[0]])
+        _msg("  serial: {0}".format(results[0]))
+        _msg("  pool: {0}".format(results[1]))
+        self.assertEqual(len(results[0]), 4, "'{}' failed".format(operation))
+        self.assertEqual(results[0], results[1],
+                         "'{}' failed".format(operation))
+
     def test_downgrade(self):
         """Downgrade a closed Draft Wire into three simple Part Edges."""
         operation = "Draft Downgrade"
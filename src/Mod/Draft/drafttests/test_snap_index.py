@@ -0,0 +1,105 @@
+# ***************************************************************************
+# *   Copyright (c) 2020 FreeCAD Developers                                 *
+# *                                                                         *
+# *   This file is part of the FreeCAD CAx development system.              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   FreeCAD is distributed in the hope that it will be useful,            *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with FreeCAD; if not, write to the Free Software        *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Unit test for the Draft Workbench, spatial index used by the Snapper."""
+
+import unittest
+import FreeCAD as App
+import Part
+import draftutils.snap_index as snap_index
+import drafttests.auxiliary as aux
+from FreeCAD import Vector
+from draftutils.messages import _msg
+
+
+class DraftSnapIndex(unittest.TestCase):
+    """Test the edge index used to find intersection snap points."""
+
+    def setUp(self):
+        """Set up a grid of lines to be indexed."""
+        aux._draw_header()
+        self.size = 40
+        edges = []
+        for i in range(self.size):
+            edges.append(Part.makeLine(Vector(i, 0, 0),
+                                       Vector(i, self.size, 0)))
+            edges.append(Part.makeLine(Vector(0, i + 0.5, 0),
+                                       Vector(self.size, i + 0.5, 0)))
+        self.edges = edges
+
+    def test_query_matches_brute_force(self):
+        """Query a box and compare with testing every edge."""
+        operation = "EdgeIndex.query"
+        _msg("  Test '{}'".format(operation))
+        index = snap_index.EdgeIndex(self.edges)
+        box = (10.2, 10.2, -1, 12.8, 12.8, 1)
+        expected = [n for n, e in enumerate(self.edges)
+                    if snap_index.boxes_overlap(snap_index.get_box(e), box)]
+        self.assertEqual(index.query(box), expected,
+                         "'{}' failed".format(operation))
+
+    def test_query_infinite_box(self):
+        """Query a box that is infinite along the Z axis."""
+        operation = "EdgeIndex.query infinite"
+        _msg("  Test '{}'".format(operation))
+        index = snap_index.EdgeIndex(self.edges)
+        inf = float("inf")
+        result = index.query((5.1, 5.1, -inf, 5.9, 5.9, inf))
+        self.assertEqual(len(result), 1, "'{}' failed".format(operation))
+
+    def test_nearest(self):
+        """Find the edges near a point."""
+        operation = "EdgeIndex.nearest"
+        _msg("  Test '{}'".format(operation))
+        index = snap_index.EdgeIndex(self.edges)
+        result = index.nearest(Vector(3.1, 20.0, 0), 0.2)
+        self.assertEqual(len(result), 1, "'{}' failed".format(operation))
+        self.assertAlmostEqual(result[0][0], 0.1, 6)
+
+    def test_cache_invalidation(self):
+        """Rebuild the index when the shape of the object changes."""
+        operation = "SnapIndexCache.get"
+        _msg("  Test '{}'".format(operation))
+        doc = App.newDocument(self.__class__.__name__)
+        obj = doc.addObject("Part::Feature", "Grid")
+        obj.Shape = Part.Compound(self.edges)
+        cache = snap_index.SnapIndexCache()
+        index = cache.get(obj)
+        self.assertIs(cache.get(obj), index,
+                      "'{}' failed".format(operation))
+        obj.Shape = Part.Compound(self.edges[:10])
+        self.assertEqual(len(cache.get(obj)), 10,
+                         "'{}' failed".format(operation))
+        App.closeDocument(doc.Name)
+
+    def test_query_edge_boxes(self):
+        """Query the box of every edge and compare with a loop."""
+        operation = "EdgeIndex.query edge boxes"
+        _msg("  Test '{}'".format(operation))
+        index = snap_index.EdgeIndex(self.edges)
+        for edge in self.edges:
+            box = snap_index.get_box(edge, 1e-7)
+            expected = [n for n, e in enumerate(self.edges)
+                        if snap_index.boxes_overlap(snap_index.get_box(e),
+                                                    box)]
+            self.assertEqual(index.query(box), expected,
+                             "'{}' failed".format(operation))
@@ -24,9 +24,15 @@
 """Unit test for the Draft Workbench, SVG import and export tests."""
 
 import os
+import random
+import tempfile
+import time
 import unittest
 import FreeCAD as App
+import Part
 import Draft
+import getSVG
+import importSVG
 import drafttests.auxiliary as aux
 from draftutils.messages import _msg
 
@@ -80,6 +86,85 @@ class DraftSVG(unittest.TestCase):
         obj = Draft.export_SVG(out_file)
         self.assertTrue(obj, "'{}' failed".format(operation))
 
+    def test_svg_cache(self):
+        """Generate the SVG of many shapes twice, the second time cached."""
+        operation = "getSVG cache"
+        _msg("  Test '{}'".format(operation))
+        getSVG.clearSVGCache()
+        shapes = [Part.makeCircle(1, App.Vector(i * 3, 0, 0))
+                  for i in range(100)]
+        direction = App.Vector(0, 0, 1)
+
+        first = Draft.getSVGFragments(shapes, direction=direction)
+        second = Draft.getSVGFragments(shapes, direction=direction)
+        self.assertEqual(first, second, "'{}' failed".format(operation))
+        self.assertEqual(getSVG.fragmentCache.hits, len(shapes),
+                         "'{}' failed".format(operation))
+
+        # a different scale gives a different fragment
+        Draft.getSVG(shapes[0], scale=2, direction=direction)
+        self.assertEqual(getSVG.fragmentCache.hits, len(shapes),
+                         "'{}' failed".format(operation))
+
+    def test_streaming_import(self):
+        """Import a large generated SVG file in streaming mode."""
+        operation = "importSVG.svgStreamImporter"
+        _msg("  Test '{}'".format(operation))
+        layers = 4
+        paths = 2500
+        random.seed(0)
+        lines = ['<svg xmlns="http://www.w3.org/2000/svg" '
+                 'width="1000mm" height="1000mm" viewBox="0 0 1000 1000">']
+        for i in range(layers):
+            lines.append('<g id="layer{}" transform="translate(5,5)">'
+                         .format(i))
+            for j in range(paths // layers):
+                x, y = random.uniform(0, 900), random.uniform(0, 900)
+                lines.append('<path style="fill:#ff0000" d="M {0} {1} '
+                             'l 10 0 c 5 0 5 10 0 10 h -10 z"/>'
+                             .format(x, y))
+            lines.append('</g>')
+        lines.append('</svg>')
+        fd, in_file = tempfile.mkstemp(suffix=".svg")
+        os.close(fd)
+        with open(in_file, "w") as f:
+            f.write("\n".join(lines))
+
+        start = time.time()
+        importer = importSVG.svgStreamImporter(self.doc)
+        objs = importer.read(in_file)
+        _msg("  {0} paths in {1:.2f}s".format(paths, time.time() - start))
+        os.remove(in_file)
+        self.assertEqual(len(objs), layers, "'{}' failed".format(operation))
+        self.assertEqual(len(objs[0].Shape.Faces), paths // layers,
+                         "'{}' failed".format(operation))
+
+    def test_streaming_ellipse(self):
+        """Import an ellipse higher than wide, away from the origin."""
+        operation = "importSVG.svgStreamImporter ellipse"
+        _msg("  Test '{}'".format(operation))
+        svg = ('<svg xmlns="http://www.w3.org/2000/svg" '
+               'width="1000mm" height="1000mm" viewBox="0 0 1000 1000">'
+               '<g id="ellipse"><ellipse cx="300" cy="200" rx="10" ry="40" '
+               'style="fill:none;stroke:#000000"/></g>'
+               '<g id="circle"><circle cx="300" cy="200" r="5" '
+               'style="fill:none;stroke:#000000"/></g></svg>')
+        fd, in_file = tempfile.mkstemp(suffix=".svg")
+        os.close(fd)
+        with open(in_file, "w") as f:
+            f.write(svg)
+        importer = importSVG.svgStreamImporter(self.doc)
+        objs = importer.read(in_file)
+        os.remove(in_file)
+        self.assertEqual(len(objs), 2, "'{}' failed".format(operation))
+        ellipse = objs[0].Shape.BoundBox
+        circle = objs[1].Shape.BoundBox
+        # both are centered on the same point
+        self.assertTrue(ellipse.Center.isEqual(circle.Center, 1e-6),
+                        "'{}' failed".format(operation))
+        self.assertAlmostEqual(ellipse.YLength, 4 * ellipse.XLength, 4,
+                               "'{}' failed".format(operation))
+
     def tearDown(self):
         """Finish the test.
 
@@ -0,0 +1,93 @@
+# ***************************************************************************
+# *   Copyright (c) 2020 FreeCAD Developers                                 *
+# *                                                                         *
+# *   This file is part of the FreeCAD CAx development system.              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   FreeCAD is distributed in the hope that it will be useful,            *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with FreeCAD; if not, write to the Free Software        *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Unit test for the Draft Workbench, batch transformations of points."""
+
+import math
+import unittest
+import FreeCAD as App
+import DraftVecUtils
+import WorkingPlane
+import drafttests.auxiliary as aux
+from FreeCAD import Vector
+from draftutils.messages import _msg
+
+
+class DraftVectorBatch(unittest.TestCase):
+    """Compare the batch functions with the functions for one point."""
+
+    def setUp(self):
+        """Set up a list of points and a rotated working plane."""
+        aux._draw_header()
+        self.points = [Vector(math.cos(i), math.sin(i), i * 0.01)
+                       for i in range(5000)]
+        self.plane = WorkingPlane.plane()
+        self.plane.alignToPointAndAxis(Vector(1, 2, 3),
+                                       Vector(1, 1, 1).normalize())
+        self.placement = App.Placement(Vector(5, -2, 1),
+                                       App.Rotation(Vector(1, 2, 3), 33))
+
+    def assertSamePoints(self, points1, points2, operation):
+        """Compare two lists of points, with the Draft precision."""
+        self.assertEqual(len(points1), len(points2),
+                         "'{}' failed".format(operation))
+        for p1, p2 in zip(points1, points2):
+            self.assertTrue(DraftVecUtils.equals(p1, p2),
+                            "'{}' failed".format(operation))
+
+    def test_transform_points(self):
+        """Transform points with a placement."""
+        operation = "DraftVecUtils.transformPoints"
+        _msg("  Test '{}'".format(operation))
+        expected = [self.placement.multVec(p) for p in self.points]
+        result = DraftVecUtils.transformPoints(self.placement, self.points)
+        self.assertSamePoints(result, expected, operation)
+        array = DraftVecUtils.toArray(self.points)
+        result = DraftVecUtils.transformPoints(self.placement, array)
+        self.assertEqual(result.shape, (len(self.points), 3),
+                         "'{}' failed".format(operation))
+
+    def test_local_global_coords(self):
+        """Convert points to the working plane and back."""
+        operation = "WorkingPlane.getLocalCoordsBatch"
+        _msg("  Test '{}'".format(operation))
+        expected = [self.plane.getLocalCoords(p) for p in self.points]
+        local = self.plane.getLocalCoordsBatch(self.points)
+        self.assertSamePoints(local, expected, operation)
+
+        operation = "WorkingPlane.getGlobalCoordsBatch"
+        _msg("  Test '{}'".format(operation))
+        result = self.plane.getGlobalCoordsBatch(local)
+        self.assertSamePoints(result, self.points, operation)
+
+    def test_project_points(self):
+        """Project points on the working plane."""
+        operation = "WorkingPlane.projectPoints"
+        _msg("  Test '{}'".format(operation))
+        points = self.points[:500]
+        expected = [self.plane.projectPoint(p) for p in points]
+        self.assertSamePoints(self.plane.projectPoints(points), expected,
+                              operation)
+        direction = Vector(0, 0.2, 1).normalize()
+        expected = [self.plane.projectPoint(p, direction) for p in points]
+        self.assertSamePoints(self.plane.projectPoints(points, direction),
+                              expected, operation)
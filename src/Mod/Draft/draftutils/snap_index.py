@@ -0,0 +1,263 @@
+# ***************************************************************************
+# *   Copyright (c) 2020 FreeCAD Developers                                 *
+# *                                                                         *
+# *   This file is part of the FreeCAD CAx development system.              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   FreeCAD is distributed in the hope that it will be useful,            *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with FreeCAD; if not, write to the Free Software        *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Provide a spatial index of the edges of a shape, used by the Snapper.
+
+The Snapper needs to find the edges of an object that lie close
+to the point or edge under the cursor, for example, to calculate
+intersections. Looping over all the edges of a big shape on every
+mouse move is too slow, so the edges are stored in a uniform grid
+of cells built from their bounding boxes, and only the edges
+in the cells touched by a query box are tested.
+
+The indexes are kept in a small cache, keyed by document and object name,
+and they are rebuilt automatically when the shape of the object changes.
+"""
+## @package snap_index
+# \ingroup DRAFT
+# \brief Spatial index of the edges of a shape, used by the Snapper.
+
+import collections as coll
+import math
+
+import Part
+
+
+# Edges that span more than this number of cells in one direction
+# are not stored in the grid, but in a separate list that is always tested.
+MAX_EDGE_CELLS = 16
+
+# Maximum number of object indexes kept in the cache
+MAX_CACHED_INDEXES = 8
+
+
+def get_box(item, tolerance=0.0):
+    """Return the bounding box of a shape or a `BoundBox` as a tuple.
+
+    Parameters
+    ----------
+    item: Part::TopoShape or Base::BoundBox
+        The shape or bounding box.
+
+    tolerance: float, optional
+        It defaults to 0. The box is enlarged by this value in all directions.
+
+    Returns
+    -------
+    tuple
+        A tuple of 6 floats `(xmin, ymin, zmin, xmax, ymax, zmax)`.
+    """
+    bb = getattr(item, "BoundBox", item)
+    return (bb.XMin - tolerance, bb.YMin - tolerance, bb.ZMin - tolerance,
+            bb.XMax + tolerance, bb.YMax + tolerance, bb.ZMax + tolerance)
+
+
+def boxes_overlap(box1, box2):
+    """Return True if two boxes given as tuples of 6 floats overlap."""
+    return (box1[0] <= box2[3] and box2[0] <= box1[3]
+            and box1[1] <= box2[4] and box2[1] <= box1[4]
+            and box1[2] <= box2[5] and box2[2] <= box1[5])
+
+
+class EdgeIndex:
+    """Uniform grid over the bounding boxes of the edges of a shape.
+
+    Parameters
+    ----------
+    edges: list of Part::TopoShape
+        The edges to index, usually the `Edges` attribute of a shape.
+
+    key: object, optional
+        It defaults to `None`. A value identifying the shape
+        the index was built from, used by `SnapIndexCache`
+        to know when the index has to be rebuilt.
+    """
+
+    def __init__(self, edges, key=None):
+        self.edges = list(edges)
+        self.key = key
+        self.boxes = [get_box(e) for e in self.edges]
+        self.cells = {}
+        self.big = []
+        self.bounds = (0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        self.origin = (0.0, 0.0, 0.0)
+        self.size = 1.0
+        if self.boxes:
+            self._build()
+
+    def __len__(self):
+        return len(self.edges)
+
+    def _build(self):
+        """Fill the grid cells with the indices of the edges."""
+        lo = [min(b[i] for b in self.boxes) for i in range(3)]
+        hi = [max(b[i + 3] for b in self.boxes) for i in range(3)]
+        extent = max(hi[i] - lo[i] for i in range(3))
+        # Most drawings are flat, so aim for about one edge per cell
+        # on the largest plane of the bounding box
+        divisions = max(1, int(math.sqrt(len(self.boxes))))
+        self.bounds = tuple(lo) + tuple(hi)
+        self.origin = tuple(lo)
+        self.size = (extent / divisions) or 1.0
+
+        cells = coll.defaultdict(list)
+        for n, box in enumerate(self.boxes):
+            rng = self._cell_range(box)
+            if max(r[1] - r[0] for r in rng) >= MAX_EDGE_CELLS:
+                self.big.append(n)
+                continue
+            for i in range(rng[0][0], rng[0][1] + 1):
+                for j in range(rng[1][0], rng[1][1] + 1):
+                    for k in range(rng[2][0], rng[2][1] + 1):
+                        cells[(i, j, k)].append(n)
+        self.cells = dict(cells)
+
+    def _cell_range(self, box):
+        """Return the (first, last) cell numbers of a box in each direction."""
+        rng = []
+        for i in range(3):
+            first = int(math.floor((box[i] - self.origin[i]) / self.size))
+            last = int(math.floor((box[i + 3] - self.origin[i]) / self.size))
+            rng.append((first, last))
+        return rng
+
+    def query(self, box):
+        """Return the indices of the edges whose boxes overlap the given box.
+
+        Parameters
+        ----------
+        box: tuple
+            A tuple of 6 floats `(xmin, ymin, zmin, xmax, ymax, zmax)`,
+            as returned by `get_box`. Infinite values are allowed,
+            for example, to search along a direction.
+
+        Returns
+        -------
+        list of int
+            The sorted indices of the edges in the `edges` attribute.
+        """
+        if not self.edges:
+            return []
+        # Clip the query box to the indexed region
+        # so that the number of visited cells stays bounded
+        bounds = self.bounds
+        clipped = tuple(max(box[i], bounds[i]) for i in range(3)) \
+            + tuple(min(box[i + 3], bounds[i + 3]) for i in range(3))
+        if any(clipped[i] > clipped[i + 3] for i in range(3)):
+            return []
+
+        found = set(self.big)
+        rng = self._cell_range(clipped)
+        ncells = 1
+        for r in rng:
+            ncells *= r[1] - r[0] + 1
+        if ncells > len(self.cells):
+            # The query is bigger than the grid, visit the filled cells only
+            for cell, items in self.cells.items():
+                if all(rng[i][0] <= cell[i] <= rng[i][1] for i in range(3)):
+                    found.update(items)
+        else:
+            for i in range(rng[0][0], rng[0][1] + 1):
+                for j in range(rng[1][0], rng[1][1] + 1):
+                    for k in range(rng[2][0], rng[2][1] + 1):
+                        found.update(self.cells.get((i, j, k), ()))
+        return sorted(n for n in found if boxes_overlap(self.boxes[n], box))
+
+    def query_edges(self, box):
+        """Return the edges whose boxes overlap the given box."""
+        return [self.edges[n] for n in self.query(box)]
+
+    def nearest(self, point, radius):
+        """Return the edges lying within a distance from a point.
+
+        Parameters
+        ----------
+        point: Base::Vector3
+            The point to search around.
+
+        radius: float
+            The maximum distance between the point and the edges.
+
+        Returns
+        -------
+        list of tuple
+            A list of `(distance, edge)` tuples, sorted by distance.
+        """
+        box = (point.x - radius, point.y - radius, point.z - radius,
+               point.x + radius, point.y + radius, point.z + radius)
+        vertex = Part.Vertex(point)
+        result = []
+        for n in self.query(box):
+            edge = self.edges[n]
+            dist = edge.distToShape(vertex)[0]
+            if dist <= radius:
+                result.append((dist, edge))
+        result.sort(key=lambda x: x[0])
+        return result
+
+
+class SnapIndexCache:
+    """Keep the edge indexes of the last objects used by the Snapper.
+
+    The indexes are stored by document and object name. When the shape
+    of an object changes, its hash changes too, and the index
+    is rebuilt the next time it is requested.
+    """
+
+    def __init__(self, maxsize=MAX_CACHED_INDEXES):
+        self.maxsize = maxsize
+        self.indexes = coll.OrderedDict()
+
+    def get(self, obj, shape=None):
+        """Return the `EdgeIndex` of the given object.
+
+        Parameters
+        ----------
+        obj: App::DocumentObject
+            The object, it must have a `Shape` unless `shape` is given.
+
+        shape: Part::TopoShape, optional
+            It defaults to `None`, in which case `obj.Shape` is used.
+
+        Returns
+        -------
+        EdgeIndex
+        """
+        if shape is None:
+            shape = obj.Shape
+        name = (obj.Document.Name, obj.Name)
+        key = shape.hashCode()
+        index = self.indexes.pop(name, None)
+        if index is None or index.key != key:
+            index = EdgeIndex(shape.Edges, key)
+        self.indexes[name] = index
+        while len(self.indexes) > self.maxsize:
+            self.indexes.popitem(last=False)
+        return index
+
+    def invalidate(self, obj=None):
+        """Remove the index of an object, or all indexes if obj is None."""
+        if obj is None:
+            self.indexes.clear()
+        else:
+            self.indexes.pop((obj.Document.Name, obj.Name), None)
+
@@ -1,5 +1,6 @@
 import six
 
+import collections
 import FreeCAD, math, os, DraftVecUtils, WorkingPlane
 from FreeCAD import Vector
 from Draft import getType, getrgb, svgpatterns, gui
@@ -33,12 +34,11 @@ def getLineStyle(linestyle, scale):
 
 def getProj(vec, plane):
     if not plane: return vec
-    nx = DraftVecUtils.project(vec,plane.u)
-    lx = nx.Length
-    if abs(nx.getAngle(plane.u)) > 0.1: lx = -lx
-    ny = DraftVecUtils.project(vec,plane.v)
-    ly = ny.Length
-    if abs(ny.getAngle(plane.v)) > 0.1: ly = -ly
+    # the coordinates are the scalar projections on the plane axes
+    lx = vec.dot(plane.u)
+    if lx: lx = lx/plane.u.Length
+    ly = vec.dot(plane.v)
+    if ly: ly = ly/plane.v.Length
     #if techdraw: buggy - we now simply do it at the end
     #    ly = -ly
     return Vector(lx,ly,0)
@@ -51,14 +51,14 @@ def getDiscretized(edge, plane):
     d = int(edge.Length/ml)
     if d == 0:
         d = 1
-    edata = ""
+    edata = []
     for i in range(d+1):
         v = getProj(edge.valueAt(edge.FirstParameter+((float(i)/d)*(edge.LastParameter-edge.FirstParameter))), plane)
         if not edata:
-            edata += 'M ' + str(v.x) +' '+ str(v.y) + ' '
+            edata.append('M ' + str(v.x) +' '+ str(v.y) + ' ')
         else:
-            edata += 'L ' + str(v.x) +' '+ str(v.y) + ' '
-    return edata
+            edata.append('L ' + str(v.x) +' '+ str(v.y) + ' ')
+    return "".join(edata)
 
 
 def getPattern(pat):
@@ -67,22 +67,148 @@ def getPattern(pat):
     return ''
 
 
+# Object types that get their SVG from their view provider or from
+# other objects, and therefore can not be cached by shape only
+UNCACHED_TYPES = ["Dimension","LinearDimension","AngularDimension","Label",
+                  "Annotation","DraftText","Axis","Pipe","Rebar",
+                  "PipeConnector","Space"]
+
+# The view properties that change the SVG of a shape
+CACHED_VIEW_PROPERTIES = ["LineColor","TextColor","ShapeColor","Transparency",
+                          "DisplayMode","DrawStyle","LineWidth","EndArrow",
+                          "ArrowType","ArrowSize"]
+
+
+class SVGFragmentCache:
+    """Keeps the SVG fragments of the last exported shapes.
+
+    Fragments are stored by a key made of the shape hash, the projection
+    direction, the scale and the styling of the object, so they are
+    regenerated only when one of these changes. A reference to the shape
+    is kept together with each fragment, so its hash can not be reused
+    by another shape while the fragment is in the cache."""
+
+    def __init__(self,maxsize=2000):
+        self.maxsize = maxsize
+        self.fragments = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self,key):
+        entry = self.fragments.pop(key,None)
+        if entry is None:
+            self.misses += 1
+            return None
+        # move it to the end, as the most recently used
+        self.fragments[key] = entry
+        self.hits += 1
+        return entry[1]
+
+    def set(self,key,shape,svg):
+        self.fragments.pop(key,None)
+        self.fragments[key] = (shape,svg)
+        while len(self.fragments) > self.maxsize:
+            self.fragments.popitem(last=False)
+
+    def clear(self):
+        self.fragments.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+fragmentCache = SVGFragmentCache()
+
+
+def clearSVGCache():
+    "clears the cache of SVG fragments"
+    fragmentCache.clear()
+
+
+def getHashable(value):
+    "returns a hashable version of a getSVG() argument"
+    if isinstance(value,FreeCAD.Vector):
+        return (value.x,value.y,value.z)
+    if isinstance(value,WorkingPlane.plane):
+        return tuple(getHashable(v) for v in (value.u,value.v,value.axis,value.position))
+    if isinstance(value,(list,tuple)):
+        return tuple(getHashable(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def getCacheKey(obj,args):
+    """returns a (key,shape) tuple identifying the SVG of the given object,
+    or (None,None) if the SVG of this object can not be cached"""
+    import Part
+    if isinstance(obj,Part.Shape):
+        shape = obj
+        ident = None
+        style = None
+    elif hasattr(obj,"isDerivedFrom") and obj.isDerivedFrom("Part::Feature") \
+            and getType(obj) not in UNCACHED_TYPES:
+        shape = obj.Shape
+        ident = (obj.Document.Name,obj.Name)
+        style = None
+        vobj = getattr(obj,"ViewObject",None)
+        if vobj:
+            style = tuple(str(getattr(vobj,p)) for p in CACHED_VIEW_PROPERTIES if hasattr(vobj,p))
+    else:
+        return None,None
+    if shape.isNull():
+        return None,None
+    bb = shape.BoundBox
+    env = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Draft").GetFloat("svgDiscretization",10.0)
+    if hasattr(FreeCAD,"DraftWorkingPlane"):
+        env = (env,getHashable(FreeCAD.DraftWorkingPlane.axis))
+    key = (ident,shape.hashCode(),shape.ShapeType,
+           (bb.XMin,bb.YMin,bb.ZMin,bb.XMax,bb.YMax,bb.ZMax),
+           style,env,getHashable(args))
+    return key,shape
+
+
 def getSVG(obj,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direction=None,linestyle=None,color=None,linespacing=None,techdraw=False,rotation=0,fillSpaces=False,override=True):
     '''getSVG(object,[scale], [linewidth],[fontsize],[fillstyle],[direction],[linestyle],[color],[linespacing]):
     returns a string containing a SVG representation of the given object,
     with the given linewidth and fontsize (used if the given object contains
     any text). You can also supply an arbitrary projection vector. the
-    scale parameter allows to scale linewidths down, so they are resolution-independant.'''
+    scale parameter allows to scale linewidths down, so they are resolution-independant.
+    The SVG of shapes is cached, see SVGFragmentCache.'''
 
-    import Part, DraftGeomUtils
+    args = (scale,linewidth,fontsize,fillstyle,direction,linestyle,color,linespacing,techdraw,rotation,fillSpaces,override)
 
     # if this is a group, gather all the svg views of its children
     if hasattr(obj,"isDerivedFrom"):
         if obj.isDerivedFrom("App::DocumentObjectGroup") or getType(obj) == "Layer":
-            svg = ""
-            for child in obj.Group:
-                svg += getSVG(child,scale,linewidth,fontsize,fillstyle,direction,linestyle,color,linespacing,techdraw,rotation,fillSpaces,override)
+            return "".join([getSVG(child,*args) for child in obj.Group])
+
+    key,shape = getCacheKey(obj,args)
+    if key is not None:
+        svg = fragmentCache.get(key)
+        if svg is not None:
             return svg
+    svg = getUncachedSVG(obj,*args)
+    if key is not None:
+        fragmentCache.set(key,shape,svg)
+    return svg
+
+
+def getSVGFragments(objs,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direction=None,linestyle=None,color=None,linespacing=None,techdraw=False,rotation=0,fillSpaces=False,override=True):
+    '''getSVGFragments(objects,[scale],...):
+    returns a list with the SVG representation of each of the given objects,
+    with the same arguments as getSVG. The objects must be independent from
+    each other, and the whole list can be joined into one SVG string.'''
+
+    args = (scale,linewidth,fontsize,fillstyle,direction,linestyle,color,linespacing,techdraw,rotation,fillSpaces,override)
+    return [getSVG(o,*args) for o in objs]
+
+
+def getUncachedSVG(obj,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direction=None,linestyle=None,color=None,linespacing=None,techdraw=False,rotation=0,fillSpaces=False,override=True):
+    "returns the SVG representation of a single object, see getSVG"
+
+    import Part, DraftGeomUtils
 
     pathdata = []
     svg = ""
@@ -153,7 +279,7 @@ def getSVG(obj,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direct
                 w1.fixWire()
                 egroups.append(Part.__sortEdges__(w1.Edges))
         for egroupindex, edges in enumerate(egroups):
-            edata = ""
+            edata = []
             vs=() #skipped for the first edge
             for edgeindex,e in enumerate(edges):
                 previousvs = vs
@@ -164,7 +290,7 @@ def getSVG(obj,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direct
                         vs.reverse()
                 if edgeindex == 0:
                     v = getProj(vs[0].Point, plane)
-                    edata += 'M '+ str(v.x) +' '+ str(v.y) + ' '
+                    edata.append('M '+ str(v.x) +' '+ str(v.y) + ' ')
                 else:
                     if (vs[0].Point-previousvs[-1].Point).Length > 1e-6:
                         raise ValueError('edges not ordered')
@@ -191,7 +317,7 @@ def getSVG(obj,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direct
                                 except:
                                     pass
                                 else:
-                                    edata += a
+                                    edata.append(a)
                                     done = True
                         if not done:
                             if len(e.Vertexes) == 1 and iscircle: #complete curve
@@ -228,15 +354,15 @@ def getSVG(obj,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direct
                             t2 = e.tangentAt(e.FirstParameter + (e.LastParameter-e.FirstParameter)/10)
                             flag_sweep = (DraftVecUtils.angle(t1,t2,drawing_plane_normal) < 0)
                             for v in endpoints:
-                                edata += 'A %s %s %s %s %s %s %s ' % \
+                                edata.append('A %s %s %s %s %s %s %s ' % \
                                         (str(rx),str(ry),str(rot),\
                                         str(int(flag_large_arc)),\
-                                        str(int(flag_sweep)),str(v.x),str(v.y))
+                                        str(int(flag_sweep)),str(v.x),str(v.y)))
                     else:
-                        edata += getDiscretized(e, plane)
+                        edata.append(getDiscretized(e, plane))
                 elif DraftGeomUtils.geomType(e) == "Line":
                     v = getProj(vs[-1].Point, plane)
-                    edata += 'L '+ str(v.x) +' '+ str(v.y) + ' '
+                    edata.append('L '+ str(v.x) +' '+ str(v.y) + ' ')
                 else:
                     bspline=e.Curve.toBSpline(e.FirstParameter,e.LastParameter)
                     if bspline.Degree > 3 or bspline.isRational():
@@ -249,22 +375,23 @@ def getSVG(obj,scale=1,linewidth=0.35,fontsize=12,fillstyle="shape color",direct
                             if bezierseg.Degree>3: #should not happen
                                 raise AssertionError
                             elif bezierseg.Degree==1:
-                                edata +='L '
+                                edata.append('L ')
                             elif bezierseg.Degree==2:
-                                edata +='Q '
+                                edata.append('Q ')
                             elif bezierseg.Degree==3:
-                                edata +='C '
+                                edata.append('C ')
                             for pole in bezierseg.getPoles()[1:]:
                                 v = getProj(pole, plane)
-                                edata += str(v.x) +' '+ str(v.y) + ' '
+                                edata.append(str(v.x) +' '+ str(v.y) + ' ')
                     else:
                         print("Debug: one edge (hash ",e.hashCode(),\
                                 ") has been discretized with parameter 0.1")
                         for linepoint in bspline.discretize(0.1)[1:]:
                             v = getProj(linepoint, plane)
-                            edata += 'L '+ str(v.x) +' '+ str(v.y) + ' '
+                            edata.append('L '+ str(v.x) +' '+ str(v.y) + ' ')
             if fill != 'none':
-                edata += 'Z '
+                edata.append('Z ')
+            edata = "".join(edata)
             if edata in pathdata:
                 # do not draw a path on another identical path
                 return ""
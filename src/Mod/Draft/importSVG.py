@@ -28,6 +28,9 @@ Currently it only reads the following entities:
 
 Currently unsupported:
 * use, image.
+
+Large files can be imported in a faster streaming mode,
+see `svgStreamImporter`, that creates one compound object per layer.
 """
 ## @package importSVG
 #  \ingroup DRAFT
@@ -51,6 +54,7 @@ __url__ = "https://www.freecadweb.org"
 import math
 import os
 import re
+import time
 import xml.sax
 
 import FreeCAD
@@ -615,6 +619,181 @@ def arcend2center(lastvec, currentvec, rx, ry,
     return results, (rx, ry)
 
 
+def makearc(lastvec, currentvec, rx, ry, xrotation, largeflag, sweepflag):
+    """Make an edge from the parameters of an SVG arc path command.
+
+    Parameters
+    ----------
+    lastvec : Base::Vector3
+        The start point of the arc.
+    currentvec : Base::Vector3
+        The end point of the arc.
+    rx, ry : float
+        The radii of the arc.
+    xrotation : float
+        The rotation of the x axis of the ellipse, in degrees.
+    largeflag, sweepflag : float
+        The large-arc and sweep flags of the arc command.
+
+    Returns
+    -------
+    Part::Edge
+        A circular arc, or an elliptical arc.
+    """
+    chord = currentvec.sub(lastvec)
+    # small circular arc
+    _precision = 10**(-1*Draft.precision())
+    if (not largeflag) and abs(rx - ry) < _precision:
+        # perp = chord.cross(Vector(0, 0, -1))
+        # here is a better way to find the perpendicular
+        if sweepflag == 1:
+            # clockwise
+            perp = DraftVecUtils.rotate2D(chord, -math.pi/2)
+        else:
+            # anticlockwise
+            perp = DraftVecUtils.rotate2D(chord, math.pi/2)
+        chord.multiply(0.5)
+        if chord.Length > rx:
+            a = 0
+        else:
+            a = math.sqrt(rx**2 - chord.Length**2)
+        s = rx - a
+        perp.multiply(s/perp.Length)
+        midpoint = lastvec.add(chord.add(perp))
+        _seg = Part.Arc(lastvec, midpoint, currentvec)
+        seg = _seg.toShape()
+    # big arc or elliptical arc
+    else:
+        # Calculate the possible centers for an arc
+        # in 'endpoint parameterization'.
+        _xrot = math.radians(-xrotation)
+        (solution,
+         (rx, ry)) = arcend2center(lastvec, currentvec,
+                                   rx, ry,
+                                   xrotation=_xrot,
+                                   correction=True)
+        # Chose one of the two solutions
+        negsol = (largeflag != sweepflag)
+        vcenter, angle1, angledelta = solution[negsol]
+        # print(angle1)
+        # print(angledelta)
+        if ry > rx:
+            rx, ry = ry, rx
+            swapaxis = True
+        else:
+            swapaxis = False
+        # print('Elliptical arc %s rx=%f ry=%f'
+        #       % (vcenter, rx, ry))
+        e1 = Part.Ellipse(vcenter, rx, ry)
+        if sweepflag:
+            # Step4
+            # angledelta = -(-angledelta % (2*math.pi))
+            # angledelta = (-angledelta % (2*math.pi))
+            angle1 = angle1 + angledelta
+            angledelta = -angledelta
+            # angle1 = math.pi - angle1
+
+        d90 = math.radians(90)
+        e1a = Part.Arc(e1,
+                       angle1 - swapaxis * d90,
+                       angle1 + angledelta - swapaxis * d90)
+        # e1a = Part.Arc(e1,
+        #                angle1 - 0 * swapaxis * d90,
+        #                angle1 + angledelta
+        #                       - 0 * swapaxis * d90)
+        _precision = 10**(-1*Draft.precision())
+        if swapaxis or xrotation > _precision:
+            m3 = FreeCAD.Matrix()
+            m3.move(vcenter)
+            # 90
+            rot90 = FreeCAD.Matrix(0, -1, 0, 0, 1, 0)
+            # swapaxism = FreeCAD.Matrix(0, 1, 0, 0, 1, 0)
+            if swapaxis:
+                m3 = m3.multiply(rot90)
+            m3.rotateZ(math.radians(-xrotation))
+            m3.move(vcenter.multiply(-1))
+            e1a.transform(m3)
+        seg = e1a.toShape()
+        if sweepflag:
+            seg.reverse()
+    return seg
+
+
+def getmatrix(tr):
+    """Return a FreeCAD matrix from an SVG transform attribute.
+
+    Parameters
+    ----------
+    tr : str
+        The type of transform: 'matrix', 'translate', 'scale',
+        'rotate', 'skewX', 'skewY' and its value
+
+    Returns
+    -------
+    Base::Matrix4D
+        The translated matrix.
+    """
+    _op = '(matrix|translate|scale|rotate|skewX|skewY)'
+    _val = '\((.*?)\)'
+    _transf = _op + '\s*?' + _val
+    transformre = re.compile(_transf, re.DOTALL)
+    m = FreeCAD.Matrix()
+    for transformation, arguments in transformre.findall(tr):
+        _args_rep = arguments.replace(',', ' ').split()
+        argsplit = [float(arg) for arg in _args_rep]
+        # m.multiply(FreeCAD.Matrix(1, 0, 0, 0, 0, -1))
+        # print('%s:%s %s %d' % (transformation, arguments,
+        #                        argsplit, len(argsplit)))
+        if transformation == 'translate':
+            tx = argsplit[0]
+            ty = argsplit[1] if len(argsplit) > 1 else 0.0
+            m.move(Vector(tx, -ty, 0))
+        elif transformation == 'scale':
+            sx = argsplit[0]
+            sy = argsplit[1] if len(argsplit) > 1 else sx
+            m.scale(Vector(sx, sy, 1))
+        elif transformation == 'rotate':
+            cx = 0
+            cy = 0
+            angle = argsplit[0]
+            if len(argsplit) >= 3:
+                cx = argsplit[1]
+                cy = argsplit[2]
+                m.move(Vector(cx, -cy, 0))
+            # Mirroring one axis is equal to changing the direction
+            # of rotation
+            m.rotateZ(math.radians(-angle))
+            if len(argsplit) >= 3:
+                m.move(Vector(-cx, cy, 0))
+        elif transformation == 'skewX':
+            _m = FreeCAD.Matrix(1,
+                                -math.tan(math.radians(argsplit[0])))
+            m = m.multiply(_m)
+        elif transformation == 'skewY':
+            _m = FreeCAD.Matrix(1, 0, 0, 0,
+                                -math.tan(math.radians(argsplit[0])))
+            m = m.multiply(_m)
+        elif transformation == 'matrix':
+            # transformation matrix:
+            #    FreeCAD                 SVG
+            # (+A -C +0 +E)           (A C 0 E)
+            # (-B +D -0 -F)  = (-Y) * (B D 0 F) * (-Y)
+            # (+0 -0 +1 +0)           (0 0 1 0)
+            # (+0 -0 +0 +1)           (0 0 0 1)
+            #
+            # Put the first two rows of the matrix
+            _m = FreeCAD.Matrix(argsplit[0], -argsplit[2],
+                                0, argsplit[4],
+                                -argsplit[1], argsplit[3],
+                                0, -argsplit[5])
+            m = m.multiply(_m)
+        # else:
+        #    print('SKIPPED %s' % transformation)
+        # print("m = ", m)
+    # print("generating transformation: ", m)
+    return m
+
+
 def getrgb(color):
     """Return an RGB hexadecimal string '#00aaff' from a FreeCAD color.
 
@@ -978,91 +1157,9 @@ class svgHandler(xml.sax.ContentHandler):
                             currentvec = lastvec.add(Vector(x, -y, 0))
                         else:
                             currentvec = Vector(x, -y, 0)
-                        chord = currentvec.sub(lastvec)
-                        # small circular arc
-                        _precision = 10**(-1*Draft.precision())
-                        if (not largeflag) and abs(rx - ry) < _precision:
-                            # perp = chord.cross(Vector(0, 0, -1))
-                            # here is a better way to find the perpendicular
-                            if sweepflag == 1:
-                                # clockwise
-                                perp = DraftVecUtils.rotate2D(chord,
-                                                              -math.pi/2)
-                            else:
-                                # anticlockwise
-                                perp = DraftVecUtils.rotate2D(chord, math.pi/2)
-                            chord.multiply(0.5)
-                            if chord.Length > rx:
-                                a = 0
-                            else:
-                                a = math.sqrt(rx**2 - chord.Length**2)
-                            s = rx - a
-                            perp.multiply(s/perp.Length)
-                            midpoint = lastvec.add(chord.add(perp))
-                            _seg = Part.Arc(lastvec, midpoint, currentvec)
-                            seg = _seg.toShape()
-                        # big arc or elliptical arc
-                        else:
-                            # Calculate the possible centers for an arc
-                            # in 'endpoint parameterization'.
-                            _xrot = math.radians(-xrotation)
-                            (solution,
-                             (rx, ry)) = arcend2center(lastvec,
-                                                       currentvec,
-                                                       rx, ry,
-                                                       xrotation=_xrot,
-                                                       correction=True)
-                            # Chose one of the two solutions
-                            negsol = (largeflag != sweepflag)
-                            vcenter, angle1, angledelta = solution[negsol]
-                            # print(angle1)
-                            # print(angledelta)
-                            if ry > rx:
-                                rx, ry = ry, rx
-                                swapaxis = True
-                            else:
-                                swapaxis = False
-                            # print('Elliptical arc %s rx=%f ry=%f'
-                            #       % (vcenter, rx, ry))
-                            e1 = Part.Ellipse(vcenter, rx, ry)
-                            if sweepflag:
-                                # Step4
-                                # angledelta = -(-angledelta % (2*math.pi))
-                                # angledelta = (-angledelta % (2*math.pi))
-                                angle1 = angle1 + angledelta
-                                angledelta = -angledelta
-                                # angle1 = math.pi - angle1
-
-                            d90 = math.radians(90)
-                            e1a = Part.Arc(e1,
-                                           angle1 - swapaxis * d90,
-                                           angle1 + angledelta
-                                                  - swapaxis * d90)
-                            # e1a = Part.Arc(e1,
-                            #                angle1 - 0 * swapaxis * d90,
-                            #                angle1 + angledelta
-                            #                       - 0 * swapaxis * d90)
-                            _precision = 10**(-1*Draft.precision())
-                            if swapaxis or xrotation > _precision:
-                                m3 = FreeCAD.Matrix()
-                                m3.move(vcenter)
-                                # 90
-                                rot90 = FreeCAD.Matrix(0, -1, 0, 0, 1, 0)
-                                # swapaxism = FreeCAD.Matrix(0, 1, 0, 0, 1, 0)
-                                if swapaxis:
-                                    m3 = m3.multiply(rot90)
-                                m3.rotateZ(math.radians(-xrotation))
-                                m3.move(vcenter.multiply(-1))
-                                e1a.transform(m3)
-                            seg = e1a.toShape()
-                            if sweepflag:
-                                seg.reverse()
-                                # DEBUG
-                                # obj = self.doc.addObject("Part::Feature",
-                                #                       'DEBUG %s' % pathname)
-                                # obj.Shape = seg
-                                # _seg = Part.LineSegment(lastvec, currentvec)
-                                # seg = _seg.toShape()
+                        seg = makearc(lastvec, currentvec,
+                                      rx, ry, xrotation,
+                                      largeflag, sweepflag)
                         lastvec = currentvec
                         lastpole = None
                         path.append(seg)
@@ -1560,78 +1657,490 @@ class svgHandler(xml.sax.ContentHandler):
     def getMatrix(self, tr):
         """Return a FreeCAD matrix from an SVG transform attribute.
 
-        Parameters
-        ----------
-        tr : str
-            The type of transform: 'matrix', 'translate', 'scale',
-            'rotate', 'skewX', 'skewY' and its value
-
-        Returns
-        -------
-        Base::Matrix4D
-            The translated matrix.
+        See `getmatrix`.
+        """
+        return getmatrix(tr)
+    # getMatrix
+# class svgHandler
+
+
+# Tokens of the path data: a command letter or a number
+PATHTOKENS = re.compile(r"([MmZzLlHhVvCcSsQqTtAa])"
+                        r"|([-+]?(?:[0-9]*\.[0-9]+|[0-9]+\.?)"
+                        r"(?:[eE][-+]?[0-9]+)?)")
+
+# Number of arguments taken by each path command
+PATHARGS = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4,
+            'Q': 4, 'T': 2, 'A': 7, 'Z': 0}
+
+
+def tokenizepath(d):
+    """Split the data of an SVG path into commands and their arguments.
+
+    Parameters
+    ----------
+    d : str
+        The `d` attribute of a path element.
+
+    Returns
+    -------
+    list
+        A list of `(command, arguments)` tuples, where the arguments
+        are a list of floats. Implicit repetitions of a command
+        are returned as separate commands; a repeated moveto
+        is returned as a lineto, as the SVG specification states.
+    """
+    result = []
+    command = None
+    args = []
+    for cmd, num in PATHTOKENS.findall(d):
+        if cmd:
+            if command and not PATHARGS[command.upper()]:
+                result.append((command, []))
+            command = cmd
+            args = []
+            continue
+        if command is None:
+            continue
+        args.append(float(num))
+        nargs = PATHARGS[command.upper()]
+        if len(args) == nargs:
+            result.append((command, args))
+            args = []
+            if command == 'M':
+                command = 'L'
+            elif command == 'm':
+                command = 'l'
+    if command and not PATHARGS[command.upper()]:
+        result.append((command, []))
+    return result
+
+
+def isidentity(m):
+    """Return True if the matrix does not change points in the XY plane."""
+    return (m.A11 == 1 and m.A12 == 0 and m.A14 == 0
+            and m.A21 == 0 and m.A22 == 1 and m.A24 == 0)
+
+
+class svgStreamImporter:
+    """Import large SVG files quickly, in a streaming way.
+
+    The file is read with `xml.etree.ElementTree.iterparse`,
+    so the elements are discarded as soon as they are processed.
+    The transformations of the groups are multiplied together once,
+    and applied to the points of the paths before creating the edges.
+    Consecutive straight segments are created at once as polygons,
+    and the shapes of each layer (top level group) are gathered
+    in a single compound, so only one document object is created
+    per layer.
+
+    Text, symbols, images and dimensions are not imported in this mode.
+
+    Parameters
+    ----------
+    doc : App::Document
+        The document in which the objects are created.
+    """
+
+    def __init__(self, doc):
+        _prefs = "User parameter:BaseApp/Preferences/Mod/Draft"
+        params = FreeCAD.ParamGet(_prefs)
+        self.doc = doc
+        self.disableUnitScaling = params.GetBool("svgDisableUnitScaling",
+                                                 False)
+        self.svgdpi = 96.0
+        self.layers = []
+        self.skipped = 0
+        self.count = 0
+        self.timing = {}
+
+        global Part
+        import Part
+
+    def read(self, filename):
+        """Read the file and return the list of created objects."""
+        import xml.etree.ElementTree as ET
+
+        t0 = time.time()
+        self.layers = []
+        # stack of (element, matrix, style, layer, hidden) tuples
+        stack = []
+        f = pythonopen(filename, 'rb')
+        for event, elem in ET.iterparse(f, events=('start', 'end')):
+            tag = elem.tag.rsplit('}', 1)[-1]
+            if event == 'start':
+                stack.append(self.startElement(tag, elem, stack))
+                continue
+            matrix, style, layer, hidden = stack.pop()[1:]
+            if hidden:
+                pass
+            elif tag in ('path', 'rect', 'line', 'polyline', 'polygon',
+                       'circle', 'ellipse'):
+                self.count += 1
+                try:
+                    sh = self.makeShape(tag, elem, matrix, style)
+                except Exception as e:
+                    FCC.PrintWarning("Unable to import %s %s: %s\n"
+                                     % (tag, elem.get('id', ''), e))
+                    sh = None
+                if sh:
+                    layer[1].append(sh)
+                    if layer[2] is None:
+                        layer[2] = style
+            elif tag not in ('svg', 'g', 'defs', 'metadata', 'title',
+                             'desc', 'namedview'):
+                self.skipped += 1
+            # discard the processed element
+            if stack:
+                stack[-1][0].remove(elem)
+            elem.clear()
+        f.close()
+        t1 = time.time()
+
+        objs = []
+        for name, shapes, style in self.layers:
+            if not shapes:
+                continue
+            obj = self.doc.addObject("Part::Feature", name)
+            obj.Shape = Part.makeCompound(shapes)
+            self.format(obj, style)
+            objs.append(obj)
+        t2 = time.time()
+        self.timing = {'parse': t1 - t0, 'objects': t2 - t1}
+        FCC.PrintMessage("SVG streaming import: %d elements in %d objects, "
+                         "%d elements skipped, parsing %.2f s, "
+                         "objects %.2f s\n"
+                         % (self.count, len(objs), self.skipped,
+                            t1 - t0, t2 - t1))
+        return objs
+
+    def startElement(self, tag, elem, stack):
+        """Return the (element, matrix, style, layer, hidden) tuple.
+
+        The matrix is the transformation of the element multiplied
+        by the ones of its parents, and hidden is True for elements that
+        are not drawn directly, like the contents of definitions.
         """
-        _op = '(matrix|translate|scale|rotate|skewX|skewY)'
-        _val = '\((.*?)\)'
-        _transf = _op + '\s*?' + _val
-        transformre = re.compile(_transf, re.DOTALL)
+        if stack:
+            matrix, style, layer, hidden = stack[-1][1:]
+        else:
+            matrix = FreeCAD.Matrix()
+            style = {}
+            layer = None
+            hidden = False
+        if tag in ('defs', 'symbol', 'clipPath', 'mask',
+                   'pattern', 'marker'):
+            hidden = True
+
+        if tag == 'svg':
+            own = self.getViewBoxMatrix(elem, not stack)
+            if own:
+                matrix = matrix.multiply(own)
+        elif 'transform' in elem.attrib:
+            matrix = matrix.multiply(getmatrix(elem.get('transform')))
+
+        style = self.getStyle(elem, style)
+
+        # top level groups, and the elements outside of them,
+        # go into separate layers
+        if layer is None or (tag == 'g' and len(stack) == 1):
+            name = 'Layer'
+            if tag == 'g':
+                for key, value in elem.attrib.items():
+                    if key.endswith('}label'):
+                        name = value
+                        break
+                else:
+                    name = elem.get('id', name)
+            layer = [name, [], None]
+            self.layers.append(layer)
+        return (elem, matrix, style, layer, hidden)
+
+    def getViewBoxMatrix(self, elem, toplevel):
+        """Return the scaling matrix of an svg element, or None."""
+        if toplevel:
+            version = None
+            for key, value in elem.attrib.items():
+                if key.endswith('}version') and 'inkscape' in key:
+                    version = re.search(r"\d+\.\d+", value)
+            if version and float(version.group(0)) < 0.92:
+                self.svgdpi = 90.0
+        if self.disableUnitScaling:
+            return None
         m = FreeCAD.Matrix()
-        for transformation, arguments in transformre.findall(tr):
-            _args_rep = arguments.replace(',', ' ').split()
-            argsplit = [float(arg) for arg in _args_rep]
-            # m.multiply(FreeCAD.Matrix(1, 0, 0, 0, 0, -1))
-            # print('%s:%s %s %d' % (transformation, arguments,
-            #                        argsplit, len(argsplit)))
-            if transformation == 'translate':
-                tx = argsplit[0]
-                ty = argsplit[1] if len(argsplit) > 1 else 0.0
-                m.move(Vector(tx, -ty, 0))
-            elif transformation == 'scale':
-                sx = argsplit[0]
-                sy = argsplit[1] if len(argsplit) > 1 else sx
+        viewbox = elem.get('viewBox')
+        if elem.get('width') and elem.get('height') and viewbox:
+            vb = viewbox.replace(',', ' ').split()
+            vbw = float(vb[2])
+            vbh = float(vb[3])
+            if toplevel:
+                unitmode = 'mm' + str(self.svgdpi)
+            else:
+                unitmode = 'css' + str(self.svgdpi)
+            sx = getsize(elem.get('width'), unitmode) / vbw
+            sy = getsize(elem.get('height'), unitmode) / vbh
+            preserve = elem.get('preserveAspectRatio', '').lower()
+            if round(sx/sy, 5) == 1 or preserve.startswith('none'):
                 m.scale(Vector(sx, sy, 1))
-            elif transformation == 'rotate':
-                cx = 0
-                cy = 0
-                angle = argsplit[0]
-                if len(argsplit) >= 3:
-                    cx = argsplit[1]
-                    cy = argsplit[2]
-                    m.move(Vector(cx, -cy, 0))
-                # Mirroring one axis is equal to changing the direction
-                # of rotation
-                m.rotateZ(math.radians(-angle))
-                if len(argsplit) >= 3:
-                    m.move(Vector(-cx, cy, 0))
-            elif transformation == 'skewX':
-                _m = FreeCAD.Matrix(1,
-                                    -math.tan(math.radians(argsplit[0])))
-                m = m.multiply(_m)
-            elif transformation == 'skewY':
-                _m = FreeCAD.Matrix(1, 0, 0, 0,
-                                    -math.tan(math.radians(argsplit[0])))
-                m = m.multiply(_m)
-            elif transformation == 'matrix':
-                # transformation matrix:
-                #    FreeCAD                 SVG
-                # (+A -C +0 +E)           (A C 0 E)
-                # (-B +D -0 -F)  = (-Y) * (B D 0 F) * (-Y)
-                # (+0 -0 +1 +0)           (0 0 1 0)
-                # (+0 -0 +0 +1)           (0 0 0 1)
-                #
-                # Put the first two rows of the matrix
-                _m = FreeCAD.Matrix(argsplit[0], -argsplit[2],
-                                    0, argsplit[4],
-                                    -argsplit[1], argsplit[3],
-                                    0, -argsplit[5])
-                m = m.multiply(_m)
-            # else:
-            #    print('SKIPPED %s' % transformation)
-            # print("m = ", m)
-        # print("generating transformation: ", m)
+            elif preserve.endswith('slice'):
+                m.scale(Vector(max(sx, sy), max(sx, sy), 1))
+            else:
+                m.scale(Vector(min(sx, sy), min(sx, sy), 1))
+        elif toplevel:
+            m.scale(Vector(25.4/self.svgdpi, 25.4/self.svgdpi, 1))
+        else:
+            return None
         return m
-    # getMatrix
-# class svgHandler
+
+    def getStyle(self, elem, parent):
+        """Return the fill and stroke of an element, inherited from parent."""
+        items = {}
+        for key in ('fill', 'stroke', 'stroke-width'):
+            if key in elem.attrib:
+                items[key] = elem.get(key)
+        if elem.get('style'):
+            for pair in elem.get('style').replace(' ', '').split(';'):
+                pair = pair.split(':')
+                if len(pair) > 1 and pair[0] in ('fill', 'stroke',
+                                                 'stroke-width'):
+                    items[pair[0]] = pair[1]
+        if not items:
+            return parent
+        style = dict(parent)
+        style.update(items)
+        return style
+
+    def format(self, obj, style):
+        """Apply the style of the first shape of a layer to its object."""
+        if not (FreeCAD.GuiUp and style):
+            return
+        v = obj.ViewObject
+        if style.get('stroke', 'none') != 'none':
+            v.LineColor = getcolor(style['stroke'])
+        if style.get('stroke-width', 'none') != 'none':
+            v.LineWidth = getsize(style['stroke-width'],
+                                  'css' + str(self.svgdpi))
+        if style.get('fill', 'none') != 'none':
+            v.ShapeColor = getcolor(style['fill'])
+
+    def makeShape(self, tag, elem, matrix, style):
+        """Return the shape of an element, transformed by the matrix."""
+        fill = style.get('fill', 'none') != 'none'
+        css = 'css' + str(self.svgdpi)
+
+        def size(key):
+            return getsize(elem.get(key, '0'), css)
+
+        if tag == 'path':
+            return self.makePath(elem.get('d', ''), matrix, fill)
+        elif tag == 'rect':
+            x, y, w, h = size('x'), size('y'), size('width'), size('height')
+            rx = size('rx') or size('ry')
+            ry = size('ry') or rx
+            if rx or ry:
+                rx = min(rx, w/2.0)
+                ry = min(ry, h/2.0)
+                d = ("M %f %f H %f A %f %f 0 0 1 %f %f V %f "
+                     "A %f %f 0 0 1 %f %f H %f A %f %f 0 0 1 %f %f V %f "
+                     "A %f %f 0 0 1 %f %f Z"
+                     % (x + rx, y, x + w - rx, rx, ry, x + w, y + ry,
+                        y + h - ry, rx, ry, x + w - rx, y + h, x + rx,
+                        rx, ry, x, y + h - ry, y + ry, rx, ry, x + rx, y))
+                return self.makePath(d, matrix, fill)
+            points = [(x, y), (x + w, y), (x + w, y + h), (x, y + h), (x, y)]
+            return self.makePolygon(points, matrix, fill)
+        elif tag == 'line':
+            points = [(size('x1'), size('y1')), (size('x2'), size('y2'))]
+            return self.makePolygon(points, matrix, False)
+        elif tag in ('polyline', 'polygon'):
+            nums = [float(n) for n, e in
+                    re.findall(r"([-+]?[0-9]*\.?[0-9]+([eE][-+]?[0-9]+)?)",
+                               elem.get('points', ''))]
+            points = list(zip(nums[0::2], nums[1::2]))
+            if tag == 'polygon' and points:
+                points.append(points[0])
+            return self.makePolygon(points, matrix,
+                                    fill and tag == 'polygon')
+        elif tag in ('circle', 'ellipse'):
+            c = Vector(size('cx'), -size('cy'), 0)
+            if tag == 'circle':
+                rx = ry = size('r')
+            else:
+                rx, ry = size('rx'), size('ry')
+            if rx <= 0 or ry <= 0:
+                return None
+            if rx == ry:
+                sh = Part.makeCircle(rx, c)
+            elif rx > ry:
+                sh = Part.Ellipse(c, rx, ry).toShape()
+            else:
+                sh = Part.Ellipse(c, ry, rx).toShape()
+                # rotate the major axis to the Y direction, around the center
+                m = FreeCAD.Matrix()
+                m.move(c.negative())
+                m.rotateZ(math.radians(90))
+                m.move(c)
+                sh.transformShape(m)
+            sh = Part.Wire([sh])
+            if fill:
+                sh = Part.Face(sh)
+            if not isidentity(matrix):
+                sh = sh.transformGeometry(matrix)
+            return sh
+        return None
+
+    def transformPoints(self, points, matrix):
+        """Return FreeCAD vectors from SVG (x, y) points and a matrix."""
+        a11, a12, a14 = matrix.A11, matrix.A12, matrix.A14
+        a21, a22, a24 = matrix.A21, matrix.A22, matrix.A24
+        # SVG coordinates are flipped in Y
+        return [Vector(a11*x - a12*y + a14, a21*x - a22*y + a24, 0)
+                for x, y in points]
+
+    def makePolygon(self, points, matrix, fill):
+        """Return a wire, or a face, through the given SVG points."""
+        vecs = []
+        for v in self.transformPoints(points, matrix):
+            if not vecs or not DraftVecUtils.equals(vecs[-1], v):
+                vecs.append(v)
+        if len(vecs) < 2:
+            return None
+        sh = Part.makePolygon(vecs)
+        if fill and sh.isClosed():
+            sh = Part.Face(sh)
+        return sh
+
+    def makePath(self, d, matrix, fill):
+        """Return the shape of the data of a path element.
+
+        Each subpath becomes a wire, or a face if it is closed and filled;
+        several subpaths are returned as a compound.
+        """
+        shapes = []
+        edges = []
+        poly = []
+        identity = isidentity(matrix)
+        tr = lambda pts: self.transformPoints(pts, matrix)
+
+        def flush():
+            # create the pending straight segments as one polygon
+            if len(poly) > 1:
+                edges.extend(Part.makePolygon(poly).Edges)
+            del poly[1:]
+
+        def close():
+            flush()
+            del poly[:]
+            if not edges:
+                return
+            try:
+                sh = Part.Wire(edges)
+            except Part.OCCError:
+                sh = makewire(edges)
+            if fill and sh.isClosed():
+                try:
+                    sh = Part.Face(sh)
+                except Part.OCCError:
+                    pass
+            shapes.append(sh)
+            del edges[:]
+
+        def lineto(x, y):
+            v = tr([(x, y)])[0]
+            if not poly:
+                poly.append(tr([(last[0], last[1])])[0])
+            if not DraftVecUtils.equals(poly[-1], v):
+                poly.append(v)
+
+        def curveto(pts):
+            flush()
+            poles = tr([last] + pts)
+            if DraftVecUtils.equals(poles[0], poles[-1]):
+                return
+            b = Part.BezierCurve()
+            b.setPoles(poles)
+            edges.append(b.toShape())
+            del poly[:]
+            poly.append(poles[-1])
+
+        last = (0.0, 0.0)
+        first = last
+        lastpole = None
+        for cmd, args in tokenizepath(d):
+            rel = cmd.islower()
+            cmd = cmd.upper()
+            ox, oy = last if rel else (0.0, 0.0)
+            if cmd == 'M':
+                close()
+                last = (ox + args[0], oy + args[1])
+                first = last
+            elif cmd == 'L':
+                lineto(ox + args[0], oy + args[1])
+                last = (ox + args[0], oy + args[1])
+            elif cmd == 'H':
+                lineto(ox + args[0], last[1])
+                last = (ox + args[0], last[1])
+            elif cmd == 'V':
+                lineto(last[0], oy + args[0])
+                last = (last[0], oy + args[0])
+            elif cmd in ('C', 'S'):
+                if cmd == 'S':
+                    if lastpole and lastpole[0] == 'C':
+                        p1 = (2*last[0] - lastpole[1][0],
+                              2*last[1] - lastpole[1][1])
+                    else:
+                        p1 = last
+                    args = [p1[0] - ox, p1[1] - oy] + args
+                pts = [(ox + args[0], oy + args[1]),
+                       (ox + args[2], oy + args[3]),
+                       (ox + args[4], oy + args[5])]
+                curveto(pts)
+                last = pts[2]
+                lastpole = ('C', pts[1])
+                continue
+            elif cmd in ('Q', 'T'):
+                if cmd == 'T':
+                    if lastpole and lastpole[0] == 'Q':
+                        p1 = (2*last[0] - lastpole[1][0],
+                              2*last[1] - lastpole[1][1])
+                    else:
+                        p1 = last
+                    args = [p1[0] - ox, p1[1] - oy] + args
+                pts = [(ox + args[0], oy + args[1]),
+                       (ox + args[2], oy + args[3])]
+                curveto(pts)
+                last = pts[1]
+                lastpole = ('Q', pts[0])
+                continue
+            elif cmd == 'A':
+                end = (ox + args[5], oy + args[6])
+                if end != last and args[0] and args[1]:
+                    flush()
+                    seg = makearc(Vector(last[0], -last[1], 0),
+                                  Vector(end[0], -end[1], 0),
+                                  abs(args[0]), abs(args[1]), args[2],
+                                  args[3], args[4])
+                    if not identity:
+                        seg = seg.transformGeometry(matrix)
+                    edges.append(seg)
+                    del poly[:]
+                    poly.append(tr([end])[0])
+                elif end != last:
+                    lineto(*end)
+                last = end
+            elif cmd == 'Z':
+                if last != first:
+                    lineto(*first)
+                close()
+                last = first
+            lastpole = None
+        close()
+        if not shapes:
+            return None
+        if len(shapes) == 1:
+            return shapes[0]
+        return Part.makeCompound(shapes)
+# class svgStreamImporter
 
 
 def decodeName(name):
@@ -1708,6 +2217,15 @@ def getContents(filename, tag, stringmode=False):
     return result
 
 
+def usestreaming():
+    """Return True if the streaming import mode is set in the preferences.
+
+    See `svgStreamImporter`.
+    """
+    _prefs = "User parameter:BaseApp/Preferences/Mod/Draft"
+    return FreeCAD.ParamGet(_prefs).GetBool("svgStreamingImport", False)
+
+
 def open(filename):
     """Open filename and parse using the svgHandler().
 
@@ -1725,6 +2243,11 @@ def open(filename):
     doc = FreeCAD.newDocument(docname)
     doc.Label = docname[:-4]
 
+    if usestreaming():
+        svgStreamImporter(doc).read(filename)
+        doc.recompute()
+        return doc
+
     # Set up the parser
     parser = xml.sax.make_parser()
     parser.setFeature(xml.sax.handler.feature_external_ges, False)
@@ -1764,6 +2287,11 @@ def insert(filename, docname):
         doc = FreeCAD.newDocument(docname)
     FreeCAD.ActiveDocument = doc
 
+    if usestreaming():
+        svgStreamImporter(doc).read(filename)
+        doc.recompute()
+        return doc
+
     # Set up the parser
     parser = xml.sax.make_parser()
     parser.setFeature(xml.sax.handler.feature_external_ges, False)
@@ -48,6 +48,9 @@ class Type(object):
                 raise AssertionError('No scope defined for this type')
             elif self._typedef in vars(self._scope):
                 return vars(self._scope)[self._typedef]
+            elif hasattr(self._scope, self._typedef):
+                # lazy schemas build their types on first access
+                return getattr(self._scope, self._typedef)
             else:
                 raise TypeError("Type '%s' is not defined in given scope"%self._typedef)
         else:
@@ -0,0 +1,196 @@
+# Copyright (c) 2020, FreeCAD Developers
+# All rights reserved.
+
+# This file is part of the StepClassLibrary (SCL).
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#   Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+#   Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+#   Neither the name of the <ORGANIZATION> nor the names of its contributors may
+#   be used to endorse or promote products derived from this software without
+#   specific prior written permission.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF
+# THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+''' This module loads the schema modules generated by fedex_python lazily.
+
+The generated schema modules define thousands of types, entities and rules,
+and importing one of them takes seconds before any file is read. A lazy
+schema only runs the imports at the top of the module. The rest of the
+source is split into top-level definitions, indexed by the name they define,
+and each definition is compiled and executed the first time its name is
+accessed, together with the definitions it uses.
+
+>>> schema = import_schema('config_control_design')
+>>> schema.cartesian_point # builds cartesian_point and its supertypes
+'''
+
+import os
+import sys
+import types
+
+# code flag of the functions, not set for class bodies
+CO_OPTIMIZED = 0x1
+
+def get_schema_file(module_name):
+    '''
+    Returns the path of the source file of a schema module
+    '''
+    for path in [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))] + sys.path:
+        filename = os.path.join(path, module_name + '.py')
+        if os.path.isfile(filename):
+            return filename
+    raise ImportError("No schema module named %s"%module_name)
+
+def get_defined_name(line):
+    '''
+    Returns the name defined by a top-level statement of a schema module,
+    or None for imports
+    '''
+    if line.startswith('class ') or line.startswith('def '):
+        return line.split(None,1)[1].split('(')[0].split(':')[0].strip()
+    if line.startswith('import ') or line.startswith('from '):
+        return None
+    if '=' in line:
+        return line.split('=',1)[0].strip()
+    return None
+
+def split_definitions(source):
+    '''
+    Splits the source of a schema module into top-level statements.
+    Returns a (preamble, index) tuple, where preamble is the source of the
+    imports and settings at the top of the module, and index a dict
+    {name: [(first_line, start, end), ...]} of the offsets of the definitions
+    of each name in the source.
+    '''
+    index = {}
+    preamble_end = None
+    name = None
+    first_line = start = 0
+    offset = 0
+    for lineno, line in enumerate(source.splitlines(True)):
+        if line[:1] not in ('', ' ', '\t', '\n', '\r', '#', ')', ']'):
+            # a new top-level statement
+            if name:
+                index.setdefault(name, []).append((first_line, start, offset))
+            name = get_defined_name(line)
+            if preamble_end is None and name not in (None, 'schema_name', 'schema_scope'):
+                preamble_end = offset
+            first_line, start = lineno, offset
+        offset += len(line)
+    if name:
+        index.setdefault(name, []).append((first_line, start, offset))
+    if preamble_end is None:
+        preamble_end = offset
+    return source[:preamble_end], index
+
+def get_code_names(code, nested):
+    '''
+    Returns the global names used by a code object. If nested is False,
+    only the names used when the code is executed are returned: the names of
+    the module level code and of the class bodies, but not of the functions.
+    '''
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            if nested or not const.co_flags & CO_OPTIMIZED:
+                names.update(get_code_names(const, nested))
+    return names
+
+class LazySchema(types.ModuleType):
+    '''
+    A schema module whose definitions are built on first access
+    '''
+    def __init__(self, name, filename=None):
+        types.ModuleType.__init__(self, name)
+        if filename is None:
+            filename = get_schema_file(name)
+        with open(filename) as f:
+            source = f.read()
+        preamble, index = split_definitions(source)
+        self.__file__ = filename
+        self._schema_source = source
+        self._schema_index = index
+        # the preamble defines schema_scope from sys.modules
+        sys.modules[name] = self
+        exec(compile(preamble, filename, 'exec'), self.__dict__)
+
+    def __getattr__(self, name):
+        index = self.__dict__.get('_schema_index')
+        if not index or name not in index:
+            raise AttributeError("Schema %s has no definition %s"%(self.__name__, name))
+        self.load_definitions([name])
+        try:
+            return self.__dict__[name]
+        except KeyError:
+            raise AttributeError("Schema %s has no definition %s"%(self.__name__, name))
+
+    def get_definition_names(self):
+        '''
+        Returns the names of the definitions not built yet
+        '''
+        return list(self._schema_index.keys())
+
+    def load_definitions(self, names):
+        '''
+        Builds the given definitions, and the ones used by their functions
+        '''
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name in self._schema_index:
+                pending.extend(self.exec_definition(name))
+
+    def load_all(self):
+        '''
+        Builds all remaining definitions, the schema is then the same as
+        the eagerly imported module
+        '''
+        self.load_definitions(self.get_definition_names())
+
+    def exec_definition(self, name):
+        '''
+        Executes the definitions of a name. The definitions needed to execute
+        it, like base classes, are executed first. Returns the other names used
+        by its functions, which must be defined before they are called.
+        '''
+        index = self._schema_index
+        nested = set()
+        for first_line, start, end in index.pop(name):
+            # keep the line numbers of the module in tracebacks
+            text = '\n' * first_line + self._schema_source[start:end]
+            code = compile(text, self.__file__, 'exec')
+            for dependency in get_code_names(code, False):
+                if dependency in index:
+                    nested.update(self.exec_definition(dependency))
+            exec(code, self.__dict__)
+            nested.update(get_code_names(code, True))
+        return [n for n in nested if n in index]
+
+def import_schema(module_name, lazy=True):
+    '''
+    Returns a schema module, imported lazily or not
+    '''
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    if not lazy:
+        __import__(module_name)
+        return sys.modules[module_name]
+    return LazySchema(module_name)
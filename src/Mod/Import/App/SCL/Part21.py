@@ -32,9 +32,19 @@
 import re
 from . import Utils
 import time
+import os
+import sys
+import mmap
+import bisect
+from array import array
 
 
 INSTANCE_DEFINITION_RE = re.compile("#(\d+)[^\S\n]?=[^\S\n]?(.*?)\((.*)\)[^\S\n]?;[\\r]?$")
+# the start of an instance record, possibly preceded by comments
+INSTANCE_ID_RE = re.compile(br"\s*(?:/\*.*?\*/\s*)*#(\d+)\s*=", re.S)
+FILE_SCHEMA_RE = re.compile(br"FILE_SCHEMA\s*\(\s*\(\s*'([^']*)'")
+# file offsets are stored in arrays of 64 bits integers
+OFFSET_TYPECODE = 'q' if sys.version_info[0] >= 3 else 'l'
 
 def map_string_to_num(stri):
     """ Take a string, check whether it is an integer, a float or not
@@ -90,6 +100,142 @@ class Part21EntityInstance:
         print(self._attributes_definition)
 
 
+class Part21Index(object):
+    """
+    A compact index of the instances of a Part21 file, used by the lazy
+    mode of Part21Parser.
+    The file is memory-mapped and split into records on the ';' found
+    outside strings, in large chunks. Only the id, offset and length of each
+    instance record are kept, in arrays sorted by id. The entity name and
+    attributes of an instance are parsed when it is accessed, so the index
+    can be used like the dict of instances definitions built by the full mode:
+    index[20] -> ('CARTESIAN_POINT', ["''", ['5.', '125.', '20.']])
+    """
+    def __init__(self, filename, chunksize=1<<24):
+        self._filename = filename
+        self._schema_name = ""
+        self._ids = array('l')
+        self._offsets = array(OFFSET_TYPECODE)
+        self._lengths = array('l')
+        self._fp = open(filename, 'rb')
+        if os.fstat(self._fp.fileno()).st_size:
+            self._buffer = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._buffer = b""
+        self.build_index(chunksize)
+
+    def iter_records(self, chunksize):
+        """ Yields the (offset, length) of all records of the file.
+        A record ends with a ';' that is not part of a string. Strings are
+        found by counting the quotes, escaped quotes being doubled.
+        """
+        buf = self._buffer
+        size = len(buf)
+        start = 0 # start of the current record
+        quotes = 0 # number of quotes in the current record
+        offset = 0
+        while offset < size:
+            chunk = buf[offset:offset+chunksize]
+            pieces = chunk.split(b';')
+            pos = offset
+            for piece in pieces[:-1]:
+                quotes += piece.count(b"'")
+                pos += len(piece) + 1
+                if quotes % 2 == 0:
+                    yield start, pos - start
+                    start = pos
+                    quotes = 0
+            quotes += pieces[-1].count(b"'")
+            offset += len(chunk)
+
+    def build_index(self, chunksize):
+        buf = self._buffer
+        ids = self._ids
+        offsets = self._offsets
+        lengths = self._lengths
+        match = INSTANCE_ID_RE.match
+        for start, length in self.iter_records(chunksize):
+            m = match(buf, start, start + length)
+            if m:
+                ids.append(int(m.group(1)))
+                offsets.append(start)
+                lengths.append(length)
+            elif not self._schema_name:
+                m = FILE_SCHEMA_RE.search(buf, start, start + length)
+                if m:
+                    #identify the schema name
+                    self._schema_name = m.group(1).decode('latin-1').split(" ")[0].lower()
+        # sort the index by id, instances are usually already in order
+        if any(ids[i] > ids[i+1] for i in range(len(ids)-1)):
+            order = sorted(range(len(ids)), key=ids.__getitem__)
+            self._ids = array('l', [ids[i] for i in order])
+            self._offsets = array(OFFSET_TYPECODE, [offsets[i] for i in order])
+            self._lengths = array('l', [lengths[i] for i in order])
+
+    def get_schema_name(self):
+        return self._schema_name
+
+    def _find(self, instance_id):
+        i = bisect.bisect_left(self._ids, instance_id)
+        if i == len(self._ids) or self._ids[i] != instance_id:
+            raise KeyError(instance_id)
+        return i
+
+    def get_record(self, instance_id):
+        """ Returns the text of an instance record, on one line
+        """
+        i = self._find(instance_id)
+        start = self._offsets[i]
+        record = self._buffer[start:start+self._lengths[i]].decode('latin-1')
+        return record.replace("\n","").replace("\r","").strip()
+
+    def get_entity_name(self, instance_id):
+        """ Returns the entity name of an instance, without parsing its attributes
+        """
+        record = self.get_record(instance_id)
+        return record[record.index('=')+1:record.index('(')].strip()
+
+    def __getitem__(self, instance_id):
+        match_instance_definition = INSTANCE_DEFINITION_RE.search(self.get_record(instance_id))
+        if not match_instance_definition:
+            raise ValueError("Invalid instance definition #%i"%instance_id)
+        instance_id, entity_name, entity_attrs = match_instance_definition.groups()
+        entity_attrs_list, str_len = Utils.process_nested_parent_str(entity_attrs)
+        return (entity_name,entity_attrs_list)
+
+    def get(self, instance_id, default=None):
+        try:
+            return self[instance_id]
+        except KeyError:
+            return default
+
+    def __contains__(self, instance_id):
+        try:
+            self._find(instance_id)
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def keys(self):
+        return list(self._ids)
+
+    def items(self):
+        for instance_id in self._ids:
+            yield instance_id, self[instance_id]
+
+    def close(self):
+        if self._buffer:
+            self._buffer.close()
+            self._buffer = b""
+        self._fp.close()
+
+
 class Part21Parser:
     """
     Loads all instances definition of a Part21 file into memory.
@@ -97,9 +243,12 @@ class Part21Parser:
     self._instance_definition : stores attributes, key is the instance integer id
     self._number_of_ancestors : stores the number of ancestors of entity id. This enables
     to define the order of instances creation.
+    If lazy is True, self._instance_definition is a Part21Index instead of a dict,
+    and the attributes of an instance are only parsed when it is accessed.
     """
-    def __init__(self, filename):
+    def __init__(self, filename, lazy=False):
         self._filename = filename
+        self._lazy = lazy
         # the schema
         self._schema_name = ""
         # the dict self._instances contain instance definition
@@ -123,6 +272,8 @@ class Part21Parser:
         return len(list(self._instances_definition.keys()))
 
     def parse_file(self):
+        if self._lazy:
+            return self.index_file()
         init_time = time.time()
         print("Parsing file %s..."%self._filename)
         fp = open(self._filename)
@@ -155,6 +306,14 @@ class Part21Parser:
         print('done in %fs.'%(time.time()-init_time))
         print('schema: - %s entities %i'%(self._schema_name,len(list(self._instances_definition.keys()))))
 
+    def index_file(self):
+        init_time = time.time()
+        print("Indexing file %s..."%self._filename)
+        self._instances_definition = Part21Index(self._filename)
+        self._schema_name = self._instances_definition.get_schema_name()
+        print('done in %fs.'%(time.time()-init_time))
+        print('schema: - %s entities %i'%(self._schema_name,len(self._instances_definition)))
+
 class EntityInstancesFactory(object):
     '''
     This class creates entity instances from the str definition
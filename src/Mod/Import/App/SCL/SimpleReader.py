@@ -61,7 +61,6 @@ class SimpleParser:
         self._p21loader = Part21.Part21Parser(filename)
         #self._p21loader._number_of_ancestors = {} # not needed, save memory
         self.schemaModule = None
-        self.schemaClasses = None
         self.instanceMape = {}
         #for i in self._p21loader._instances_definition.keys():
         #    print i,self._p21loader._instances_definition[i][0],self._p21loader._instances_definition[i][1]
@@ -93,17 +92,10 @@ class SimpleParser:
 
     def instantiate(self):
         """Instantiate the python class from the entities"""
-        import inspect
-        # load the needed schema module
-        if self._p21loader.get_schema_name() == 'config_control_design':
-            import config_control_design
-            self.schemaModule = config_control_design
-        if self._p21loader.get_schema_name() == 'automotive_design':
-            import automotive_design
-            self.schemaModule = automotive_design
-
-        if self.schemaModule:
-            self.schemaClasses = dict(inspect.getmembers(self.schemaModule))
+        import LazySchema
+        # load the needed schema module, its classes are built on first access
+        if self._p21loader.get_schema_name() in ('config_control_design','automotive_design'):
+            self.schemaModule = LazySchema.import_schema(self._p21loader.get_schema_name())
 
         for i in list(self._p21loader._instances_definition.keys()):
             #print i
@@ -119,7 +111,7 @@ class SimpleParser:
             #print "Class name:%s"%class_name
 
             if not class_name=='':
-                classDef = self.schemaClasses[class_name]
+                classDef = getattr(self.schemaModule,class_name)
                 # then attributes
                 #print object_.__doc__
             instance_attributes = instance_definition[1]
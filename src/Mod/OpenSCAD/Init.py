@@ -35,3 +35,5 @@ if openscadbin:
 FreeCAD.addExportType("OpenSCAD CSG Format (*.csg)","exportCSG")
 FreeCAD.addExportType("OpenSCAD Format (*.scad)","exportCSG")
 
+
+FreeCAD.__unit_test__ += ["TestOpenSCAD"]
@@ -42,6 +42,7 @@ except AttributeError:
         return QtGui.QApplication.translate(context, text, None)
 
 import io
+import threading
 
 try:
     import FreeCAD
@@ -148,6 +149,167 @@ def newtempfilename():
 
 tempfilenamegen=newtempfilename()
 
+# the OpenSCAD calls can run in several threads, see callopenscadstrings
+statslock=threading.Lock()
+
+def nexttempfilename():
+    with statslock:
+        return next(tempfilenamegen)
+
+# counters of the calls to OpenSCAD made by callopenscadstring
+stats={'calls':0,'hits':0,'misses':0,'time':0.0}
+
+def getstats():
+    '''returns a copy of the counters of the OpenSCAD calls:
+    calls, hits and misses of the result cache, and time spent
+    running OpenSCAD in seconds'''
+    with statslock:
+        return dict(stats)
+
+def resetstats():
+    with statslock:
+        stats.update(calls=0,hits=0,misses=0,time=0.0)
+
+def countcall(hit,duration=0.0):
+    with statslock:
+        stats['calls']+=1
+        stats['hits' if hit else 'misses']+=1
+        stats['time']+=duration
+
+def hashfile(filename):
+    '''returns the sha1 hash of the content of a file'''
+    import hashlib
+    h=hashlib.sha1()
+    with io.open(filename,'rb') as f:
+        for block in iter(lambda: f.read(1<<20),b''):
+            h.update(block)
+    return h.hexdigest()
+
+def renamebycontent(filename):
+    '''renames a temporary file after the hash of its content, so that
+    the SCAD code importing it only changes when the content changes.
+    returns the new file name'''
+    import os
+    directory,name=os.path.split(filename)
+    newname=os.path.join(directory,'fc-%s.%s' % (hashfile(filename),\
+        name.rsplit('.',1)[-1]))
+    if os.path.exists(newname): #same content, maybe used by another call
+        os.unlink(filename)
+    else:
+        os.rename(filename,newname)
+    return newname
+
+class ResultCache(object):
+    '''A cache of the files produced by OpenSCAD, stored on disk.
+    The files are named after the hash of the SCAD code and the output
+    format, and the least recently used files are removed when the cache
+    grows over the 'resultCacheSize' preference, in megabytes.
+    A size of 0 disables the cache.'''
+
+    def __init__(self,directory=None,maxsize=None):
+        self.directory=directory
+        self.maxsize=maxsize
+        self.lock=threading.Lock()
+
+    def getdirectory(self):
+        import FreeCAD,os
+        directory=self.directory or os.path.join(FreeCAD.getUserAppDataDir(),\
+            'OpenSCAD','cache')
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError: #created by another thread
+                pass
+        return directory
+
+    def getmaxsize(self):
+        '''returns the maximum size of the cache in bytes'''
+        if self.maxsize is not None:
+            return self.maxsize
+        import FreeCAD
+        return FreeCAD.ParamGet(\
+            "User parameter:BaseApp/Preferences/Mod/OpenSCAD").\
+            GetInt('resultCacheSize',64)*1024*1024
+
+    def isenabled(self):
+        return self.getmaxsize()>0
+
+    def key(self,scadstr,outputext):
+        '''returns the hash of the SCAD code, the output format and the
+        OpenSCAD executable used'''
+        import FreeCAD,hashlib,os
+        osfilename = FreeCAD.ParamGet(\
+            "User parameter:BaseApp/Preferences/Mod/OpenSCAD").\
+            GetString('openscadexecutable')
+        h=hashlib.sha1()
+        if osfilename and os.path.isfile(osfilename):
+            h.update(('%s %s\n' % (osfilename,os.path.getmtime(osfilename))).encode('utf8'))
+        h.update(('%s\n' % outputext).encode('utf8'))
+        h.update(scadstr.encode('utf8'))
+        return h.hexdigest()
+
+    def get(self,key,outputext):
+        '''returns the path of the cached file or None'''
+        import os
+        filename=os.path.join(self.getdirectory(),'%s.%s' % (key,outputext))
+        if os.path.isfile(filename):
+            try:
+                os.utime(filename,None) #mark as recently used
+            except OSError:
+                pass
+            return filename
+
+    def put(self,key,outputext,filename):
+        '''stores a copy of an OpenSCAD output file'''
+        import os,shutil
+        directory=self.getdirectory()
+        target=os.path.join(directory,'%s.%s' % (key,outputext))
+        tmptarget=os.path.join(directory,'%s.%s' % (nexttempfilename(),outputext))
+        try:
+            shutil.copyfile(filename,tmptarget)
+            if os.path.exists(target):
+                os.unlink(tmptarget)
+            else:
+                os.rename(tmptarget,target)
+        except (IOError,OSError):
+            return
+        self.evict()
+
+    def evict(self):
+        '''removes the least recently used files over the maximum size'''
+        import os
+        maxsize=self.getmaxsize()
+        with self.lock:
+            directory=self.getdirectory()
+            entries=[]
+            for name in os.listdir(directory):
+                filename=os.path.join(directory,name)
+                try:
+                    st=os.stat(filename)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime,st.st_size,filename))
+            total=sum(e[1] for e in entries)
+            for mtime,size,filename in sorted(entries):
+                if total<=maxsize:
+                    break
+                try:
+                    os.unlink(filename)
+                    total-=size
+                except OSError:
+                    pass
+
+    def clear(self):
+        import os
+        directory=self.getdirectory()
+        for name in os.listdir(directory):
+            try:
+                os.unlink(os.path.join(directory,name))
+            except OSError:
+                pass
+
+resultcache=ResultCache()
+
 def callopenscad(inputfilename,outputfilename=None,outputext='csg',keepname=False):
     '''call the open scad binary
     returns the filename of the result (or None),
@@ -179,27 +341,80 @@ def callopenscad(inputfilename,outputfilename=None,outputext='csg',keepname=Fals
                     inputfilename)[1].rsplit('.',1)[0],outputext))
             else:
                 outputfilename=os.path.join(dir1,'%s.%s' % \
-                    (next(tempfilenamegen),outputext))
+                    (nexttempfilename(),outputext))
         check_output2([osfilename,'-o',outputfilename, inputfilename])
         return outputfilename
     else:
         raise OpenSCADError('OpenSCAD executable unavailable')
 
-def callopenscadstring(scadstr,outputext='csg'):
+def callopenscadstring(scadstr,outputext='csg',cache=False):
     '''create a tempfile and call the open scad binary
     returns the filename of the result (or None),
-    please delete the file afterwards'''
-    import os,tempfile,time
+    please delete the file afterwards
+    if cache is True, the results are kept in resultcache, and copied from
+    there when the same code is processed again. Only use it for code whose
+    inputs are all in the code itself, or in files named after their content
+    (see renamebycontent), as the files used by the code are not checked'''
+    import os,shutil,tempfile,time
     dir1=tempfile.gettempdir()
-    inputfilename=os.path.join(dir1,'%s.scad' % next(tempfilenamegen))
+    key=None
+    if cache and resultcache.isenabled():
+        key=resultcache.key(scadstr,outputext)
+        cachedfilename=resultcache.get(key,outputext)
+        if cachedfilename:
+            outputfilename=os.path.join(dir1,'%s.%s' % (nexttempfilename(),outputext))
+            shutil.copyfile(cachedfilename,outputfilename)
+            countcall(True)
+            return outputfilename
+    inputfilename=os.path.join(dir1,'%s.scad' % nexttempfilename())
     inputfile = io.open(inputfilename,'w', encoding="utf8")
     inputfile.write(scadstr)
     inputfile.close()
-    outputfilename = callopenscad(inputfilename,outputext=outputext,\
-        keepname=True)
-    os.unlink(inputfilename)
+    start=time.time()
+    try:
+        outputfilename = callopenscad(inputfilename,outputext=outputext,\
+            keepname=True)
+    finally:
+        os.unlink(inputfilename)
+        countcall(False,time.time()-start)
+    if key:
+        resultcache.put(key,outputext,outputfilename)
     return outputfilename
 
+def getworkers():
+    '''returns the number of OpenSCAD processes run at the same time,
+    from the 'openscadWorkers' preference, 0 meaning one per processor
+    with a maximum of 4'''
+    import FreeCAD,multiprocessing
+    workers = FreeCAD.ParamGet(\
+        "User parameter:BaseApp/Preferences/Mod/OpenSCAD").\
+        GetInt('openscadWorkers',0)
+    if workers <= 0:
+        try:
+            workers = min(4,multiprocessing.cpu_count())
+        except NotImplementedError:
+            workers = 1
+    return workers
+
+def callopenscadstrings(scadstrs,outputext='csg',workers=None,cache=False):
+    '''processes several independent SCAD codes, running up to workers
+    OpenSCAD processes at the same time
+    returns the list of the result filenames,
+    please delete the files afterwards
+    see callopenscadstring for cache'''
+    if workers is None:
+        workers = getworkers()
+    if workers > 1 and len(scadstrs) > 1:
+        try:
+            import concurrent.futures
+        except ImportError: #python 2
+            workers = 1
+    if workers <= 1 or len(scadstrs) <= 1:
+        return [callopenscadstring(scadstr,outputext,cache) for scadstr in scadstrs]
+    with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(lambda scadstr: callopenscadstring(scadstr,outputext,cache),\
+            scadstrs))
+
 def reverseimporttypes():
     '''allows to search for supported filetypes by module'''
 
@@ -415,10 +630,11 @@ def roundrotation(rot,maxangulardistance=1e-5):
     else: #use original
         return rot
 
-def callopenscadmeshstring(scadstr):
-    """Call OpenSCAD and return the result as a Mesh"""
+def callopenscadmeshstring(scadstr,cache=False):
+    """Call OpenSCAD and return the result as a Mesh
+    see callopenscadstring for cache"""
     import Mesh,os
-    tmpfilename=callopenscadstring(scadstr,'stl')
+    tmpfilename=callopenscadstring(scadstr,'stl',cache)
     newmesh=Mesh.Mesh()
     newmesh.read(tmpfilename)
     try:
@@ -435,33 +651,70 @@ def meshopinline(opname,iterable1):
     """
     from exportCSG import mesh2polyhedron
     return callopenscadmeshstring('%s(){%s}' % (opname,' '.join(\
-        (mesh2polyhedron(meshobj) for meshobj in iterable1))))
+        (mesh2polyhedron(meshobj) for meshobj in iterable1))),True)
 
-def meshoptempfile(opname,iterable1):
-    """uses OpenSCAD to combine meshes
-    takes the name of the CGAL operation and an iterable (tuple,list) of
-    FreeCAD Mesh objects
-    uses stl files to supply the mesh data
-    """
+def meshoptempfilescad(opname,iterable1):
+    """writes the meshes to stl files named after their content
+    returns the SCAD code of the operation and the list of filenames"""
     import os,tempfile
     dir1=tempfile.gettempdir()
     filenames = []
     for mesh in iterable1:
-        outputfilename=os.path.join(dir1,'%s.stl' % next(tempfilenamegen))
+        outputfilename=os.path.join(dir1,'%s.stl' % nexttempfilename())
         mesh.write(outputfilename)
-        filenames.append(outputfilename)
+        filenames.append(renamebycontent(outputfilename))
     #absolute path causes error. We rely that the scad file will be in the dame tmpdir
     meshimports = ' '.join("import(file = \"%s\");" % \
         #filename \
         os.path.split(filename)[1] for filename in filenames)
-    result = callopenscadmeshstring('%s(){%s}' % (opname,meshimports))
+    return '%s(){%s}' % (opname,meshimports),filenames
+
+def removefiles(filenames):
+    import os
     for filename in filenames:
         try:
             os.unlink(filename)
         except OSError:
             pass
+
+def meshoptempfile(opname,iterable1):
+    """uses OpenSCAD to combine meshes
+    takes the name of the CGAL operation and an iterable (tuple,list) of
+    FreeCAD Mesh objects
+    uses stl files to supply the mesh data
+    """
+    scadstr,filenames = meshoptempfilescad(opname,iterable1)
+    try:
+        result = callopenscadmeshstring(scadstr,True)
+    finally:
+        removefiles(filenames)
     return result
 
+def meshopmany(operations,workers=None):
+    """uses OpenSCAD to combine several groups of meshes at the same time
+    takes a list of (name of the CGAL operation, iterable of FreeCAD Mesh
+    objects) tuples, and returns the list of resulting meshes
+    see callopenscadstrings
+    """
+    import Mesh
+    scadstrs = []
+    filenames = []
+    try:
+        for opname,iterable1 in operations:
+            scadstr,opfilenames = meshoptempfilescad(opname,iterable1)
+            scadstrs.append(scadstr)
+            filenames.extend(opfilenames)
+        outputfilenames = callopenscadstrings(scadstrs,'stl',workers,True)
+    finally:
+        removefiles(filenames)
+    meshes = []
+    for outputfilename in outputfilenames:
+        newmesh=Mesh.Mesh()
+        newmesh.read(outputfilename)
+        meshes.append(newmesh)
+    removefiles(outputfilenames)
+    return meshes
+
 def meshoponobjs(opname,inobjs):
     """
     takes a string (operation name) and a list of Feature Objects
@@ -507,15 +760,15 @@ def process2D_ObjectsViaOpenSCADShape(ObjList,Operation,doc):
     dir1=tempfile.gettempdir()
     filenames = []
     for item in ObjList :
-        outputfilename=os.path.join(dir1,'%s.dxf' % next(tempfilenamegen))
+        outputfilename=os.path.join(dir1,'%s.dxf' % nexttempfilename())
         importDXF.export([item],outputfilename,True,True)
-        filenames.append(outputfilename)
+        filenames.append(renamebycontent(outputfilename))
     # https://www.freecadweb.org/tracker/view.php?id=3419
     dxfimports = ' '.join("import(file = \"%s\" %s);" % \
         #filename \
         (os.path.split(filename)[1], fnStr) for filename in filenames)
     #
-    tmpfilename = callopenscadstring('%s(){%s}' % (Operation,dxfimports),'dxf')
+    tmpfilename = callopenscadstring('%s(){%s}' % (Operation,dxfimports),'dxf',True)
     from OpenSCAD2Dgeom import importDXFface
     # TBD: assure the given doc is active
     face = importDXFface(tmpfilename,None,None)
@@ -539,8 +792,11 @@ def process2D_ObjectsViaOpenSCAD(ObjList,Operation,doc=None):
           index.ViewObject.hide()
     return(obj)
 
-def process3D_ObjectsViaOpenSCADShape(ObjList,Operation,maxmeshpoints=None):
-    import FreeCAD,Mesh,Part
+def meshobjs3D(ObjList,maxmeshpoints=None):
+    """returns the meshes of the shapes of the objects, as given to OpenSCAD
+    by process3D_ObjectsViaOpenSCADShape, or None if one of them has more
+    points than the 'tempmeshmaxpoints' preference"""
+    import FreeCAD,Mesh
     params = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/OpenSCAD")
     if False: # disabled due to issue 1292
         import MeshPart
@@ -553,6 +809,12 @@ def process3D_ObjectsViaOpenSCADShape(ObjList,Operation,maxmeshpoints=None):
                             'meshmaxlength',1.0))) for obj in ObjList]
     if max(mesh.CountPoints for mesh in meshes) < \
             (maxmeshpoints or params.GetInt('tempmeshmaxpoints',5000)):
+        return meshes
+
+def process3D_ObjectsViaOpenSCADShape(ObjList,Operation,maxmeshpoints=None):
+    import Part
+    meshes = meshobjs3D(ObjList,maxmeshpoints)
+    if meshes:
         stlmesh = meshoptempfile(Operation,meshes)
         sh=Part.Shape()
         sh.makeShapeFromMesh(stlmesh.Topology,0.1)
@@ -562,6 +824,27 @@ def process3D_ObjectsViaOpenSCADShape(ObjList,Operation,maxmeshpoints=None):
            solid.complement()
         return solid
 
+def prefetch3D_ObjectsViaOpenSCAD(operations,maxmeshpoints=None,workers=None):
+    """runs several 3D operations in OpenSCAD at the same time, to fill
+    resultcache before process3D_ObjectsViaOpenSCADShape is called on each
+    of them, for example by the recompute of the document
+    takes a list of (list of objects, operation name) tuples
+    see meshopmany"""
+    if not resultcache.isenabled():
+        return
+    meshops = []
+    for ObjList,Operation in operations:
+        if ObjList and all((not obj.Shape.isNull() and obj.Shape.Volume > 0) \
+                for obj in ObjList):
+            meshes = meshobjs3D(ObjList,maxmeshpoints)
+            if meshes:
+                meshops.append((Operation,meshes))
+    if len(meshops) > 1:
+        try:
+            meshopmany(meshops,workers)
+        except OpenSCADError:
+            pass #reported when the operations are processed one by one
+
 def process3D_ObjectsViaOpenSCAD(doc,ObjList,Operation):
     solid = process3D_ObjectsViaOpenSCADShape(ObjList,Operation)
     if solid is not None:
@@ -0,0 +1,147 @@
+#***************************************************************************
+#*   Copyright (c) 2020 FreeCAD Developers                                 *
+#*                                                                         *
+#*   This program is free software; you can redistribute it and/or modify  *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)    *
+#*   as published by the Free Software Foundation; either version 2 of     *
+#*   the License, or (at your option) any later version.                   *
+#*   for detail see the LICENCE text file.                                 *
+#*                                                                         *
+#*   This program is distributed in the hope that it will be useful,       *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#*   GNU Library General Public License for more details.                  *
+#*                                                                         *
+#*   You should have received a copy of the GNU Library General Public     *
+#*   License along with this program; if not, write to the Free Software   *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+#*   USA                                                                   *
+#*                                                                         *
+#***************************************************************************
+
+import os
+import math
+import shutil
+import tempfile
+import time
+import unittest
+import FreeCAD
+
+# a translated union of two cubes, in a union with a sphere
+NESTED_UNIONS = '''
+union() {
+    multmatrix([[1, 0, 0, 10], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]) {
+        union() {
+            cube(size = [2, 2, 2], center = false);
+            cube(size = [1, 1, 3], center = false);
+        }
+    }
+    sphere($fn = 0, $fa = 12, $fs = 2, r = 1);
+}
+'''
+
+
+class ImportCSGCases(unittest.TestCase):
+
+    def setUp(self):
+        self.doc = FreeCAD.newDocument("ImportCSGTest")
+
+    def tearDown(self):
+        FreeCAD.closeDocument(self.doc.Name)
+
+    def importString(self, csg, batch):
+        import importCSG
+        fd, filename = tempfile.mkstemp(suffix='.csg')
+        os.close(fd)
+        try:
+            with open(filename, 'w') as f:
+                f.write(csg)
+            importCSG.insert(filename, self.doc.Name, batch)
+        finally:
+            os.remove(filename)
+
+    def testEmptyUnion(self):
+        for batch in (False, True):
+            for obj in self.doc.Objects:
+                self.doc.removeObject(obj.Name)
+            self.importString('union() { group(); }', batch)
+            self.assertEqual(len(self.doc.Objects), 1)
+            self.assertEqual(self.doc.Objects[0].TypeId, 'Part::FeaturePython')
+
+    def testBatchUnions(self):
+        self.importString(NESTED_UNIONS, False)
+        fuses = [o for o in self.doc.Objects if not o.InList]
+        self.assertEqual(len(self.doc.Objects), 5)
+        self.assertEqual(len(fuses), 1)
+        volume = fuses[0].Shape.Volume
+        for obj in self.doc.Objects:
+            self.doc.removeObject(obj.Name)
+
+        self.importString(NESTED_UNIONS, True)
+        fuses = [o for o in self.doc.Objects if not o.InList]
+        # the inner union is merged into the outer one
+        self.assertEqual(len(self.doc.Objects), 4)
+        self.assertEqual(len(fuses), 1)
+        self.assertEqual(fuses[0].TypeId, 'Part::MultiFuse')
+        self.assertEqual(len(fuses[0].Shapes), 3)
+        for obj in fuses[0].Shapes:
+            if obj.TypeId == 'Part::Box':
+                self.assertAlmostEqual(obj.Placement.Base.x, 10)
+        self.assertAlmostEqual(fuses[0].Shape.Volume, volume, 6)
+        self.assertAlmostEqual(volume, 9 + 4.0 / 3 * math.pi, 4)
+
+
+class ResultCacheCases(unittest.TestCase):
+
+    def setUp(self):
+        import OpenSCADUtils
+        self.directory = tempfile.mkdtemp()
+        # room for two files of 40 bytes
+        self.cache = OpenSCADUtils.ResultCache(self.directory, 100)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def writeFile(self, content):
+        fd, filename = tempfile.mkstemp(suffix='.stl')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        self.addCleanup(os.remove, filename)
+        return filename
+
+    def testKey(self):
+        key = self.cache.key('cube(1);', 'stl')
+        self.assertEqual(key, self.cache.key('cube(1);', 'stl'))
+        self.assertNotEqual(key, self.cache.key('cube(2);', 'stl'))
+        self.assertNotEqual(key, self.cache.key('cube(1);', 'csg'))
+
+    def testPutGet(self):
+        self.assertTrue(self.cache.isenabled())
+        key = self.cache.key('cube(1);', 'stl')
+        self.assertIsNone(self.cache.get(key, 'stl'))
+        self.cache.put(key, 'stl', self.writeFile(b'solid cube'))
+        filename = self.cache.get(key, 'stl')
+        self.assertEqual(os.path.dirname(filename), self.directory)
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), b'solid cube')
+        self.assertIsNone(self.cache.get(key, 'csg'))
+        self.assertEqual(os.listdir(self.directory), [os.path.basename(filename)])
+
+    def testEviction(self):
+        keys = [self.cache.key('cube(%d);' % i, 'stl') for i in range(3)]
+        for i in range(2):
+            self.cache.put(keys[i], 'stl', self.writeFile(b'x' * 40))
+            # older than the next ones, whatever the resolution of the clock
+            age = time.time() - 20 + 10 * i
+            os.utime(self.cache.get(keys[i], 'stl'), (age, age))
+        # using the first file makes the second one the least recently used
+        self.assertIsNotNone(self.cache.get(keys[0], 'stl'))
+        self.cache.put(keys[2], 'stl', self.writeFile(b'x' * 40))
+        self.assertIsNotNone(self.cache.get(keys[0], 'stl'))
+        self.assertIsNone(self.cache.get(keys[1], 'stl'))
+        self.assertIsNotNone(self.cache.get(keys[2], 'stl'))
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    def testDisabled(self):
+        import OpenSCADUtils
+        self.assertFalse(OpenSCADUtils.ResultCache(self.directory, 0).isenabled())
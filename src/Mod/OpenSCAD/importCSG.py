@@ -33,7 +33,7 @@ __url__ = ["http://www.sloan-home.co.uk/ImportCSG"]
 
 printverbose = False
 
-import FreeCAD, io, os, sys
+import FreeCAD, io, os, sys, collections
 if FreeCAD.GuiUp:
     import FreeCADGui
     gui = True
@@ -54,6 +54,16 @@ from OpenSCADUtils import *
 params = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/OpenSCAD")
 printverbose = params.GetBool('printVerbose',False)
 
+# the lexer and parser are built once per session, see getParser()
+csglexer = None
+csgparser = None
+# in batch mode the primitives and boolean operations are only created
+# in the document once the whole file is parsed, see CSGNode
+batchmode = False
+# the hull and minkowski features created by the parser, see
+# prefetchCGALFeatures
+cgalfeatures = []
+
 # Get the token map from the lexer.  This is required.
 import tokrules
 from tokrules import tokens
@@ -93,8 +103,8 @@ def open(filename):
         processcsg(filename)
     return doc
 
-def insert(filename,docname):
-    "called when freecad imports a file"
+def insert(filename,docname,batch=None):
+    "called when freecad imports a file, see processcsg() for batch"
     global doc
     global pathName
     groupname = os.path.splitext(os.path.basename(filename))[0]
@@ -110,45 +120,186 @@ def insert(filename,docname):
             #pathName = os.getcwd() #https://github.com/openscad/openscad/issues/128
         else:
             pathName = os.path.dirname(os.path.normpath(filename))
-        processcsg(tmpfile)
+        processcsg(tmpfile,batch)
         try:
             os.unlink(tmpfile)
         except OSError:
             pass
     else:
         pathName = os.path.dirname(os.path.normpath(filename))
-        processcsg(filename)
-
-def processcsg(filename):
+        processcsg(filename,batch)
+
+def getParser():
+    "returns the lexer and parser, built on first use"
+    global csglexer
+    global csgparser
+    if csgparser is None:
+        # Build the lexer
+        if printverbose: print('Start Lex')
+        csglexer = lex.lex(module=tokrules)
+        if printverbose: print('End Lex')
+
+        # Build the parser
+        if printverbose: print('Load Parser')
+        # The parser tables are stored in the user directory, and
+        # only generated again when the grammar changes
+        tablefile = os.path.join(FreeCAD.getUserAppDataDir(),'csgparsetab.pickle')
+        try:
+            # No debug out otherwise Linux has protection exception
+            csgparser = yacc.yacc(debug=0,picklefile=tablefile)
+        except Exception:
+            csgparser = yacc.yacc(debug=0,write_tables=0)
+        if printverbose: print('Parser Loaded')
+    return csglexer,csgparser
+
+def processcsg(filename,batch=None):
     global doc
+    global batchmode
 
     if printverbose: print ('ImportCSG Version 0.6a')
-    # Build the lexer
-    if printverbose: print('Start Lex')
-    lex.lex(module=tokrules)
-    if printverbose: print('End Lex')
-
-    # Build the parser   
-    if printverbose: print('Load Parser')
-    # No debug out otherwise Linux has protection exception
-    parser = yacc.yacc(debug=0)
-    if printverbose: print('Parser Loaded')
+    lexer,parser = getParser()
+    if batch is None:
+        batch = params.GetBool('useBatchImport',False)
+    batchmode = batch
+    del cgalfeatures[:]
     # Give the lexer some input
     #f=open('test.scad', 'r')
     f = io.open(filename, 'r', encoding="utf8")
     #lexer.input(f.read())
 
     if printverbose: print('Start Parser')
-    # Swap statements to enable Parser debugging
-    #result = parser.parse(f.read(),debug=1)
-    result = parser.parse(f.read())
-    f.close()
+    lexer.lineno = 1
+    try:
+        # Swap statements to enable Parser debugging
+        #result = parser.parse(f.read(),lexer=lexer,debug=1)
+        result = parser.parse(f.read(),lexer=lexer)
+        # create the objects left in the CSG tree
+        if result:
+            result = createObjects(result)
+    finally:
+        batchmode = False
+        f.close()
     if printverbose:
         print('End Parser')
         print(result)
     FreeCAD.Console.PrintMessage('End processing CSG file\n')
+    prefetchCGALFeatures(cgalfeatures)
+    del cgalfeatures[:]
     doc.recompute()
 
+def prefetchCGALFeatures(features):
+    """runs the OpenSCAD operations of the features that don't depend on
+    each other at the same time, so that the recompute of the document
+    finds their results in the cache. The features depending on other ones
+    are processed once these are done. See prefetch3D_ObjectsViaOpenSCAD"""
+    pending = list(features)
+    while len(pending) > 1:
+        ready = [obj for obj in pending if not \
+            any(dep in pending for dep in obj.OutListRecursive)]
+        if not ready:
+            break
+        children = [child for obj in ready for child in obj.Children]
+        if children:
+            doc.recompute(children)
+        prefetch3D_ObjectsViaOpenSCAD([(obj.Children,obj.Operation) \
+            for obj in ready])
+        pending = [obj for obj in pending if obj not in ready]
+
+class NodeViewObject(object):
+    "Records the view settings of a CSGNode"
+    def __init__(self):
+        self.__dict__['settings'] = []
+
+    def __setattr__(self,name,value):
+        self.settings.append((name,value))
+
+    def hide(self):
+        self.settings.append(('Visibility',False))
+
+    def isHidden(self):
+        "True if only the visibility was changed"
+        return all(name == 'Visibility' for name,value in self.settings)
+
+    def apply(self,vobj):
+        for name,value in self.settings:
+            setattr(vobj,name,value)
+
+class CSGNode(object):
+    """A primitive or boolean operation not created in the document yet.
+    In batch mode the parser returns these nodes instead of document
+    objects. Their properties are recorded, the transformations are folded
+    into their Placement, and nested unions are merged. The document objects
+    are created by createObject() when another feature needs them, or when
+    the whole file is parsed."""
+
+    def __init__(self,typeid,name):
+        self.__dict__.update(TypeId=typeid,Name=name,Label=name,Object=None,
+                             Properties=collections.OrderedDict(),
+                             ViewObject=NodeViewObject())
+
+    def __getattr__(self,name):
+        if name == 'Placement':
+            return FreeCAD.Placement()
+        raise AttributeError(name)
+
+    def __setattr__(self,name,value):
+        if name == 'Label':
+            self.__dict__[name] = value
+        else:
+            self.Properties[name] = value
+            self.__dict__[name] = value
+
+    def getChildren(self):
+        if 'Shapes' in self.Properties:
+            return self.Shapes
+        return [self.Properties[n] for n in ('Base','Tool') if n in self.Properties]
+
+    def create(self):
+        if self.Object is None:
+            values = [(name,createObjects(value) if isinstance(value,list) else createObject(value))
+                      for name,value in self.Properties.items()]
+            obj = doc.addObject(self.TypeId,self.Name)
+            for name,value in values:
+                setattr(obj,name,value)
+            if self.Label != self.Name:
+                obj.Label = self.Label
+            if gui:
+                self.ViewObject.apply(obj.ViewObject)
+            self.__dict__['Object'] = obj
+        return self.Object
+
+def addObject(typeid,name):
+    "creates a document object, or a CSGNode in batch mode"
+    if batchmode:
+        return CSGNode(typeid,name)
+    return doc.addObject(typeid,name)
+
+def createObject(item):
+    "returns the document object of a CSGNode"
+    if isinstance(item,CSGNode):
+        return item.create()
+    return item
+
+def createObjects(items):
+    return [createObject(item) for item in items]
+
+def mergeUnions(lst):
+    """replaces the unions of a list, not created yet and only hidden
+    in the view, by their children"""
+    result = []
+    for item in lst:
+        if isinstance(item,CSGNode) and item.Object is None \
+                and item.TypeId in ('Part::MultiFuse','Part::Fuse') \
+                and item.Label == item.Name and item.ViewObject.isHidden():
+            placement = item.Placement
+            for child in item.getChildren():
+                if not placement.isIdentity():
+                    child.Placement = placement.multiply(child.Placement)
+                result.append(child)
+        else:
+            result.append(item)
+    return result
+
 def p_block_list_(p):
     '''
     block_list : statement
@@ -160,7 +311,8 @@ def p_block_list_(p):
     #if printverbose: print(p[1])
     if(len(p) > 2) :
         if printverbose: print(p[2])
-        p[0] = p[1] + p[2]
+        p[1].extend(p[2])
+        p[0] = p[1]
     else :
         p[0] = p[1]
     #if printverbose: print("End Block List")
@@ -352,6 +504,7 @@ def p_operation(p):
 
 def placeholder(name,children,arguments):
     from OpenSCADFeatures import OpenSCADPlaceholder
+    children = createObjects(children)
     newobj=doc.addObject("Part::FeaturePython",name)
     OpenSCADPlaceholder(newobj,children,str(arguments))
     if gui:
@@ -365,8 +518,10 @@ def placeholder(name,children,arguments):
     return newobj
 
 def CGALFeatureObj(name,children,arguments=[]):
+    children = createObjects(children)
     myobj=doc.addObject("Part::FeaturePython",name)
     CGALFeature(myobj,name,children,str(arguments))
+    cgalfeatures.append(myobj)
     if gui:
         for subobj in children:
             subobj.ViewObject.hide()
@@ -383,9 +538,9 @@ def p_offset_action(p):
     if len(p[6]) == 0:
         newobj = placeholder('group',[],'{}')
     elif (len(p[6]) == 1 ): #single object
-        subobj = p[6]
+        subobj = createObjects(p[6])
     else:
-        subobj = fuse(p[6],"Offset Union")
+        subobj = [createObject(fuse(p[6],"Offset Union"))]
     if 'r' in p[3] :
         offset = float(p[3]['r'])
     if 'delta' in p[3] : 
@@ -484,20 +639,23 @@ def fuse(lst,name):
     if printverbose: print("Fuse")
     if printverbose: print(lst)
     if len(lst) == 0:
-        myfuse = placeholder('group',[],'{}')
+        return placeholder('group',[],'{}')
     elif len(lst) == 1:
        return lst[0]
+    if batchmode:
+       # merging keeps at least two shapes
+       lst = mergeUnions(lst)
     # Is this Multi Fuse
-    elif len(lst) > 2:
+    if len(lst) > 2:
        if printverbose: print("Multi Fuse")
-       myfuse = doc.addObject('Part::MultiFuse',name)
+       myfuse = addObject('Part::MultiFuse',name)
        myfuse.Shapes = lst
        if gui:
            for subobj in myfuse.Shapes:
                subobj.ViewObject.hide()
     else:
        if printverbose: print("Single Fuse")
-       myfuse = doc.addObject('Part::Fuse',name)
+       myfuse = addObject('Part::Fuse',name)
        myfuse.Base = lst[0]
        myfuse.Tool = lst[1]
        if gui:
@@ -525,7 +683,7 @@ def p_difference_action(p):
         p[0] = p[5]
     else:
 # Cut using Fuse    
-        mycut = doc.addObject('Part::Cut',p[1])
+        mycut = addObject('Part::Cut',p[1])
         mycut.Base = p[5][0]
 #       Can only Cut two objects do we need to fuse extras
         if (len(p[5]) > 2 ):
@@ -547,14 +705,14 @@ def p_intersection_action(p):
     # Is this Multi Common
     if (len(p[5]) > 2):
        if printverbose: print("Multi Common")
-       mycommon = doc.addObject('Part::MultiCommon',p[1])
+       mycommon = addObject('Part::MultiCommon',p[1])
        mycommon.Shapes = p[5]
        if gui:
            for subobj in mycommon.Shapes:
                subobj.ViewObject.hide()
     elif (len(p[5]) == 2):
        if printverbose: print("Single Common")
-       mycommon = doc.addObject('Part::Common',p[1])
+       mycommon = addObject('Part::Common',p[1])
        mycommon.Base = p[5][0]
        mycommon.Tool = p[5][1]
        if gui:
@@ -568,6 +726,7 @@ def p_intersection_action(p):
     if printverbose: print("End Intersection")
 
 def process_rotate_extrude(obj,angle):
+    obj = createObject(obj)
     newobj=doc.addObject("Part::FeaturePython",'RefineRotateExtrude')
     RefineShape(newobj,obj)
     if gui:
@@ -608,6 +767,7 @@ def p_rotate_extrude_file(p):
     if printverbose: print("End Rotate Extrude File")
 
 def process_linear_extrude(obj,h) :
+    obj = createObject(obj)
     #if gui:
     newobj=doc.addObject("Part::FeaturePython",'RefineLinearExtrude')
     RefineShape(newobj,obj)#mylinear)
@@ -631,6 +791,7 @@ def process_linear_extrude(obj,h) :
     return(mylinear)
 
 def process_linear_extrude_with_twist(base,height,twist) :   
+    base = createObject(base)
     newobj=doc.addObject("Part::FeaturePython",'twist_extrude')
     Twist(newobj,base,height,-twist) #base is an FreeCAD Object, height and twist are floats
     if gui:
@@ -809,6 +970,7 @@ def p_multmatrix_action(p):
         new_part = part
     elif isrotoinversionpython(fcsubmatrix(transform_matrix)):
         if printverbose: print("orthogonal and inversion")
+        part = createObject(part)
         cmat,axisvec = decomposerotoinversion(transform_matrix)
         new_part=doc.addObject("Part::Mirroring",'mirr_%s'%part.Name)
         new_part.Source=part
@@ -825,6 +987,7 @@ def p_multmatrix_action(p):
     elif FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/OpenSCAD").\
         GetBool('useMultmatrixFeature'):
         from OpenSCADFeatures import MatrixTransform
+        part = createObject(part)
         new_part=doc.addObject("Part::FeaturePython",'Matrix Deformation')
         MatrixTransform(new_part,transform_matrix,part)
         if gui:
@@ -838,6 +1001,7 @@ def p_multmatrix_action(p):
     else :
         if printverbose: print("Transform Geometry")
 #       Need to recompute to stop transformGeometry causing a crash        
+        part = createObject(part)
         doc.recompute()
         new_part = doc.addObject("Part::Feature","Matrix Deformation")
       #  new_part.Shape = part.Base.Shape.transformGeometry(transform_matrix)
@@ -875,7 +1039,7 @@ def p_sphere_action(p):
     'sphere_action : sphere LPAREN keywordargument_list RPAREN SEMICOL'
     if printverbose: print("Sphere : ",p[3])
     r = float(p[3]['r'])
-    mysphere = doc.addObject("Part::Sphere",p[1])
+    mysphere = addObject("Part::Sphere",p[1])
     mysphere.Radius = r
     if printverbose: print("Push Sphere")
     p[0] = [mysphere]
@@ -914,7 +1078,7 @@ def p_cylinder_action(p):
         if ( r1 == r2 and r1 > 0):
             if printverbose: print("Make Cylinder")
             if n < 3 or fnmax != 0 and n > fnmax:
-                mycyl=doc.addObject("Part::Cylinder",p[1])
+                mycyl=addObject("Part::Cylinder",p[1])
                 mycyl.Height = h
                 mycyl.Radius = r1
             else :
@@ -938,7 +1102,7 @@ def p_cylinder_action(p):
                     if gui:
                         mycyl.Base.ViewObject.hide()
                 else: #Use Part::Prism primitive
-                    mycyl=doc.addObject("Part::Prism","prism")
+                    mycyl=addObject("Part::Prism","prism")
                     mycyl.Polygon = n
                     mycyl.Circumradius  = r1
                     mycyl.Height  = h
@@ -946,7 +1110,7 @@ def p_cylinder_action(p):
         elif (r1 != r2):
             if n < 3 or fnmax != 0 and n > fnmax:
                 if printverbose: print("Make Cone")
-                mycyl=doc.addObject("Part::Cone",p[1])
+                mycyl=addObject("Part::Cone",p[1])
                 mycyl.Height = h
                 mycyl.Radius1 = r1
                 mycyl.Radius2 = r2
@@ -995,7 +1159,7 @@ def p_cube_action(p):
     l,w,h = [float(str1) for str1 in p[3]['size']]
     if (l > 0 and w > 0 and h >0):
         if printverbose: print("cube : ",p[3])
-        mycube=doc.addObject('Part::Box',p[1])
+        mycube=addObject('Part::Box',p[1])
         mycube.Length=l
         mycube.Width=w
         mycube.Height=h
@@ -1048,7 +1212,7 @@ def p_square_action(p) :
     size = p[3]['size']
     x = float(size[0])
     y = float(size[1])
-    mysquare = doc.addObject('Part::Plane',p[1])
+    mysquare = addObject('Part::Plane',p[1])
     mysquare.Length=x
     mysquare.Width=y
     if p[3]['center']=='true' :
@@ -1193,9 +1357,9 @@ def p_projection_action(p) :
             if gui:
                 plane.ViewObject.hide()
         if (len(p[6]) > 1):
-            subobj = [fuse(p[6],"projection_cut_implicit_group")]
+            subobj = [createObject(fuse(p[6],"projection_cut_implicit_group"))]
         else:
-            subobj = p[6]
+            subobj = createObjects(p[6])
         obj.Shapes = [plane]+subobj
         if gui:
             subobj[0].ViewObject.hide()
@@ -26,7 +26,20 @@ __url__ = "http://www.freecadweb.org"
 __doc__ = "Implementation of GeneralFuseResult class, which parses return of generalFuse."
 
 import Part
-from .Utils import HashableShape, HashableShape_Deep, FrozenClass
+from .Utils import HashableShape, HashableShape_Deep, FrozenClass, compoundLeaves
+
+aggregate_types = set(["Wire","Shell","CompSolid","Compound"])
+nonaggregate_types = set(["Vertex","Edge","Face","Solid"])
+
+# for each splittable aggregate type, attribute names to get bits of aggregate (e.g. faces of a
+# shell), and joints connecting the bits (e.g. edges)
+split_elements = {"Wire": ("Edges", "Vertexes"),
+                  "Shell": ("Faces", "Edges"),
+                  "CompSolid": ("Solids", "Faces")}
+
+def hasAggregates(shape):
+    "hasAggregates(shape): returns True if shape is a wire, shell or compsolid, or a compound containing any."
+    return any([leaf.ShapeType in split_elements for leaf in compoundLeaves(shape)])
 
 
 class GeneralFuseResult(FrozenClass):
@@ -52,6 +65,7 @@ def myCustomFusionRoutine(list_of_shapes):
         self._sources_of_piece = [] #list of source shapes (indexes) the piece came from, by index of piece. List of lists of ints.
 
         self._element_to_source = {} #dictionary for finding, which source shapes did an element of pieces come from. key = HashableShape (element). Value = set of ints
+        self._bits_of_joint = {} #dictionary for finding bits of pieces connected to a joint, filled on demand by makeSplitPieces. key = (bits attribute, joints attribute). Value = dict (key = HashableShape (joint), value = list of bits)
 
         self._freeze()
 
@@ -101,9 +115,6 @@ def myCustomFusionRoutine(list_of_shapes):
                 map_needs_repairing = True
 
         if map_needs_repairing:
-            aggregate_types = set(["Wire","Shell","CompSolid","Compound"])
-            nonaggregate_types = set(["Vertex","Edge","Face","Solid"])
-
             types = set()
             for piece in self.pieces:
                 types.add(piece.ShapeType)
@@ -159,12 +170,14 @@ def myCustomFusionRoutine(list_of_shapes):
 
         for iPiece in range(len(self.pieces)):
             piece = self.pieces[iPiece]
+            sources = self._sources_of_piece[iPiece]
             for element in piece.Vertexes + piece.Edges + piece.Faces + piece.Solids:
                 el_h = HashableShape(element)
-                if el_h in self._element_to_source:
-                    self._element_to_source[el_h].update(set(self._sources_of_piece[iPiece]))
+                el_sources = self._element_to_source.get(el_h)
+                if el_sources is None:
+                    self._element_to_source[el_h] = set(sources)
                 else:
-                    self._element_to_source[el_h] = set(self._sources_of_piece[iPiece])
+                    el_sources.update(sources)
 
     def indexOfPiece(self, piece_shape):
         "indexOfPiece(piece_shape): returns index of piece_shape in list of pieces"
@@ -215,12 +228,18 @@ def myCustomFusionRoutine(list_of_shapes):
 
         Notes:
         * this routine is very important to functioning of Connect on shells and wires.
+        * if none of pieces_to_split is (or contains) a wire, shell or compsolid, nothing is done.
         * Warning: convoluted and slow."""
 
         if pieces_to_split is None:
             pieces_to_split = self.pieces
-        pieces_to_split = [HashableShape(piece) for piece in pieces_to_split]
-        pieces_to_split = set(pieces_to_split)
+        pieces_to_split = [piece for piece in pieces_to_split if hasAggregates(piece)]
+        if len(pieces_to_split) == 0:
+            return
+        self._splitAggregates(set([HashableShape(piece) for piece in pieces_to_split]))
+
+    def _splitAggregates(self, pieces_to_split):
+        "splitAggregates implementation. pieces_to_split is a set of HashableShapes."
 
         self.parse_elements()
         new_data = GeneralFuseReturnBuilder(self.source_shapes)
@@ -291,6 +310,20 @@ def myCustomFusionRoutine(list_of_shapes):
             return None
 
 
+    def _bitsOfJointIndex(self, bits_attr, joints_attr):
+        """Returns dict of bits of all pieces, by joint (e.g. faces by edge). Key =
+        HashableShape (joint). Value = list of bits. Built on first use."""
+
+        key = (bits_attr, joints_attr)
+        index = self._bits_of_joint.get(key)
+        if index is None:
+            index = {}
+            for bit in getattr(self.gfa_return[0], bits_attr):
+                for joint in getattr(bit, joints_attr):
+                    index.setdefault(HashableShape(joint), []).append(bit)
+            self._bits_of_joint[key] = index
+        return index
+
     def makeSplitPieces(self, shape):
         """makeSplitPieces(self, shape): splits a shell, wire or compsolid into pieces where
         it intersects with other shapes.
@@ -298,42 +331,32 @@ def myCustomFusionRoutine(list_of_shapes):
         Returns list of split pieces. If no splits were done, returns list containing the
         original shape."""
 
-        if shape.ShapeType == "Wire":
-            bit_extractor = lambda sh: sh.Edges
-            joint_extractor = lambda sh: sh.Vertexes
-        elif shape.ShapeType == "Shell":
-            bit_extractor = lambda sh: sh.Faces
-            joint_extractor = lambda sh: sh.Edges
-        elif shape.ShapeType == "CompSolid":
-            bit_extractor = lambda sh: sh.Solids
-            joint_extractor = lambda sh: sh.Faces
-        else:
+        if shape.ShapeType not in split_elements:
             #can't split the shape
             return [shape]
+        bits_attr, joints_attr = split_elements[shape.ShapeType]
 
         # for each joint, test if all bits it's connected to are from same number of sources. If not, this is a joint for splitting
-        # FIXME: this is slow, and maybe can be optimized
+        bits_of_joint = self._bitsOfJointIndex(bits_attr, joints_attr)
         splits = []
-        for joint in joint_extractor(shape):
-            joint_overlap_count = len(self._element_to_source[HashableShape(joint)])
+        for joint in getattr(shape, joints_attr):
+            joint_h = HashableShape(joint)
+            joint_overlap_count = len(self._element_to_source[joint_h])
             if joint_overlap_count > 1:
-                # find elements in pieces that are connected to joint
-                for bit in bit_extractor(self.gfa_return[0]):
-                    for joint_bit in joint_extractor(bit):
-                        if joint_bit.isSame(joint):
-                            #bit is connected to joint!
-                            bit_overlap_count = len(self._element_to_source[HashableShape(bit)])
-                            assert(bit_overlap_count <= joint_overlap_count)
-                            if bit_overlap_count < joint_overlap_count:
-                                if len(splits) == 0 or splits[-1] is not joint:
-                                    splits.append(joint)
+                # elements in pieces that are connected to joint
+                for bit in bits_of_joint.get(joint_h, []):
+                    bit_overlap_count = len(self._element_to_source[HashableShape(bit)])
+                    assert(bit_overlap_count <= joint_overlap_count)
+                    if bit_overlap_count < joint_overlap_count:
+                        splits.append(joint)
+                        break
         if len(splits)==0:
             #shape was not split - no split points found
             return [shape]
 
         from . import ShapeMerge
 
-        new_pieces = ShapeMerge.mergeShapes(bit_extractor(shape), split_connections= splits, bool_compsolid= True).childShapes()
+        new_pieces = ShapeMerge.mergeShapes(getattr(shape, bits_attr), split_connections= splits, bool_compsolid= True).childShapes()
         if len(new_pieces) == 1:
             #shape was not split (split points found, but the shape remained in one piece).
             return [shape]
@@ -351,8 +374,6 @@ def myCustomFusionRoutine(list_of_shapes):
         if not has_compounds:
             return
 
-        from .Utils import compoundLeaves
-
         new_data = GeneralFuseReturnBuilder(self.source_shapes)
         new_data.hasher_class = HashableShape #deep hashing not needed here.
 
@@ -375,6 +396,7 @@ class GeneralFuseReturnBuilder(FrozenClass):
         self._piece_to_index = {} # key = hasher_class(shape). Value = (index_into_self_dot_pieces, shape). Note that GeneralFuseResult uses this item directly.
 
         self._pieces_from_source = [] #list of list of ints
+        self._pieces_from_source_sets = [] #same as _pieces_from_source, as sets, for fast testing if a piece is already listed
         self.source_shapes = []
 
         self.hasher_class = HashableShape_Deep
@@ -385,6 +407,7 @@ class GeneralFuseReturnBuilder(FrozenClass):
         self.__define_attributes()
         self.source_shapes = source_shapes
         self._pieces_from_source = [[] for i in range(len(source_shapes))]
+        self._pieces_from_source_sets = [set() for i in range(len(source_shapes))]
 
     def addPiece(self, piece_shape, source_shape_index_list):
         """addPiece(piece_shape, source_shape_index_list): adds a piece. If the piece
@@ -408,8 +431,9 @@ class GeneralFuseReturnBuilder(FrozenClass):
             #re-adding
             ret = False
         for iSource in source_shape_index_list:
-            if not i_piece_existing in self._pieces_from_source[iSource]:
+            if not i_piece_existing in self._pieces_from_source_sets[iSource]:
                 self._pieces_from_source[iSource].append(i_piece_existing)
+                self._pieces_from_source_sets[iSource].add(i_piece_existing)
         return ret
 
     def replacePiece(self, piece_index, new_shape):
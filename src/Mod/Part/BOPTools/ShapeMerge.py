@@ -26,24 +26,75 @@ __url__ = "http://www.freecadweb.org"
 __doc__ = "Tools for merging shapes with shared elements. Useful for final processing of results of Part.Shape.generalFuse()."
 
 import Part
-from .Utils import HashableShape
+from .Utils import HashableShape, UnionFind
+
+class ElementIndex(object):
+    """ElementIndex(list_of_shapes, element_extractor, split_connections = []): index of the
+    elements of a list of shapes, mapping each element to the shapes it belongs to. Build it
+    once, and use it to test many pairs of shapes for connections, or to split the shapes into
+    connected groups.
+
+    element_extractor: function that takes shape as input, and returns list of shapes.
+
+    split_connections: list of elements to ignore (they are not indexed).
+
+    Shapes are referred to by their index in list_of_shapes."""
+
+    def __init__(self, list_of_shapes, element_extractor, split_connections = []):
+        self.shapes = list(list_of_shapes)
+        self.elements = [] # list of lists of HashableShapes. Elements of each shape.
+        self.owners = {} # dict. Key = HashableShape (element). Value = list of indexes of shapes containing the element.
+        excluded = set([HashableShape(element) for element in split_connections])
+        for i in range(len(self.shapes)):
+            shape_elements = []
+            for element in element_extractor(self.shapes[i]):
+                h = HashableShape(element)
+                if h in excluded:
+                    continue
+                owners = self.owners.setdefault(h, [])
+                if owners and owners[-1] == i: # element listed twice in the same shape
+                    continue
+                owners.append(i)
+                shape_elements.append(h)
+            self.elements.append(shape_elements)
+
+    def sharedElements(self, indexes):
+        """sharedElements(indexes): returns list of elements shared by all shapes given by
+        their indexes."""
+        indexes = set(indexes)
+        return [h.Shape for h in self.elements[min(indexes)] if indexes.issubset(self.owners[h])]
+
+    def isConnected(self, i1, i2):
+        "isConnected(i1, i2): returns True if shapes with indexes i1 and i2 share an element."
+        for h in self.elements[i1]:
+            if i2 in self.owners[h]:
+                return True
+        return False
+
+    def neighbours(self, i):
+        "neighbours(i): returns set of indexes of shapes sharing an element with shape i."
+        result = set()
+        for h in self.elements[i]:
+            result.update(self.owners[h])
+        result.discard(i)
+        return result
+
+    def groups(self):
+        """groups(): splits the shapes into groups connected by sharing elements. Returns
+        list of lists of indexes. Groups are in the order of their first shape, and shapes
+        of a group are in the order of list_of_shapes."""
+        sets = UnionFind(len(self.shapes))
+        for owners in self.owners.values():
+            for i in owners[1:]:
+                sets.union(owners[0], i)
+        return sets.groups()
 
 def findSharedElements(shape_list, element_extractor):
     if len(shape_list) < 2:
         raise ValueError("findSharedElements: at least two shapes must be provided (have {num})".format(num= len(shape_list)))
 
-    all_elements = [] #list of sets of HashableShapes
-    for shape in shape_list:
-        all_elements.append(set(
-            [HashableShape(sh) for sh in element_extractor(shape)]
-          ))
-    shared_elements = None
-    for elements in all_elements:
-        if shared_elements is None:
-            shared_elements = elements
-        else:
-            shared_elements.intersection_update(elements)
-    return [el.Shape for el in shared_elements]
+    index = ElementIndex(shape_list, element_extractor)
+    return index.sharedElements(range(len(shape_list)))
 
 def isConnected(shape1, shape2, shape_dim = -1):
     if shape_dim == -1:
@@ -52,7 +103,7 @@ def isConnected(shape1, shape2, shape_dim = -1):
                  1: (lambda sh: sh.Vertexes),
                  2: (lambda sh: sh.Edges),
                  3: (lambda sh: sh.Faces)    }[shape_dim]
-    return len(findSharedElements([shape1, shape2], extractor))>0
+    return ElementIndex([shape1, shape2], extractor).isConnected(0, 1)
 
 def splitIntoGroupsBySharing(list_of_shapes, element_extractor, split_connections = []):
     """splitIntoGroupsBySharing(list_of_shapes, element_type, split_connections = []): find,
@@ -64,55 +115,11 @@ def splitIntoGroupsBySharing(list_of_shapes, element_extractor, split_connection
     split groups on purpose.
 
     return: list of lists of shapes. Top-level list is list of groups; bottom level lists
-    enumerate shapes of a group."""
-
-    split_connections = set([HashableShape(element) for element in split_connections])
-
-    groups = [] #list of tuples (shapes,elements). Shapes is a list of plain shapes. Elements is a set of HashableShapes - all elements of shapes in the group, excluding split_connections.
-
-    # add shapes to the list of groups, one by one. If not connected to existing groups,
-    # new group is created. If connected, shape is added to groups, and the groups are joined.
-    for shape in list_of_shapes:
-        shape_elements = set([HashableShape(element) for element in element_extractor(shape)])
-        shape_elements.difference_update(split_connections)
-        #search if shape is connected to any groups
-        connected_to = []
-        for iGroup in range(len(groups)):
-            connected = False
-            for element in shape_elements:
-                if element in groups[iGroup][1]:
-                    connected_to.append(iGroup)
-                    connected = True
-                    break
-        # test if we need to join groups
-        if len(connected_to)>1:
-            #shape bridges a gap between some groups. Join them into one.
-            #rebuilding list of groups. First, add the new "supergroup", then add the rest
-            groups_new = []
-
-            supergroup = (list(),set())
-            for iGroup in connected_to:
-                supergroup[0].extend( groups[iGroup][0] )# merge lists of shapes
-                supergroup[1].update( groups[iGroup][1] )# merge lists of elements
-            groups_new.append(supergroup)
-
-            for iGroup in range(len(groups)):
-                if not iGroup in connected_to: #fixme: inefficient!
-                    groups_new.append(groups[iGroup])
-            groups = groups_new
-            connected_to = [0]
-
-        # add shape to the group it is connected to (if to many, the groups should have been unified by the above code snippet)
-        if len(connected_to) > 0:
-            iGroup = connected_to[0]
-            groups[iGroup][0].append(shape)
-            groups[iGroup][1].update( shape_elements )
-        else:
-            newgroup = ([shape], shape_elements)
-            groups.append(newgroup)
+    enumerate shapes of a group. Groups are in the order of their first shape, and shapes
+    keep the order of list_of_shapes."""
 
-    # done. Discard unnecessary data and return result.
-    return [shapes for shapes,elements in groups]
+    index = ElementIndex(list_of_shapes, element_extractor, split_connections)
+    return [[index.shapes[i] for i in group] for group in index.groups()]
 
 def mergeSolids(list_of_solids_compsolids, flag_single = False, split_connections = [], bool_compsolid = False):
     """mergeSolids(list_of_solids, flag_single = False): merges touching solids that share
@@ -65,6 +65,43 @@ Example:
     def __hash__(self):
         return self.hash
 
+class UnionFind(object):
+    """UnionFind(size): disjoint sets of integers 0..size-1, initially each in its own set.
+    Used to join shapes into groups in nearly linear time."""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        "find(i): returns the representative of the set containing i"
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # path compression
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i, j):
+        "union(i, j): joins the sets containing i and j. The smallest representative is kept."
+        ri = self.find(i)
+        rj = self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+    def groups(self):
+        """groups(): returns list of sets, as lists of integers. Sets are sorted by their
+        smallest integer, and integers in a set are sorted too."""
+        groups = {}
+        order = []
+        for i in range(len(self.parent)):
+            root = self.find(i)
+            if root not in groups:
+                groups[root] = []
+                order.append(root)
+            groups[root].append(i)
+        return [groups[root] for root in order]
+
 def compoundLeaves(shape_or_compound):
     """compoundLeaves(shape_or_compound): extracts all non-compound shapes from a nested compound.
     Note: shape_or_compound may be a non-compound; then, it is the only thing in the
@@ -57,6 +57,97 @@ class PartTestCases(unittest.TestCase):
         FreeCAD.closeDocument("PartTest")
         #print ("omit closing document for debugging")
 
+class PartTestShapeMerge(unittest.TestCase):
+    def makeBrickWall(self, rows, columns):
+        "general-fused wall of 20x10x10 bricks in running bond, touching bricks share faces"
+        bricks = []
+        for row in range(rows):
+            shift = 10.0 * (row % 2)
+            for column in range(columns):
+                pos = FreeCAD.Vector(column * 20.0 + shift, 0.0, row * 10.0)
+                bricks.append(Part.makeBox(20.0, 10.0, 10.0, pos))
+        pieces, map = bricks[0].generalFuse(bricks[1:])
+        return pieces
+
+    def testBrickWallGroups(self):
+        from BOPTools import ShapeMerge
+        wall = self.makeBrickWall(3, 4)
+        solids = wall.Solids
+        groups = ShapeMerge.splitIntoGroupsBySharing(solids, lambda sh: sh.Faces)
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(len(groups[0]), len(solids))
+        # cutting all shared faces leaves every brick on its own
+        index = ShapeMerge.ElementIndex(solids, lambda sh: sh.Faces)
+        shared = [h.Shape for h, owners in index.owners.items() if len(owners) > 1]
+        groups = ShapeMerge.splitIntoGroupsBySharing(solids, lambda sh: sh.Faces, shared)
+        self.assertEqual(len(groups), len(solids))
+        neighbours = index.neighbours(0)
+        others = [i for i in range(1, len(solids)) if i not in neighbours]
+        self.assertTrue(neighbours and others)
+        self.assertTrue(ShapeMerge.isConnected(solids[0], solids[min(neighbours)]))
+        self.assertFalse(ShapeMerge.isConnected(solids[0], solids[others[0]]))
+
+class PartTestGeneralFuseResult(unittest.TestCase):
+    def sliceShapes(self, base):
+        "base and two horizontal planes, put in compounds like SplitAPI.slice does"
+        planes = [Part.makePlane(40.0, 20.0, FreeCAD.Vector(-5.0, -5.0, z)) for z in (3.0, 7.0)]
+        shapes = [base] + [Part.Compound([plane]) for plane in planes]
+        return shapes, shapes[0].generalFuse(shapes[1:])
+
+    def testJointIndex(self):
+        from BOPTools.GeneralFuseResult import GeneralFuseResult, split_elements
+        from BOPTools.Utils import HashableShape
+        base = Part.Compound([Part.makeBox(10.0, 10.0, 10.0).Shells[0],
+                              Part.makeBox(10.0, 10.0, 10.0, FreeCAD.Vector(20.0, 0.0, 0.0))])
+        shapes, gfa = self.sliceShapes(base)
+        gr = GeneralFuseResult(shapes, gfa)
+        result = gr.gfa_return[0]
+        for bits_attr, joints_attr in split_elements.values():
+            index = gr._bitsOfJointIndex(bits_attr, joints_attr)
+            bits = getattr(result, bits_attr)
+            for bit in bits:
+                for joint in getattr(bit, joints_attr):
+                    # the bits found by testing every bit of the result
+                    expected = [b for b in bits if any(j.isSame(joint) for j in getattr(b, joints_attr))]
+                    found = index[HashableShape(joint)]
+                    self.assertEqual(len(found), len(expected))
+                    for b in expected:
+                        self.assertTrue(any(b.isSame(f) for f in found))
+
+    def testSplitAggregates(self):
+        from BOPTools.GeneralFuseResult import GeneralFuseResult
+        from BOPTools.Utils import compoundLeaves
+        base = Part.Compound([Part.makeBox(10.0, 10.0, 10.0).Shells[0],
+                              Part.makeBox(10.0, 10.0, 10.0, FreeCAD.Vector(20.0, 0.0, 0.0))])
+        shapes, gfa = self.sliceShapes(base)
+        gr = GeneralFuseResult(shapes, gfa)
+        gr.splitAggregates(gr.piecesFromSource(shapes[0]))
+        leaves = [leaf for piece in gr.piecesFromSource(shapes[0]) for leaf in compoundLeaves(piece)]
+        shells = [leaf for leaf in leaves if leaf.ShapeType == "Shell"]
+        solids = [leaf for leaf in leaves if leaf.ShapeType == "Solid"]
+        # the shell is split at the planes, like the solid
+        self.assertEqual(len(shells), 3)
+        self.assertAlmostEqual(sum(shell.Area for shell in shells), 600.0, 6)
+        self.assertEqual(len(solids), 3)
+        self.assertAlmostEqual(sum(solid.Volume for solid in solids), 1000.0, 6)
+
+    def testSplitAggregatesNothingToSplit(self):
+        from BOPTools.GeneralFuseResult import GeneralFuseResult
+        from BOPTools.Utils import HashableShape
+        shapes, gfa = self.sliceShapes(Part.makeBox(10.0, 10.0, 10.0))
+        gr = GeneralFuseResult(shapes, gfa)
+        pieces = gr.pieces
+        gr.splitAggregates()
+        # solids are not split further, and the result is not rebuilt
+        self.assertIs(gr.pieces, pieces)
+        self.assertEqual(len(gr._element_to_source), 0)
+        # the same pieces as when running the split anyway
+        gr2 = GeneralFuseResult(shapes, gfa)
+        gr2._splitAggregates(set(HashableShape(piece) for piece in gr2.pieces))
+        self.assertEqual(len(gr2.pieces), len(pieces))
+        for p1, p2 in zip(pieces, gr2.pieces):
+            self.assertTrue(p1.isSame(p2))
+
 class PartTestBSplineCurve(unittest.TestCase):
     def setUp(self):
         self.Doc = FreeCAD.newDocument("PartTest")
@@ -69,3 +69,5 @@ class ShipWorkbench(Workbench):
             weightslist)
 
 Gui.addWorkbench(ShipWorkbench())
+
+FreeCAD.__unit_test__ += ["TestShip"]
@@ -0,0 +1,81 @@
+#***************************************************************************
+#*   Copyright (c) 2020 FreeCAD Developers                                 *
+#*                                                                         *
+#*   This program is free software; you can redistribute it and/or modify  *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)    *
+#*   as published by the Free Software Foundation; either version 2 of     *
+#*   the License, or (at your option) any later version.                   *
+#*   for detail see the LICENCE text file.                                 *
+#*                                                                         *
+#*   This program is distributed in the hope that it will be useful,       *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#*   GNU Library General Public License for more details.                  *
+#*                                                                         *
+#*   You should have received a copy of the GNU Library General Public     *
+#*   License along with this program; if not, write to the Free Software   *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+#*   USA                                                                   *
+#*                                                                         *
+#***************************************************************************
+
+import unittest
+import FreeCAD
+from FreeCAD import Units
+
+
+class ShipHydrostaticsCases(unittest.TestCase):
+    """Compare the hydrostatics computed on the hull mesh with the OCC ones,
+    on a 10 m x 2 m x 1 m box hull floating at 0.5 m"""
+
+    def setUp(self):
+        import Part
+        from shipCreateShip.Tools import createShip
+        self.doc = FreeCAD.newDocument("ShipTest")
+        box = Part.makeBox(10000, 2000, 1000, FreeCAD.Vector(-5000, -1000, 0))
+        self.ship = createShip([box],
+                               Units.parseQuantity("10 m"),
+                               Units.parseQuantity("2 m"),
+                               Units.parseQuantity("0.5 m"))
+        self.faces = Part.makeShell(box.Faces)
+
+    def tearDown(self):
+        FreeCAD.closeDocument(self.doc.Name)
+
+    def testMeshAnalytic(self):
+        from shipHydrostatics import MeshTools
+        hydro = MeshTools.Hydrostatics(self.ship, self.faces)
+        disp, B, cb = hydro.displacement()
+        self.assertAlmostEqual(disp.Value / MeshTools.DENS.Value, 1e10,
+                               delta=1e4)
+        self.assertAlmostEqual(B.x, 0.0, 3)
+        self.assertAlmostEqual(B.y, 0.0, 3)
+        self.assertAlmostEqual(B.z, 250.0, 3)
+        self.assertAlmostEqual(cb, 1.0, 6)
+        self.assertAlmostEqual(hydro.floatingArea()[0].Value, 2e7, delta=1.0)
+        self.assertAlmostEqual(hydro.wettedArea().Value, 3.2e7, delta=1.0)
+        # BM = I / V = B^2 / (12 T)
+        self.assertAlmostEqual(hydro.BMT().Value, 2000.0**2 / 6000.0, 3)
+
+    def testMeshMatchesOCC(self):
+        from shipHydrostatics import MeshTools
+        for roll in ("0 deg", "5 deg"):
+            results = MeshTools.validate(self.ship, self.faces,
+                                         roll=Units.parseQuantity(roll))
+            for key in ("disp", "xcb", "ycb", "zcb", "farea", "wet"):
+                self.assertLess(results[key][2], 1e-3, key)
+            # Tools.BMT() inclines the ship, instead of using I / V
+            self.assertLess(results["BMt"][2], 0.02)
+
+    def testPoints(self):
+        from shipHydrostatics import Tools, MeshTools
+        draft = Units.parseQuantity("0.4 m")
+        trim = Units.parseQuantity("0 deg")
+        occ = Tools.Point(self.ship, self.faces, draft, trim)
+        mesh = MeshTools.Hydrostatics(self.ship, self.faces).point(draft, trim)
+        self.assertAlmostEqual(mesh.disp.Value / occ.disp.Value, 1.0, 3)
+        self.assertAlmostEqual(mesh.KBt.Value, occ.KBt.Value, 0)
+        self.assertAlmostEqual(mesh.farea.Value / occ.farea.Value, 1.0, 3)
+        self.assertAlmostEqual(mesh.wet.Value / occ.wet.Value, 1.0, 3)
+        self.assertAlmostEqual(mesh.Cb, occ.Cb, 3)
+        self.assertAlmostEqual(mesh.Cm, occ.Cm, 3)
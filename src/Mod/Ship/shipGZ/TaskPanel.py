@@ -56,7 +56,10 @@ class TaskPanel:
         for i in range(n_points):
             rolls.append(roll * i / float(n_points - 1))
 
-        points = Tools.gz(self.lc, rolls, var_trim)
+        # worker processes are opt-in, 0 or 1 computes the curve in FreeCAD
+        param = App.ParamGet("User parameter:BaseApp/Preferences/Mod/Ship")
+        workers = param.GetInt("GZWorkers", 0)
+        points = Tools.gz(self.lc, rolls, var_trim, workers=workers)
         gzs = []
         drafts = []
         trims = []
@@ -27,16 +27,67 @@ import FreeCADGui as Gui
 from FreeCAD import Vector, Matrix, Placement
 import Part
 from FreeCAD import Units
+from PySide import QtGui
 import Instance as ShipInstance
 import WeightInstance
 import TankInstance
 from shipHydrostatics import Tools as Hydrostatics
+from shipHydrostatics import MeshTools
 
 
 G = Units.parseQuantity("9.81 m/s^2")
 MAX_EQUILIBRIUM_ITERS = 10
 DENS = Units.parseQuantity("1025 kg/m^3")
 TRIM_RELAX_FACTOR = 10.0
+# Tolerances to consider that two displacement evaluations are the same one.
+# The draft tolerance is relative to the ship length, the angles ones are in
+# degrees
+CACHE_DRAFT_TOLERANCE = 1e-6
+CACHE_ANGLE_TOLERANCE = 1e-4
+# Maximum number of worker processes of the parallel solver
+MAX_WORKERS = 8
+
+
+class DisplacementCache(object):
+    """Cache of the displacement evaluations, to avoid computing them again
+    when the equilibrium iterations are revisiting a floating condition.
+
+    The floating conditions closer than the tolerances are considered the same
+    one.
+    """
+    def __init__(self, displacement, length,
+                 draft_tol=CACHE_DRAFT_TOLERANCE,
+                 angle_tol=CACHE_ANGLE_TOLERANCE):
+        """Create the cache
+
+        Position arguments:
+        displacement -- Displacement function, with the draft, roll and trim
+        as arguments (see Hydrostatics.displacement)
+        length -- Ship length
+
+        Keyword arguments:
+        draft_tol -- Draft tolerance, relative to the ship length
+        angle_tol -- Roll and trim angles tolerance, in degrees
+        """
+        self.displacement = displacement
+        self.draft_tol = draft_tol * Units.Quantity(length).getValueAs('mm').Value
+        self.angle_tol = angle_tol
+        self.values = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, draft, roll, trim):
+        key = (int(round(draft.getValueAs('mm').Value / self.draft_tol)),
+               int(round(roll.getValueAs('deg').Value / self.angle_tol)),
+               int(round(trim.getValueAs('deg').Value / self.angle_tol)))
+        try:
+            value = self.values[key]
+            self.hits += 1
+        except KeyError:
+            value = self.displacement(draft, roll, trim)
+            self.values[key] = value
+            self.misses += 1
+        return value
 
 
 def solve(ship, weights, tanks, rolls, var_trim=True):
@@ -84,19 +135,29 @@ def solve(ship, weights, tanks, rolls, var_trim=True):
         TW += vol * t[1]
     TW = TW * G
 
+    displacement = DisplacementCache(
+        lambda draft, roll, trim: Hydrostatics.displacement(ship, draft,
+                                                            roll, trim),
+        ship.Length)
     points = []
+    draft = trim = None
     for i,roll in enumerate(rolls):
         App.Console.PrintMessage("{0} / {1}\n".format(i + 1, len(rolls)))
+        # Start from the equilibrium of the previous roll angle
         point = solve_point(W, COG, TW, VOLS,
-                            ship, tanks, roll, var_trim)
+                            ship, tanks, roll, var_trim,
+                            draft=draft, trim=trim, displacement=displacement)
         if point is None:
             return []
         points.append(point)
+        _, draft, trim = point
 
     return points
 
 
-def solve_point(W, COG, TW, VOLS, ship, tanks, roll, var_trim=True):
+def solve_point(W, COG, TW, VOLS, ship, tanks, roll, var_trim=True,
+                draft=None, trim=None, displacement=None, cogs=None,
+                max_draft=None, max_disp=None):
     """ Compute the ship GZ value.
     @param W Empty ship weight.
     @param COG Empty ship Center of mass.
@@ -106,13 +167,25 @@ def solve_point(W, COG, TW, VOLS, ship, tanks, roll, var_trim=True):
     @param roll Roll angle.
     @param var_trim True if the trim angle should be recomputed at each roll
     angle, False otherwise.
+    @param draft Initial draft of the equilibrium iterations, None to start
+    from the ship design draft.
+    @param trim Initial trim angle of the equilibrium iterations, None to
+    start from a null trim.
+    @param displacement Function to compute the displacement, with the draft,
+    roll and trim as arguments, None to use Hydrostatics.displacement.
+    @param cogs List of functions to compute the tanks centers of gravity,
+    with the fluid volume, roll and trim as arguments, None to use the tanks
+    getCoG methods.
+    @param max_draft Maximum draft, None to get it from the ship shape.
+    @param max_disp Maximum displacement, None to get it from the ship shape.
     @return GZ value, equilibrium draft, and equilibrium trim angle (0 if
     variable trim has not been requested)
     """    
     # Look for the equilibrium draft (and eventually the trim angle too)
-    max_draft = Units.Quantity(ship.Shape.BoundBox.ZMax, Units.Length)
-    draft = ship.Draft
-    max_disp = Units.Quantity(ship.Shape.Volume, Units.Volume) * DENS * G
+    if max_draft is None:
+        max_draft = Units.Quantity(ship.Shape.BoundBox.ZMax, Units.Length)
+    if max_disp is None:
+        max_disp = Units.Quantity(ship.Shape.Volume, Units.Volume) * DENS * G
     if max_disp < W + TW:
         msg = QtGui.QApplication.translate(
             "ship_console",
@@ -121,14 +194,21 @@ def solve_point(W, COG, TW, VOLS, ship, tanks, roll, var_trim=True):
         App.Console.PrintError(msg + ' ({} vs. {})\n'.format(
             (max_disp / G).UserString, ((W + TW) / G).UserString))
         return None
+    if displacement is None:
+        displacement = lambda draft, roll, trim: Hydrostatics.displacement(
+            ship, draft, roll, trim)
+    if cogs is None:
+        cogs = [lambda vol, roll, trim, t=t: t[0].Proxy.getCoG(t[0], vol,
+                                                               roll, trim)
+                for t in tanks]
 
-    trim = Units.parseQuantity("0 deg")
+    if draft is None:
+        draft = ship.Draft
+    if trim is None or not var_trim:
+        trim = Units.parseQuantity("0 deg")
     for i in range(MAX_EQUILIBRIUM_ITERS):
         # Get the displacement, and the bouyance application point
-        disp, B, _ = Hydrostatics.displacement(ship,
-                                               draft,
-                                               roll,
-                                               trim)
+        disp, B, _ = displacement(draft, roll, trim)
         disp *= G
 
         # Add the tanks effect on the center of gravity
@@ -137,7 +217,7 @@ def solve_point(W, COG, TW, VOLS, ship, tanks, roll, var_trim=True):
         mom_z = Units.Quantity(COG.z, Units.Length) * W
         for i,t in enumerate(tanks):
             tank_weight = VOLS[i] * t[1] * G
-            tank_cog = t[0].Proxy.getCoG(t[0], VOLS[i], roll, trim)
+            tank_cog = cogs[i](VOLS[i], roll, trim)
             mom_x += Units.Quantity(tank_cog.x, Units.Length) * tank_weight
             mom_y += Units.Quantity(tank_cog.y, Units.Length) * tank_weight
             mom_z += Units.Quantity(tank_cog.z, Units.Length) * tank_weight
@@ -168,7 +248,151 @@ def solve_point(W, COG, TW, VOLS, ship, tanks, roll, var_trim=True):
     return c * R_y - s * R_z, draft, trim
 
 
-def gz(lc, rolls, var_trim=True):
+def _solve_rolls(args):
+    """Compute a set of consecutive GZ curve points, starting each
+    equilibrium from the previous one. This function is executed by the
+    worker processes of solve_parallel(), so it only works with the hull and
+    tanks meshes, and with the values of the quantities in the FreeCAD
+    internal units.
+
+    Position arguments:
+    args -- Tuple with the hull mesh (see MeshTools.Hydrostatics), the list
+    of tanks (each one a tuple with the tank mesh, see MeshTools.Tank, the
+    fluid density and the fluid volume), the empty ship weight and center of
+    gravity, the tanks weight, the maximum draft and displacement, the roll
+    angles, and the variable trim flag
+
+    Returned value:
+    List of GZ curve points values (GZ, draft and trim angle), or None if
+    the ship cannot float
+    """
+    (hydro, tanks, W, COG, TW, max_draft, max_disp, rolls, var_trim) = args
+    W = Units.Quantity(W, Units.Force)
+    TW = Units.Quantity(TW, Units.Force)
+    COG = Vector(*COG)
+    max_draft = Units.Quantity(max_draft, Units.Length)
+    max_disp = Units.Quantity(max_disp, Units.Force)
+    VOLS = [Units.Quantity(t[2], Units.Volume) for t in tanks]
+    tanks = [(t[0], Units.Quantity(t[1], Units.Density), t[2]) for t in tanks]
+
+    class ShipValues:
+        Draft = Units.Quantity(hydro.draft, Units.Length)
+        Length = Units.Quantity(hydro.length, Units.Length)
+
+    displacement = DisplacementCache(hydro.displacement, ShipValues.Length)
+    cogs = [t[0].getCoG for t in tanks]
+    points = []
+    draft = trim = None
+    for roll in rolls:
+        roll = Units.Quantity(roll, Units.Angle)
+        point = solve_point(W, COG, TW, VOLS, ShipValues, tanks, roll,
+                            var_trim, draft=draft, trim=trim,
+                            displacement=displacement, cogs=cogs,
+                            max_draft=max_draft, max_disp=max_disp)
+        if point is None:
+            return None
+        _, draft, trim = point
+        points.append(tuple(p.Value for p in point))
+    return points
+
+
+def solve_parallel(ship, weights, tanks, rolls, var_trim=True, workers=1):
+    """Compute the ship GZ stability curve in parallel
+
+    The hull and the tanks are tessellated, and the hydrostatics computed on
+    the meshes (see shipHydrostatics.MeshTools). The roll angles are split in
+    consecutive chunks, one per worker process, such that each equilibrium
+    can start from the previous roll angle one. If the worker processes
+    cannot be started, the chunks are computed in this process.
+
+    Position arguments:
+    ship -- Ship object
+    weights -- List of weights to consider
+    tanks -- List of tanks to consider (each one should be a tuple with the
+    tank instance, the density of the fluid inside, and the filling level ratio)
+    rolls -- List of roll angles
+
+    Keyword arguments:
+    var_trim -- True if the equilibrium trim should be computed for each roll
+    angle, False if null trim angle can be used instead.
+    workers -- Number of worker processes, up to MAX_WORKERS. If it is not
+    bigger than 1, the curve is computed in this process.
+
+    Returned value:
+    List of GZ curve points, see solve()
+    """
+    if not rolls:
+        return []
+    # Get the unloaded weight (ignoring the tanks for the moment).
+    W = Units.parseQuantity("0 kg")
+    mom_x = Units.parseQuantity("0 kg*m")
+    mom_y = Units.parseQuantity("0 kg*m")
+    mom_z = Units.parseQuantity("0 kg*m")
+    for w in weights:
+        W += w.Proxy.getMass(w)
+        m = w.Proxy.getMoment(w)
+        mom_x += m[0]
+        mom_y += m[1]
+        mom_z += m[2]
+    COG = Vector(mom_x / W, mom_y / W, mom_z / W)
+    W = W * G
+
+    # Get the tanks weight
+    TW = Units.parseQuantity("0 kg")
+    tank_meshes = []
+    for t in tanks:
+        vol = t[0].Proxy.getVolume(t[0], t[2])
+        TW += vol * t[1]
+        tank_meshes.append((MeshTools.Tank(t[0]), t[1].Value, vol.Value))
+    TW = TW * G
+
+    max_draft = ship.Shape.BoundBox.ZMax
+    max_disp = Units.Quantity(ship.Shape.Volume, Units.Volume) * DENS * G
+    if max_disp < W + TW:
+        msg = QtGui.QApplication.translate(
+            "ship_console",
+            "Too much weight! The ship will never displace water enough",
+            None)
+        App.Console.PrintError(msg + ' ({} vs. {})\n'.format(
+            (max_disp / G).UserString, ((W + TW) / G).UserString))
+        return []
+    hydro = MeshTools.Hydrostatics(ship)
+
+    workers = max(1, min(workers, MAX_WORKERS, len(rolls)))
+    n = int(math.ceil(len(rolls) / float(workers)))
+    chunks = [rolls[i:i + n] for i in range(0, len(rolls), n)]
+    jobs = [(hydro, tank_meshes, W.Value, (COG.x, COG.y, COG.z), TW.Value,
+             max_draft, max_disp.Value,
+             [r.getValueAs('deg').Value for r in chunk], var_trim)
+            for chunk in chunks]
+
+    results = None
+    if len(jobs) > 1:
+        try:
+            import concurrent.futures
+            with concurrent.futures.ProcessPoolExecutor(len(jobs)) as pool:
+                results = list(pool.map(_solve_rolls, jobs))
+        except Exception as e:
+            msg = QtGui.QApplication.translate(
+                "ship_console",
+                "Unable to use worker processes, computing in this process",
+                None)
+            App.Console.PrintWarning(msg + ' ({})\n'.format(e))
+    if results is None:
+        results = [_solve_rolls(job) for job in jobs]
+
+    points = []
+    for chunk in results:
+        if chunk is None:
+            return []
+        for gz, draft, trim in chunk:
+            points.append((Units.Quantity(gz, Units.Length),
+                           Units.Quantity(draft, Units.Length),
+                           Units.Quantity(trim, Units.Angle)))
+    return points
+
+
+def gz(lc, rolls, var_trim=True, workers=0):
     """Compute the ship GZ stability curve
 
     Position arguments:
@@ -178,6 +402,10 @@ def gz(lc, rolls, var_trim=True):
     Keyword arguments:
     var_trim -- True if the equilibrium trim should be computed for each roll
     angle, False if null trim angle can be used instead.
+    workers -- If it is bigger than 1, the number of worker processes used
+    to compute the curve on the ship and tanks meshes (see solve_parallel()).
+    Otherwise the curve is computed in this process, using the OCC shapes
+    (see solve())
 
     Returned value:
     List of GZ curve points. Each point contains the GZ stability length, the
@@ -304,4 +532,6 @@ def gz(lc, rolls, var_trim=True):
             continue
         tanks.append((t, dens, level))
 
+    if workers > 1:
+        return solve_parallel(ship, weights, tanks, rolls, var_trim, workers)
     return solve(ship, weights, tanks, rolls, var_trim)
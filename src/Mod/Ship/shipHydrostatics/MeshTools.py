@@ -0,0 +1,647 @@
+#***************************************************************************
+#*                                                                         *
+#*   Copyright (c) 2020                                                    *
+#*   Jose Luis Cercos Pita <jlcercos@gmail.com>                            *
+#*                                                                         *
+#*   This program is free software; you can redistribute it and/or modify  *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)    *
+#*   as published by the Free Software Foundation; either version 2 of     *
+#*   the License, or (at your option) any later version.                   *
+#*   for detail see the LICENCE text file.                                 *
+#*                                                                         *
+#*   This program is distributed in the hope that it will be useful,       *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#*   GNU Library General Public License for more details.                  *
+#*                                                                         *
+#*   You should have received a copy of the GNU Library General Public     *
+#*   License along with this program; if not, write to the Free Software   *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+#*   USA                                                                   *
+#*                                                                         *
+#***************************************************************************
+
+"""Hydrostatics computed on a triangle mesh of the hull.
+
+The functions in Tools place, cut and slice the ship shape with OCC booleans
+for every draft and section. Here the hull is tessellated once, and each
+floating condition just transforms the vertices and clips the triangles by
+the free surface plane (and by the sections planes), using NumPy.
+
+The volume integrals are converted into surface integrals (divergence
+theorem) on the submerged triangles, so the free surface cap, where z = 0,
+does not contribute to them. The integrals are exact for the mesh, and the
+accuracy with respect to the OCC shape is only controlled by the
+tessellation deflection. Use validate() to compare both approaches.
+
+The hydrostatics task panel uses the OCC functions in Tools by default. Set
+the boolean "HydrostaticsMesh" parameter in
+"User parameter:BaseApp/Preferences/Mod/Ship" to use this module instead.
+Note that Hydrostatics.BMT() is computed from the waterplane inertia, while
+Tools.BMT() inclines the ship, so the results are slightly different.
+"""
+
+import math
+import numpy as np
+from FreeCAD import Vector
+from FreeCAD import Units
+import FreeCAD as App
+
+
+DENS = Units.parseQuantity("1025 kg/m^3")  # Salt water
+# Tessellation deflection, relative to the hull bounding box diagonal
+DEFLECTION = 0.0005
+# Maximum number of iterations, and relative volume tolerance, to find the
+# fluid level inside the tanks
+TANK_LEVEL_ITERATIONS = 60
+TANK_LEVEL_TOLERANCE = 1e-6
+
+
+def _value(q, unit):
+    """Get the value of a quantity in the provided units, or the value itself
+    if a float is provided (assumed in the FreeCAD internal units)"""
+    if isinstance(q, Units.Quantity):
+        return q.getValueAs(unit).Value
+    return float(q)
+
+
+def tessellate(shape, deflection=None):
+    """Tessellate a shape
+
+    Position arguments:
+    shape -- Shape to tessellate
+
+    Keyword arguments:
+    deflection -- Linear deflection of the tessellation. If None, DEFLECTION
+    times the bounding box diagonal length will be used
+
+    Returned value:
+    Triangles, as a NumPy array of shape (n, 3, 3)
+    """
+    if deflection is None:
+        deflection = DEFLECTION * shape.BoundBox.DiagonalLength
+    points, facets = shape.tessellate(deflection)
+    points = np.array([(p.x, p.y, p.z) for p in points], dtype=np.float64)
+    facets = np.array(facets, dtype=np.int64).reshape(-1, 3)
+    return points[facets]
+
+
+def triangleAreas(tris):
+    """Compute the oriented area vectors of the triangles, i.e. the normals
+    with a length equal to the triangles areas"""
+    return 0.5 * np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+
+
+def _quadMean(f):
+    """Mean of a linear function squared on the triangles, from its values at
+    the vertices, i.e. integral(f^2 dA) / A"""
+    return (f[:, 0] * f[:, 0] + f[:, 1] * f[:, 1] + f[:, 2] * f[:, 2] +
+            f[:, 0] * f[:, 1] + f[:, 1] * f[:, 2] + f[:, 2] * f[:, 0]) / 6.0
+
+
+def clip(tris, axis, value, below=True):
+    """Clip triangles by an axis aligned plane
+
+    Position arguments:
+    tris -- Triangles, as a NumPy array of shape (n, 3, 3)
+    axis -- Normal of the clipping plane (0 = x, 1 = y, 2 = z)
+    value -- Coordinate of the clipping plane
+
+    Keyword arguments:
+    below -- True if the part of the triangles where the coordinate is smaller
+    than value should be kept, False if the part where it is bigger should be
+    kept instead
+
+    Returned value:
+    Clipped triangles, with the same orientation of the original ones
+    """
+    d = tris[:, :, axis] - value
+    if not below:
+        d = -d
+    inside = d < 0.0
+    count = inside.sum(axis=1)
+    result = [tris[count == 3]]
+    for n in (1, 2):
+        mask = count == n
+        if not mask.any():
+            continue
+        t = tris[mask]
+        dd = d[mask]
+        # Rotate the vertices such that the first one is the one alone at its
+        # side of the plane. Cyclic permutations preserve the orientation
+        alone = inside[mask] if n == 1 else ~inside[mask]
+        first = np.argmax(alone, axis=1)
+        order = (first[:, None] + np.arange(3)) % 3
+        rows = np.arange(len(t))[:, None]
+        t = t[rows, order]
+        dd = dd[rows, order]
+        # The edges starting from the first vertex are crossing the plane
+        f = (dd[:, 0] / (dd[:, 0] - dd[:, 1]))[:, None]
+        p01 = t[:, 0] + f * (t[:, 1] - t[:, 0])
+        f = (dd[:, 0] / (dd[:, 0] - dd[:, 2]))[:, None]
+        p02 = t[:, 0] + f * (t[:, 2] - t[:, 0])
+        if n == 1:
+            result.append(np.stack((t[:, 0], p01, p02), axis=1))
+        else:
+            result.append(np.stack((p01, t[:, 1], t[:, 2]), axis=1))
+            result.append(np.stack((p01, t[:, 2], p02), axis=1))
+    return np.concatenate(result)
+
+
+def volumeProperties(tris):
+    """Compute the volume and the center of mass of the solid enclosed by
+    closed triangles, which can be opened at the plane z = 0
+
+    Position arguments:
+    tris -- Triangles of the solid boundary, with outward normals
+
+    Returned values:
+    vol -- Volume
+    cog -- Center of mass, as a NumPy array. Null if the volume is null
+    """
+    a = triangleAreas(tris)
+    vol = np.dot(a[:, 2], tris[:, :, 2].mean(axis=1))
+    if vol == 0.0:
+        return 0.0, np.zeros(3)
+    cog = np.array([0.5 * np.dot(a[:, i], _quadMean(tris[:, :, i]))
+                    for i in range(3)])
+    return vol, cog / vol
+
+
+def waterplaneProperties(tris):
+    """Compute the properties of the plane z = 0 section of the solid enclosed
+    by the triangles clipped at such plane
+
+    Position arguments:
+    tris -- Triangles of the solid boundary below z = 0, with outward normals
+
+    Returned values:
+    area -- Waterplane area
+    center -- Waterplane area centroid, as a NumPy array (x, y)
+    inertia -- Inertia moments (Ixx, Iyy) of the waterplane area, with
+    respect to the axes crossing its centroid
+    """
+    # The triangles and the waterplane are closing the solid, so the vertical
+    # projection of the triangles is the waterplane with reversed orientation
+    az = -triangleAreas(tris)[:, 2]
+    area = az.sum()
+    if area == 0.0:
+        return 0.0, np.zeros(2), np.zeros(2)
+    center = np.array([np.dot(az, tris[:, :, i].mean(axis=1)) / area
+                       for i in range(2)])
+    # Ixx is computed from y, and Iyy from x
+    inertia = np.array([np.dot(az, _quadMean(tris[:, :, 1 - i]))
+                        for i in range(2)])
+    inertia -= area * center[::-1]**2
+    return area, center, inertia
+
+
+def sectionArea(tris, x):
+    """Compute the area of the transversal section of the solid enclosed by
+    closed triangles, which can be opened at the plane z = 0
+
+    Position arguments:
+    tris -- Triangles of the solid boundary, with outward normals
+    x -- Longitudinal coordinate of the section
+
+    Returned value:
+    Section area
+    """
+    # The triangles clipped at x are closing the solid together with the
+    # section, so the projection of the triangles is the section area
+    return -triangleAreas(clip(tris, 0, x))[:, 0].sum()
+
+
+def rotation(axis, angle):
+    """4x4 NumPy matrix of the rotation around an axis (0 = x, 1 = y, 2 = z)
+    of an angle in radians"""
+    c = math.cos(angle)
+    s = math.sin(angle)
+    i = (axis + 1) % 3
+    j = (axis + 2) % 3
+    m = np.identity(4)
+    m[i, i] = m[j, j] = c
+    m[j, i] = s
+    m[i, j] = -s
+    return m
+
+
+def translation(x, y, z):
+    """4x4 NumPy matrix of a translation"""
+    m = np.identity(4)
+    m[:3, 3] = (x, y, z)
+    return m
+
+
+def placementMatrix(draft, roll, trim, base_z):
+    """Compute the transformation applied by Tools.placeShipShape
+
+    Position arguments:
+    draft -- Ship draft (mm)
+    roll -- Roll angle (degrees)
+    trim -- Trim angle (degrees)
+    base_z -- Base line z coordinate after applying the roll (mm)
+
+    Returned value:
+    4x4 NumPy transformation matrix
+    """
+    roll = math.radians(roll)
+    trim = math.radians(trim)
+    m = rotation(0, roll)
+    m = np.dot(translation(0.0, draft * math.sin(roll), -base_z), m)
+    # Rotation around -y
+    m = np.dot(rotation(1, -trim), m)
+    m = np.dot(translation(draft * math.sin(trim), 0.0, -draft), m)
+    return m
+
+
+def transform(tris, m):
+    """Apply a 4x4 transformation matrix to triangles"""
+    return np.dot(tris, m[:3, :3].T) + m[:3, 3]
+
+
+def _closedMesh(shape, deflection):
+    """Tessellate a solid shape, granting outward normals"""
+    tris = tessellate(shape, deflection)
+    if volumeProperties(tris)[0] < 0.0:
+        tris = tris[:, ::-1].copy()
+    return tris
+
+
+class Hydrostatics(object):
+    """Hydrostatics of a ship computed on its hull mesh. The hull is
+    tessellated just once, when the instance is created.
+
+    The methods are equivalent to the Tools module functions, with the same
+    arguments (excepting the ship) and returned values.
+
+    The instances are not referencing the ship object, so they can be pickled
+    and sent to other processes.
+    """
+    def __init__(self, ship, faces=None, deflection=None):
+        """Tessellate the ship
+
+        Position arguments:
+        ship -- Ship object (see createShip)
+
+        Keyword arguments:
+        faces -- External faces of the ship hull, used to compute the wetted
+        area. If None, the whole ship shape is considered
+        deflection -- Tessellation linear deflection. See tessellate()
+        """
+        self.draft = _value(ship.Draft, 'mm')
+        self.length = _value(ship.Length, 'mm')
+        self.tris = _closedMesh(ship.Shape, deflection)
+        if faces is None:
+            self.faces = self.tris
+        else:
+            self.faces = tessellate(faces, deflection)
+        self._rotated = {}
+
+    def _angles(self, roll, trim):
+        return _value(roll, 'deg'), _value(trim, 'deg')
+
+    def _draft(self, draft):
+        if draft is None:
+            return self.draft
+        return _value(draft, 'mm')
+
+    def _baseZ(self, roll):
+        """Base line z coordinate after applying the roll angle. Cached, so
+        it can be reused for all the drafts and trims"""
+        try:
+            return self._rotated[roll]
+        except KeyError:
+            pass
+        base_z = transform(self.tris, placementMatrix(0.0, roll, 0.0, 0.0))
+        base_z = base_z[:, :, 2].min()
+        self._rotated[roll] = base_z
+        return base_z
+
+    def place(self, draft, roll, trim, faces=False):
+        """Move the ship mesh such that the free surface matches with the
+        plane z=0
+
+        Position arguments:
+        draft -- Ship draft (mm)
+        roll -- Roll angle (degrees)
+        trim -- Trim angle (degrees)
+
+        Keyword arguments:
+        faces -- True if the external faces should be moved instead of the
+        whole ship
+
+        Returned values:
+        tris -- The moved triangles
+        m -- The applied 4x4 transformation matrix
+        """
+        m = placementMatrix(draft, roll, trim, self._baseZ(roll))
+        return transform(self.faces if faces else self.tris, m), m
+
+    def underwater(self, draft=None, roll=0.0, trim=0.0):
+        """Get the triangles below the free surface, and the applied
+        transformation matrix (see place())"""
+        roll, trim = self._angles(roll, trim)
+        tris, m = self.place(self._draft(draft), roll, trim)
+        return clip(tris, 2, 0.0), m
+
+    def areas(self, n, draft=None,
+                       roll=Units.parseQuantity("0 deg"),
+                       trim=Units.parseQuantity("0 deg")):
+        """Compute the ship transversal areas. See Tools.areas()"""
+        if n < 2:
+            return []
+        tris, _ = self.underwater(draft, roll, trim)
+        if not len(tris):
+            return []
+        xmin = tris[:, :, 0].min()
+        xmax = tris[:, :, 0].max()
+        dx = (xmax - xmin) / (n - 1.0)
+        areas = [(Units.Quantity(xmin, Units.Length),
+                  Units.Quantity(0.0, Units.Area))]
+        for i in range(1, n - 1):
+            x = xmin + i * dx
+            areas.append((Units.Quantity(x, Units.Length),
+                          Units.Quantity(sectionArea(tris, x), Units.Area)))
+        areas.append((Units.Quantity(xmax, Units.Length),
+                      Units.Quantity(0.0, Units.Area)))
+        return areas
+
+    def displacement(self, draft=None,
+                           roll=Units.parseQuantity("0 deg"),
+                           trim=Units.parseQuantity("0 deg")):
+        """Compute the ship displacement. See Tools.displacement()"""
+        tris, m = self.underwater(draft, roll, trim)
+        vol, cog = volumeProperties(tris)
+        # Undo the transformations on the bouyance point
+        B = np.dot(np.linalg.inv(m), np.append(cog, 1.0))
+        cb = 0.0
+        if vol > 0.0:
+            dims = tris.max(axis=(0, 1)) - tris.min(axis=(0, 1))
+            box = dims[0] * dims[1] * abs(tris[:, :, 2].min())
+            if box > 0.0:
+                cb = float(vol / box)
+        return (DENS * Units.Quantity(vol, Units.Volume),
+                Vector(B[0], B[1], B[2]),
+                cb)
+
+    def wettedArea(self, draft=None,
+                         roll=Units.parseQuantity("0 deg"),
+                         trim=Units.parseQuantity("0 deg")):
+        """Compute the ship wetted area. See Tools.wettedArea()"""
+        roll, trim = self._angles(roll, trim)
+        tris, _ = self.place(self._draft(draft), roll, trim, faces=True)
+        tris = clip(tris, 2, 0.0)
+        area = np.sqrt((triangleAreas(tris)**2).sum(axis=1)).sum()
+        return Units.Quantity(area, Units.Area)
+
+    def moment(self, draft=None,
+                     roll=Units.parseQuantity("0 deg"),
+                     trim=Units.parseQuantity("0 deg")):
+        """Compute the moment required to trim the ship 1cm. See
+        Tools.moment()"""
+        disp_orig, B_orig, _ = self.displacement(draft, roll, trim)
+        xcb_orig = Units.Quantity(B_orig.x, Units.Length)
+
+        factor = 10.0
+        x = 0.05 * self.length
+        y = 1.0
+        angle = math.atan2(y, x) * Units.Radian
+        trim_new = Units.Quantity(self._angles(roll, trim)[1], Units.Angle)
+        trim_new = trim_new + factor * angle
+        disp_new, B_new, _ = self.displacement(draft, roll, trim_new)
+        xcb_new = Units.Quantity(B_new.x, Units.Length)
+
+        mom0 = -disp_orig * xcb_orig
+        mom1 = -disp_new * xcb_new
+        return (mom1 - mom0) / factor
+
+    def waterplane(self, draft=None,
+                         roll=Units.parseQuantity("0 deg"),
+                         trim=Units.parseQuantity("0 deg")):
+        """Compute the waterplane properties
+
+        Keyword arguments:
+        draft -- Ship draft (Design ship draft by default)
+        roll -- Roll angle (0 degrees by default)
+        trim -- Trim angle (0 degrees by default)
+
+        Returned values:
+        area -- Floating area (mm^2)
+        center -- Floating area centroid (x, y), in the free surface frame
+        of reference (mm)
+        inertia -- Transversal and longitudinal inertia moments of the
+        floating area (mm^4)
+        vol -- Underwater volume (mm^3)
+        """
+        tris, _ = self.underwater(draft, roll, trim)
+        area, center, inertia = waterplaneProperties(tris)
+        vol, _ = volumeProperties(tris)
+        return area, center, inertia, vol
+
+    def floatingArea(self, draft=None,
+                           roll=Units.parseQuantity("0 deg"),
+                           trim=Units.parseQuantity("0 deg")):
+        """Compute the ship floating area. See Tools.floatingArea()"""
+        area = self.waterplane(draft, roll, trim)[0]
+        roll, trim = self._angles(roll, trim)
+        tris, _ = self.place(self._draft(draft), roll, trim)
+        dims = tris.max(axis=(0, 1)) - tris.min(axis=(0, 1))
+        cf = 0.0
+        if dims[0] * dims[1] > 0.0:
+            cf = float(area / (dims[0] * dims[1]))
+        return Units.Quantity(float(area), Units.Area), cf
+
+    def BMT(self, draft=None, trim=Units.parseQuantity("0 deg")):
+        """Calculate "ship Bouyance center" - "transversal metacenter" radius
+
+        Contrary to Tools.BMT(), which is inclining the ship, it is computed
+        from the transversal inertia of the floating area, BM = I / V
+
+        Keyword arguments:
+        draft -- Ship draft (Design ship draft by default)
+        trim -- Trim angle (0 degrees by default)
+
+        Returned value:
+        BMT radius
+        """
+        _, _, inertia, vol = self.waterplane(draft, 0.0, trim)
+        bm = 0.0
+        if vol > 0.0:
+            bm = inertia[0] / vol
+        return Units.Quantity(bm, Units.Length)
+
+    def mainFrameCoeff(self, draft=None):
+        """Compute the main frame coefficient. See Tools.mainFrameCoeff()"""
+        tris, _ = self.underwater(draft)
+        if not len(tris):
+            return 0.0
+        area = sectionArea(tris, 0.0)
+        dims = tris.max(axis=(0, 1)) - tris.min(axis=(0, 1))
+        if dims[1] * dims[2] > 0.0:
+            return float(area / (dims[1] * dims[2]))
+        return 0.0
+
+    def point(self, draft, trim):
+        """Compute all the hydrostatics. See Tools.Point
+
+        Position arguments:
+        draft -- Ship draft
+        trim -- Trim angle
+
+        Returned value:
+        Hydrostatics point (see Tools.Point)
+        """
+        return Point(self, draft, trim)
+
+    def curves(self, drafts, trim):
+        """Compute the hydrostatics for a list of drafts
+
+        Position arguments:
+        drafts -- List of drafts
+        trim -- Trim angle
+
+        Returned value:
+        List of hydrostatics points (see Tools.Point)
+        """
+        return [self.point(draft, trim) for draft in drafts]
+
+
+class Tank(object):
+    """Fluid inside a tank, computed on the tank mesh. As Hydrostatics, the
+    instances can be pickled and sent to other processes.
+    """
+    def __init__(self, tank, deflection=None):
+        """Tessellate the tank
+
+        Position arguments:
+        tank -- Tank object (see createTank)
+
+        Keyword arguments:
+        deflection -- Tessellation linear deflection. See tessellate()
+        """
+        self.tris = _closedMesh(tank.Shape, deflection)
+        self.volume, self.cog = volumeProperties(self.tris)
+
+    def getCoG(self, vol, roll=Units.parseQuantity("0 deg"),
+                          trim=Units.parseQuantity("0 deg")):
+        """Return the fluid volume center of gravity, provided the volume of
+        fluid inside the tank. See TankInstance.Tank.getCoG()
+
+        Position arguments:
+        vol -- Volume of fluid
+
+        Keyword arguments:
+        roll -- Ship roll angle
+        trim -- Ship trim angle
+
+        Returned value:
+        Center of gravity, referred to the untransformed ship
+        """
+        vol = _value(vol, 'mm^3')
+        if vol <= 0.0:
+            return Vector()
+        if vol >= self.volume:
+            return Vector(*self.cog)
+        roll, trim = _value(roll, 'deg'), _value(trim, 'deg')
+        m = np.dot(rotation(1, -math.radians(trim)),
+                   rotation(0, math.radians(roll)))
+        tris = transform(self.tris, m)
+        # Look for the fluid level by bisection
+        zmin = tris[:, :, 2].min()
+        zmax = tris[:, :, 2].max()
+        for i in range(TANK_LEVEL_ITERATIONS):
+            z = 0.5 * (zmin + zmax)
+            v, cog = volumeProperties(clip(tris - (0.0, 0.0, z), 2, 0.0))
+            if abs(v - vol) < TANK_LEVEL_TOLERANCE * self.volume:
+                break
+            if v < vol:
+                zmin = z
+            else:
+                zmax = z
+        cog = np.dot(m[:3, :3].T, cog + (0.0, 0.0, z))
+        return Vector(cog[0], cog[1], cog[2])
+
+
+class Point(object):
+    """Hydrostatics point computed on the hull mesh, with the same members of
+    Tools.Point
+    """
+    def __init__(self, hydrostatics, draft, trim):
+        """Compute all the hydrostatics.
+
+        Position argument:
+        hydrostatics -- Hydrostatics instance
+        draft -- Ship draft
+        trim -- Trim angle
+        """
+        disp, B, cb = hydrostatics.displacement(draft=draft, trim=trim)
+        self.draft = draft
+        self.trim = trim
+        self.disp = disp
+        self.xcb = Units.Quantity(B.x, Units.Length)
+        self.wet = hydrostatics.wettedArea(draft=draft, trim=trim)
+        self.farea, self.Cf = hydrostatics.floatingArea(draft=draft, trim=trim)
+        self.mom = hydrostatics.moment(draft=draft, trim=trim)
+        self.KBt = Units.Quantity(B.z, Units.Length)
+        self.BMt = hydrostatics.BMT(draft=draft, trim=trim)
+        self.Cb = cb
+        self.Cm = hydrostatics.mainFrameCoeff(draft=draft)
+
+
+def validate(ship, faces=None, draft=None,
+             roll=Units.parseQuantity("0 deg"),
+             trim=Units.parseQuantity("0 deg"),
+             deflection=None):
+    """Compare the hydrostatics computed on the hull mesh with the ones
+    computed with OCC by the Tools module
+
+    Position arguments:
+    ship -- Ship object (see createShip)
+
+    Keyword arguments:
+    faces -- External faces of the ship hull
+    draft -- Ship draft (Design ship draft by default)
+    roll -- Roll angle (0 degrees by default)
+    trim -- Trim angle (0 degrees by default)
+    deflection -- Tessellation linear deflection. See tessellate()
+
+    Returned value:
+    Dictionary with the mesh value, the OCC value, and the relative error of
+    the displacement, bouyance center coordinates, floating area, wetted area,
+    and BMT radius
+    """
+    from . import Tools
+    if draft is None:
+        draft = ship.Draft
+    hydro = Hydrostatics(ship, faces, deflection)
+
+    def compare(a, b, scale=None):
+        if scale is None:
+            scale = abs(b)
+        err = abs(a - b)
+        if scale > 0.0:
+            err = err / scale
+        return a, b, err
+
+    disp, B, _ = hydro.displacement(draft, roll, trim)
+    occ_disp, occ_B, _ = Tools.displacement(ship, draft, roll, trim)
+    L = ship.Length.Value
+    results = {
+        'disp': compare(disp.Value, occ_disp.Value),
+        'xcb': compare(B.x, occ_B.x, L),
+        'ycb': compare(B.y, occ_B.y, L),
+        'zcb': compare(B.z, occ_B.z, L),
+        'farea': compare(hydro.floatingArea(draft, roll, trim)[0].Value,
+                         Tools.floatingArea(ship, draft, roll, trim)[0].Value),
+        'BMt': compare(hydro.BMT(draft, trim).Value,
+                       Tools.BMT(ship, draft, trim).Value),
+    }
+    if faces is not None:
+        results['wet'] = compare(hydro.wettedArea(draft, roll, trim).Value,
+                                 Tools.wettedArea(faces, draft,
+                                                  roll, trim).Value)
+    for key in sorted(results.keys()):
+        App.Console.PrintMessage("{}: mesh = {}, OCC = {}, error = {}\n".format(
+            key, *results[key]))
+    return results
@@ -35,6 +35,7 @@ from shipUtils import Paths
 import shipUtils.Units as USys
 import shipUtils.Locale as Locale
 from . import Tools
+from . import MeshTools
 
 
 class TaskPanel:
@@ -96,14 +97,23 @@ class TaskPanel:
             "Computing hydrostatics",
             None)
         App.Console.PrintMessage(msg + '...\n')
+        # The computation on the hull tessellation is opt-in, see MeshTools
+        param = App.ParamGet("User parameter:BaseApp/Preferences/Mod/Ship")
+        hydrostatics = None
+        if param.GetBool("HydrostaticsMesh", False):
+            # The hull is tessellated just once for all the drafts
+            hydrostatics = MeshTools.Hydrostatics(self.ship, faces)
         points = []
         for i in range(len(drafts)):
             App.Console.PrintMessage("\t{} / {}\n".format(i + 1, len(drafts)))
             draft = drafts[i]
-            point = Tools.Point(self.ship,
-                                faces,
-                                draft,
-                                trim)
+            if hydrostatics is None:
+                point = Tools.Point(self.ship,
+                                    faces,
+                                    draft,
+                                    trim)
+            else:
+                point = hydrostatics.point(draft, trim)
             points.append(point)
             self.timer.start(0.0)
             self.loop.exec_()
@@ -1017,6 +1017,94 @@ class SpreadsheetCases(unittest.TestCase):
         self.doc.recompute()
         self.assertEqual(sheet.get('C1'), Units.Quantity('3 mm'))
 
+    def makeXLSXFile(self, filename, rows, columns):
+        """ Writes a XLSX file with one sheet of rows x columns cells, like a
+        bill of materials: a column of shared strings (part names), columns of
+        numbers, and a last column of formulas. The last formula is aliased
+        as "total". """
+        import zipfile
+        def column(i):
+            return chr(65 + i)
+        main = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+        z = zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED)
+        z.writestr('xl/workbook.xml',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="%s"><sheets><sheet name="BOM" sheetId="1"/></sheets>'
+            '<definedNames><definedName name="total">BOM!$%s$%i</definedName></definedNames>'
+            '</workbook>' % (main, column(columns - 1), rows))
+        z.writestr('xl/sharedStrings.xml',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<sst xmlns="%s">' % main +
+            ''.join('<si><t>Part%i</t></si>' % i for i in range(rows)) +
+            '</sst>')
+        parts = ['<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                 '<worksheet xmlns="%s"><sheetData>' % main]
+        for r in range(1, rows + 1):
+            parts.append('<row r="%i"><c r="A%i" t="s"><v>%i</v></c>' % (r, r, r - 1))
+            for c in range(1, columns - 1):
+                parts.append('<c r="%s%i"><v>%g</v></c>' % (column(c), r, r * 0.5 + c))
+            formula = '%s%i*2+SUM(B%i:%s%i)' % (column(1), r, r, column(columns - 2), r)
+            parts.append('<c r="%s%i"><f>%s</f></c></row>' % (column(columns - 1), r, formula))
+        parts.append('</sheetData></worksheet>')
+        z.writestr('xl/worksheets/sheet1.xml', ''.join(parts))
+        z.close()
+
+    def testImportXLSX(self):
+        """ Import a XLSX file with the streaming importer """
+        import importXLSX
+        filename = self.TempPath + os.sep + 'bom.xlsx'
+        self.makeXLSXFile(filename, rows=3, columns=6)
+        importXLSX.insert(filename, self.doc.Name)
+        sheet = self.doc.getObject('BOM')
+        self.assertEqual(sheet.get('A1'), 'Part0')
+        self.assertEqual(sheet.get('A3'), 'Part2')
+        self.assertEqual(sheet.getContents('F1'), '=B1 * 2 + sum(B1:E1)')
+        self.assertEqual(sheet.get('F1'), 15)
+        self.assertEqual(sheet.getCellFromAlias('total'), 'F3')
+        self.assertFalse(self.doc.RecomputesFrozen)
+
+    def testApplyCellSet(self):
+        """ Set many cells at once and recompute the dependent objects once """
+        import cellSet
+        # a box with a cylindrical hole, driven by the aliases of a sheet
+        sheet = self.doc.addObject('Spreadsheet::Sheet', 'Params')
+        for row, (alias, value) in enumerate((('length', '100 mm'), ('width', '60 mm'),
+                                              ('height', '40 mm'), ('radius', '10 mm')), 1):
+            sheet.set('A%i' % row, alias)
+            sheet.set('B%i' % row, value)
+            sheet.setAlias('B%i' % row, alias)
+        sheet.set('B5', '=length * width * height - pi * radius ^ 2 * height')
+        sheet.setAlias('B5', 'volume')
+        box = self.doc.addObject('Part::Box', 'Box')
+        box.setExpression('Length', 'Params.length')
+        box.setExpression('Width', 'Params.width')
+        box.setExpression('Height', 'Params.height')
+        hole = self.doc.addObject('Part::Cylinder', 'Hole')
+        hole.setExpression('Radius', 'Params.radius')
+        hole.setExpression('Height', 'Params.height')
+        hole.setExpression('Placement.Base.x', 'Params.length / 2')
+        hole.setExpression('Placement.Base.y', 'Params.width / 2')
+        cut = self.doc.addObject('Part::Cut', 'Cut')
+        cut.Base = box
+        cut.Tool = hole
+        self.doc.recompute()
+        objs = cellSet.applyCellSet(sheet, {'length': '50 mm', 'B3': '20 mm', 'C1': 2.5})
+        self.assertEqual([o.Name for o in objs][0], 'Params')
+        self.assertEqual([o.Name for o in objs][-1], 'Cut')
+        self.assertEqual(set(o.Name for o in objs), set(['Params', 'Box', 'Hole', 'Cut']))
+        self.assertEqual(sheet.get('C1'), 2.5)
+        self.assertEqual(self.doc.Box.Length, 50)
+        self.assertEqual(self.doc.Hole.Height, 20)
+        self.assertAlmostEqual(sheet.volume.Value, cut.Shape.Volume, 6)
+        self.assertFalse(cut.isTouched())
+        self.assertFalse(self.doc.RecomputesFrozen)
+        self.assertEqual(cellSet.applyCellSet(sheet, {'A1': 'length'}), [])
+        objs = cellSet.applyCellSet(self.doc, {'Params.width': '30 mm'}, recompute=False)
+        self.assertTrue(cut.isTouched())
+        self.doc.recompute()
+        self.assertEqual(self.doc.Box.Width, 30)
+        self.assertRaises(ValueError, cellSet.applyCellSet, sheet, {'depth': 1})
+
 
     def tearDown(self):
         #closing doc
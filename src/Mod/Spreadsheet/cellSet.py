@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+#***************************************************************************
+#*   Copyright (c) 2020 FreeCAD Developers                                 *
+#*                                                                         *
+#*   This program is free software; you can redistribute it and/or modify  *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)    *
+#*   as published by the Free Software Foundation; either version 2 of     *
+#*   the License, or (at your option) any later version.                   *
+#*   for detail see the LICENCE text file.                                 *
+#*                                                                         *
+#*   This program is distributed in the hope that it will be useful,       *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#*   GNU Library General Public License for more details.                  *
+#*                                                                         *
+#*   You should have received a copy of the GNU Library General Public     *
+#*   License along with this program; if not, write to the Free Software   *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+#*   USA                                                                   *
+#*                                                                         *
+#***************************************************************************
+from __future__ import print_function
+
+__title__ = "FreeCAD Spreadsheet Workbench - bulk cell sets"
+__url__ = ["http://www.freecadweb.org"]
+
+'''
+Sets many cells of spreadsheets at once, for parametric studies driven by
+spreadsheets.
+
+Setting the cells one at a time, and recomputing the document after each
+of them, recomputes the sheets and every object depending on them once per
+cell. A cell set is applied with the recomputes of the document frozen,
+cells whose contents are unchanged are skipped, and only the changed sheets
+and the objects depending on them are recomputed, once, in dependency
+order. Each sheet evaluates its changed cells in dependency order when it
+is recomputed.
+
+>>> import cellSet
+>>> objs = cellSet.applyCellSet(sheet, {'length': '20 mm', 'B2': '=length * 2'})
+>>> objs = cellSet.applyCellSet(doc, {'Params.length': 25.0, 'Params.B2': 10})
+'''
+
+import re
+import FreeCAD as App
+
+from importXLSX import setCells
+
+cellPattern = re.compile(r'^\$?([A-Za-z]{1,2})\$?([0-9]{1,5})$')
+
+
+def toContent(value):
+    ''' Returns the cell content string of a value. Strings are used as
+    they are, formulas start with '='. Floats are written with all their
+    digits, other values, like quantities, with str().'''
+    if isinstance(value, str) or type(value).__name__ == 'unicode':
+        return value
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def getCellAddress(sheet, cell):
+    ''' Returns the address of a cell of a sheet, given by its address or
+    its alias. Raises ValueError for an unknown alias.'''
+    address = sheet.getCellFromAlias(cell)
+    if address:
+        return address
+    match = cellPattern.match(cell)
+    if not match:
+        raise ValueError("%s has no cell or alias '%s'" % (sheet.Label, cell))
+    return match.group(1).upper() + match.group(2)
+
+
+def getSheet(doc, name):
+    ''' Returns the sheet of a document with the given name or label.'''
+    sheet = doc.getObject(name)
+    if sheet is None:
+        sheets = doc.getObjectsByLabel(name)
+        sheet = sheets[0] if len(sheets) == 1 else None
+    if sheet is None or not sheet.isDerivedFrom('Spreadsheet::Sheet'):
+        raise ValueError("%s has no spreadsheet '%s'" % (doc.Name, name))
+    return sheet
+
+
+def groupCells(target, cells):
+    ''' Returns a list of (sheet, [(address, content), ...]) tuples, in the
+    order the sheets are first used. The target is a sheet, whose cells are
+    given by address or alias, or a document, whose cells are given as
+    'Sheet.A1' or 'Sheet.alias', the sheet by name or label.'''
+    groups = []
+    index = {}
+    isDoc = target.isDerivedFrom('App::Document')
+    for key, value in cells.items():
+        if isDoc:
+            if '.' not in key:
+                raise ValueError("Cell '%s' has no sheet" % key)
+            name, cell = key.rsplit('.', 1)
+            sheet = getSheet(target, name)
+        else:
+            sheet, cell = target, key
+        if sheet.Name not in index:
+            index[sheet.Name] = len(groups)
+            groups.append((sheet, []))
+        groups[index[sheet.Name]][1].append(
+            (getCellAddress(sheet, cell), toContent(value)))
+    return groups
+
+
+def sortObjects(objs):
+    ''' Returns a list of document objects sorted in dependency order, each
+    object after the objects it depends on.'''
+    objs = list(objs)
+    names = set(o.FullName for o in objs)
+    done = set()
+    result = []
+    for obj in objs:
+        stack = [(obj, False)]
+        while stack:
+            o, expanded = stack.pop()
+            if o.FullName in done:
+                continue
+            if expanded:
+                done.add(o.FullName)
+                result.append(o)
+                continue
+            stack.append((o, True))
+            for dep in o.OutList:
+                if dep.FullName in names and dep.FullName not in done:
+                    stack.append((dep, False))
+    return result
+
+
+def getAffectedObjects(sheets):
+    ''' Returns the sheets and the objects depending on them, in dependency
+    order.'''
+    objs = {}
+    for sheet in sheets:
+        objs[sheet.FullName] = sheet
+        for obj in sheet.InListRecursive:
+            objs[obj.FullName] = obj
+    return sortObjects(objs.values())
+
+
+def applyCellSet(target, cells, recompute=True):
+    ''' Sets the cells given by a dict {cell: value} with the recomputes of
+    the document frozen, and recomputes once the changed sheets and the
+    objects depending on them, in dependency order (see groupCells for the
+    cell keys, and toContent for the values). Cells whose contents are
+    unchanged are skipped. If recompute is False, the objects are left
+    touched.
+    Returns the list of the objects recomputed, or to recompute, in
+    dependency order.'''
+    changed = []
+    for sheet, contents in groupCells(target, cells):
+        contents = [(address, content) for address, content in contents
+                    if sheet.getContents(address) != content]
+        if contents:
+            setCells(sheet, contents)
+            changed.append(sheet)
+    if not changed:
+        return []
+    objs = getAffectedObjects(changed)
+    if recompute:
+        # forced, the recomputes may have been frozen by the caller
+        objs[0].Document.recompute(objs, True)
+    return objs
@@ -30,6 +30,13 @@ __url__ = ["http://www.freecadweb.org"]
 '''
 This library imports an Excel-XLSX-file into FreeCAD.
 
+Version 1.2:
+The worksheets and the shared strings are read with a streaming parser,
+the formulas are translated by a single translator, remembering the
+translated formulas, and the cells of a sheet are set with the recomputes
+of the document frozen, which is only recomputed at the end.
+Rich text shared strings are imported as a single string.
+
 Version 1.1, Nov. 2016:
 Changed parser, adds rad-unit to trigonometric functions in order
 to give the same result in FreeCAD.
@@ -56,6 +63,7 @@ known issues:
 
 import zipfile
 import xml.dom.minidom
+import xml.etree.ElementTree as ElementTree
 import FreeCAD as App
 import sys
 
@@ -173,6 +181,7 @@ class FormulaTranslator(object):
     self.tokenList = ['=']
 
   def translateForm(self, actExpr):
+    self.tokenList = ['=']
     self.getNextToken(actExpr)
     #print("tokenList: ", self.tokenList)
     self.resultTree = exprNode(None, 0, 1)
@@ -407,7 +416,7 @@ def handleWorkBook(theBook, sheetDict, Doc):
       #print('Sheet Name: ', refList[0])
       #print('Adress: ', adressList[0] + adressList[1])
       actSheet, sheetFile = sheetDict[refList[0]]
-      actSheet.setAlias(adressList[0]+adressList[1], aliasName.encode('utf8'))
+      actSheet.setAlias(adressList[0]+adressList[1], toSheetString(aliasName))
 
 def handleStrings(theStr, sList):
   print('process Strings: ')
@@ -416,41 +425,167 @@ def handleStrings(theStr, sList):
     print('string: ', getText(sElem.childNodes))
     sList.append(getText(sElem.childNodes))
 
-def open(nameXLSX):
+def localName(tag):
+  ''' Returns the tag of an ElementTree element without namespace.'''
+  return tag.rsplit('}', 1)[-1]
+
+
+def toSheetString(theString):
+  if sys.version_info.major >= 3:
+    return theString
+  return theString.encode('utf8')
+
+
+def getStringItem(elem):
+  ''' Returns the text of a string item element (<si> or <is>),
+  joining the runs of rich text strings.'''
+  parts = []
+  for child in elem:
+    name = localName(child.tag)
+    if name == 't':
+      parts.append(child.text or '')
+    elif name == 'r':
+      for run in child:
+        if localName(run.tag) == 't':
+          parts.append(run.text or '')
+  return ''.join(parts)
+
+
+def readStrings(theFile):
+  ''' Reads the shared strings table with a streaming parser.
+  Returns the list of strings.'''
+  sList = []
+  for event, elem in ElementTree.iterparse(theFile):
+    if localName(elem.tag) == 'si':
+      sList.append(getStringItem(elem))
+      elem.clear()
+  return sList
+
+
+def makeTranslator():
+  ''' Returns a function translating Excel formulas to FreeCAD, which
+  reuses one FormulaTranslator and remembers the translated formulas.'''
+  fTrans = FormulaTranslator()
+  translated = {}
+  def translate(theFormula):
+    result = translated.get(theFormula)
+    if result is None:
+      result = fTrans.translateForm(theFormula)
+      translated[theFormula] = result
+    return result
+  return translate
+
+
+def getCellContent(cell, sList, translate):
+  ''' Returns the content to set into a FreeCAD spreadsheet for a
+  <c> element, or None if the cell has nothing to import.'''
+  cellType = cell.get('t', 'n')
+  content = None
+  theFormula = None
+  theValue = None
+  for child in cell:
+    name = localName(child.tag)
+    if name == 'is':
+      content = toSheetString(getStringItem(child))
+    elif name == 'f':
+      theFormula = child.text
+    elif name == 'v':
+      theValue = child.text
+  if theFormula:
+    return translate(theFormula)
+  if theValue is not None:
+    if cellType == 'n':
+      return theValue
+    if cellType == 's':
+      return toSheetString(sList[int(theValue)])
+  return content
+
+
+def iterCells(theFile, sList, translate):
+  ''' Reads a worksheet with a streaming parser. Yields the (reference,
+  content) tuples of the cells to set. Parsed elements are freed, so the
+  memory use does not grow with the size of the sheet.'''
+  for event, elem in ElementTree.iterparse(theFile):
+    name = localName(elem.tag)
+    if name == 'c':
+      content = getCellContent(elem, sList, translate)
+      if content is not None:
+        yield elem.get('r'), content
+      elem.clear()
+    elif name == 'row':
+      elem.clear()
+
+
+def setCells(theSheet, cells):
+  ''' Sets the content of many cells, given as (reference, content)
+  tuples, with the recomputes of the document frozen. The document has
+  to be recomputed afterwards. Returns the number of cells set.'''
+  theDoc = theSheet.Document
+  frozen = theDoc.RecomputesFrozen
+  theDoc.RecomputesFrozen = True
+  count = 0
+  try:
+    for ref, content in cells:
+      theSheet.set(ref, content)
+      count += 1
+  finally:
+    theDoc.RecomputesFrozen = frozen
+  return count
+
+
+def importWorkBook(z, theDoc, streaming=True):
+  ''' Imports all sheets of an opened XLSX zip file into a document.
+  If streaming is False, the sheets are read with the minidom parser,
+  one cell at a time, as in previous versions.'''
+  sheetDict = dict()
+  stringList = []
 
-  if len(nameXLSX) > 0:
-    z=zipfile.ZipFile(nameXLSX)
-    
-    theDoc = App.newDocument()
-    
-    sheetDict = dict()
-    stringList = []
-    
-    theBookFile=z.open('xl/workbook.xml')
-    theBook = xml.dom.minidom.parse(theBookFile)
-    handleWorkBook(theBook, sheetDict, theDoc)
-    theBook.unlink()
-    
+  theBookFile=z.open('xl/workbook.xml')
+  theBook = xml.dom.minidom.parse(theBookFile)
+  handleWorkBook(theBook, sheetDict, theDoc)
+  theBook.unlink()
+
+  if streaming:
+    if 'xl/sharedStrings.xml' in z.namelist():
+      theStringFile = z.open('xl/sharedStrings.xml')
+      stringList = readStrings(theStringFile)
+      theStringFile.close()
+    translate = makeTranslator()
+    for sheetSpec in sheetDict:
+      theSheet, sheetFile = sheetDict[sheetSpec]
+      f = z.open('xl/worksheets/' + sheetFile)
+      setCells(theSheet, iterCells(f, stringList, translate))
+      f.close()
+  else:
     if 'xl/sharedStrings.xml' in z.namelist():
       theStringFile=z.open('xl/sharedStrings.xml')
       theStrings = xml.dom.minidom.parse(theStringFile)
       handleStrings(theStrings, stringList)
       theStrings.unlink()
-    
+
     for sheetSpec in sheetDict:
       #print("sheetSpec: ", sheetSpec)
       theSheet, sheetFile = sheetDict[sheetSpec]
       f=z.open('xl/worksheets/' + sheetFile)
       myDom = xml.dom.minidom.parse(f)
-      
+
       handleWorkSheet(myDom, theSheet, stringList)
       myDom.unlink()
+
+  # This is needed more than once, otherwise some references are not calculated!
+  theDoc.recompute()
+  theDoc.recompute()
+  theDoc.recompute()
+
+
+def open(nameXLSX):
+
+  if len(nameXLSX) > 0:
+    z=zipfile.ZipFile(nameXLSX)
     
+    theDoc = App.newDocument()
+    importWorkBook(z, theDoc)
     z.close()
-    # This is needed more than once, otherwise some references are not calculated!
-    theDoc.recompute()
-    theDoc.recompute()
-    theDoc.recompute()
     return theDoc
     
 def insert(nameXLSX,docname):
@@ -460,34 +595,8 @@ def insert(nameXLSX,docname):
           theDoc=App.newDocument(docname)
   App.ActiveDocument = theDoc
 
-  sheetDict = dict()
-  stringList = []
-
   z=zipfile.ZipFile(nameXLSX)
-  theBookFile=z.open('xl/workbook.xml')
-  theBook = xml.dom.minidom.parse(theBookFile)
-  handleWorkBook(theBook, sheetDict, theDoc)
-  theBook.unlink()
-  
-  if 'xl/sharedStrings.xml' in z.namelist():
-    theStringFile=z.open('xl/sharedStrings.xml')
-    theStrings = xml.dom.minidom.parse(theStringFile)
-    handleStrings(theStrings, stringList)
-    theStrings.unlink()
-  
-  for sheetSpec in sheetDict:
-    #print("sheetSpec: ", sheetSpec)
-    theSheet, sheetFile = sheetDict[sheetSpec]
-    f=z.open('xl/worksheets/' + sheetFile)
-    myDom = xml.dom.minidom.parse(f)
-    
-    handleWorkSheet(myDom, theSheet, stringList)
-    myDom.unlink()
-  
+  importWorkBook(z, theDoc)
   z.close()
-  # This is needed more than once, otherwise some references are not calculated!
-  theDoc.recompute()
-  theDoc.recompute()
-  theDoc.recompute()
 
 